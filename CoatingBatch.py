@@ -0,0 +1,144 @@
+#!/usr/bin/env python
+# This work is licensed under the Creative Commons Attribution-NonCommercial-
+# ShareAlike 4.0 International License. To view a copy of this license, visit
+# http://creativecommons.org/licenses/by-nc-sa/4.0/ or send a letter to Creative
+# Commons, PO Box 1866, Mountain View, CA 94042, USA.
+
+"""
+Evaluates CoatingGUI projects without a display.
+
+Every project is loaded like in the GUI, the requested plots are calculated
+and written as data files and/or figures next to each other in the output
+directory, named <project>_<plot>.<format>. Projects are processed in
+parallel, each in its own worker process. PyQt4 is never imported.
+"""
+
+import os
+import sys
+import argparse
+import traceback
+import multiprocessing
+
+import matplotlib
+matplotlib.use('Agg')
+
+# data files and the default project are referenced relative to this directory
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def process_project(filename, plottypes, formats, outdir, profile=False):
+    """
+    Evaluates a single project file, returns a list of files written.
+
+    With profile, the timings of every step are written to
+    <project>_profile.json, see gui.profiling.
+    """
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from coatingtk.utils.config import Config
+    from coatingtk.materials import MaterialLibrary
+    from coatingtk.coating import Coating
+    from gui import plothandler, datafile
+    from gui.helpers import export_data, plot_data
+    from gui.profiling import profiler
+
+    profiler.enable_cprofile(profile)
+    datafile.install()
+    with profiler.span('project'):
+        config = Config.Instance()
+        config.load_default('default.cgp')
+        config.load(filename)
+        MaterialLibrary.Instance().load_materials()
+    with profiler.span('coating'):
+        coating = Coating.create_from_config(config)
+
+    plots = plothandler.collect_plots(options=False)
+    if 'all' in plottypes:
+        plottypes = sorted(plots.keys())
+    elif not plottypes:
+        plottypes = [config.get('plot.plottype')]
+
+    name = os.path.splitext(os.path.basename(filename))[0]
+    written = []
+    for plottype in plottypes:
+        figure = Figure(figsize=(8, 6))
+        FigureCanvasAgg(figure)
+        plot = plots[plottype]['plotter'](figure.add_subplot(111))
+        with profiler.span(plottype + '.compute'):
+            data = plot.compute(coating)
+        with profiler.span(plottype + '.draw'):
+            plot.draw(data)
+
+        base = os.path.join(outdir, '{0}_{1}'.format(name, plottype))
+        with profiler.span(plottype + '.save'):
+            for fmt in formats:
+                fn = '{0}.{1}'.format(base, fmt)
+                if fmt == 'dat':
+                    export_data(fn, *plot_data(plot, data, figure))
+                else:
+                    figure.savefig(fn)
+                written.append(fn)
+    if profile:
+        written += profiler.dump(os.path.join(outdir, name + '_profile.json'))
+    return written
+
+
+def run_job(job):
+    """Pool entry point, returns (filename, written files, error message)"""
+    filename = job[0]
+    try:
+        return filename, process_project(*job), None
+    except Exception:
+        return filename, [], traceback.format_exc()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='CoatingBatch.py',
+        description='Evaluate CoatingGUI projects without a display.')
+    parser.add_argument('projects', nargs='+', metavar='PROJECT',
+        help='CoatingGUI project file(s) to evaluate')
+    parser.add_argument('-p', '--plot', action='append', default=[],
+        help='plot type to evaluate, may be given multiple times or as "all" '
+             '(default: the plot type saved in each project)')
+    parser.add_argument('-f', '--format', action='append', default=[],
+        choices=['dat', 'pdf', 'png', 'svg'],
+        help='output format, may be given multiple times (default: dat)')
+    parser.add_argument('-o', '--outdir', default='.',
+        help='output directory (default: current directory)')
+    parser.add_argument('-j', '--jobs', type=int, default=0,
+        help='number of worker processes (default: number of CPUs)')
+    parser.add_argument('--profile', action='store_true',
+        help='write the timings of every step to <project>_profile.json, '
+             'and cProfile statistics to <project>_profile.prof')
+    args = parser.parse_args(argv)
+
+    formats = args.format or ['dat']
+    outdir = os.path.abspath(args.outdir)
+    if not os.path.isdir(outdir):
+        os.makedirs(outdir)
+    projects = [os.path.abspath(p) for p in args.projects]
+    os.chdir(BASE_DIR)
+
+    jobs = [(p, args.plot, formats, outdir, args.profile) for p in projects]
+    workers = args.jobs or multiprocessing.cpu_count()
+    # config and material library are singletons, so every project
+    # gets a fresh worker process
+    pool = multiprocessing.Pool(min(workers, len(jobs)), maxtasksperchild=1)
+    failed = 0
+    try:
+        for filename, written, error in pool.imap_unordered(run_job, jobs):
+            if error:
+                failed += 1
+                sys.stderr.write('{0}: failed\n{1}\n'.format(filename, error))
+            else:
+                for fn in written:
+                    print '{0}: wrote {1}'.format(filename, fn)
+    finally:
+        pool.close()
+        pool.join()
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    multiprocessing.freeze_support()
+    sys.exit(main())
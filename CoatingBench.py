@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+# This work is licensed under the Creative Commons Attribution-NonCommercial-
+# ShareAlike 4.0 International License. To view a copy of this license, visit
+# http://creativecommons.org/licenses/by-nc-sa/4.0/ or send a letter to Creative
+# Commons, PO Box 1866, Mountain View, CA 94042, USA.
+
+"""
+Times the solver, material data, project files and plotting.
+
+The benchmarks of gui.benchmark are run on a project, by default the
+default project, and the results are written to a JSON file. If a baseline,
+i.e. the results file of an earlier run on the same machine, is given, every
+case is compared against it and the exit status is 1 if any case got slower
+by more than the tolerance. PyQt4 is never imported.
+
+Typical use before a release:
+
+    python CoatingBench.py --save-baseline baseline.json     (old version)
+    python CoatingBench.py --baseline baseline.json          (new version)
+"""
+
+import os
+import sys
+import argparse
+
+import matplotlib
+matplotlib.use('Agg')
+
+# data files and the default project are referenced relative to this directory
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def format_row(row):
+    from gui.profiling import format_duration
+    key, before, now, status = row
+    if before is None:
+        return '{0:<45} {1:>10} {2:>10}  {3}'.format(
+            key, '', format_duration(now), status)
+    return '{0:<45} {1:>10} {2:>10} {3:>6.2f}x  {4}'.format(
+        key, format_duration(before), format_duration(now), now / before, status)
+
+
+def main(argv=None):
+    from gui import benchmark
+    from gui.profiling import format_duration
+
+    parser = argparse.ArgumentParser(prog='CoatingBench.py',
+        description='Time the solver, material data, project files and plotting.')
+    parser.add_argument('project', nargs='?',
+        help='CoatingGUI project file to benchmark (default: default.cgp)')
+    parser.add_argument('-b', '--benchmark', action='append', default=[],
+        choices=list(benchmark.CASES.keys()),
+        help='benchmark to run, may be given multiple times (default: all)')
+    parser.add_argument('-o', '--output', default='bench_results.json',
+        help='results file (default: bench_results.json)')
+    parser.add_argument('--baseline', metavar='FILE',
+        help='results file of an earlier run to compare against')
+    parser.add_argument('--save-baseline', metavar='FILE',
+        help='also write the results to FILE, for later comparisons')
+    parser.add_argument('-t', '--tolerance', type=float, default=0.25,
+        help='fraction by which a case may get slower than the baseline '
+             '(default: 0.25)')
+    parser.add_argument('--quick', action='store_true',
+        help='only run the smaller stacks and sweeps')
+    args = parser.parse_args(argv)
+
+    project = os.path.abspath(args.project or os.path.join(BASE_DIR, 'default.cgp'))
+    output = os.path.abspath(args.output)
+    baseline = os.path.abspath(args.baseline) if args.baseline else None
+    save_baseline = os.path.abspath(args.save_baseline) if args.save_baseline else None
+    os.chdir(BASE_DIR)
+
+    def log(key, result):
+        print '{0:<45} {1:>10}  ({2} runs)'.format(
+            key, format_duration(result['best']), result['repeats'])
+        sys.stdout.flush()
+
+    if args.quick:
+        sizes = dict(layers=benchmark.QUICK_LAYERS, points=benchmark.QUICK_POINTS)
+    else:
+        sizes = dict(layers=benchmark.LAYERS, points=benchmark.POINTS)
+    results = benchmark.run(project, args.benchmark or None, log=log, **sizes)
+    benchmark.save(output, results)
+    print 'wrote', output
+    if save_baseline:
+        benchmark.save(save_baseline, results)
+        print 'wrote', save_baseline
+
+    if not baseline:
+        return 0
+    rows = benchmark.compare(results, benchmark.load(baseline), args.tolerance)
+    print
+    print 'compared to', baseline
+    for row in rows:
+        print format_row(row)
+    slower = benchmark.regressions(rows)
+    if slower:
+        print '{0} of {1} cases slower than the baseline'.format(len(slower), len(rows))
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -6,14 +6,35 @@
 
 import sys
 import argparse
-from gui.mainWindow import MainWindow
-from PyQt4 import QtGui
+import multiprocessing
+from gui.profiling import profiler
+with profiler.span('startup.imports'):
+    from gui.mainWindow import MainWindow
+    from gui import datafile
+    from PyQt4 import QtGui
 
-qApp = QtGui.QApplication(sys.argv)
+def main():
+    qApp = QtGui.QApplication(sys.argv)
 
-parser = argparse.ArgumentParser(prog='CoatingGUI.py')
-parser.add_argument('-p', '--project', help='open CoatingGUI project file PROJECT')
-args = parser.parse_args()
-Window = MainWindow(vars(args))
-Window.show()
-qApp.exec_()
\ No newline at end of file
+    parser = argparse.ArgumentParser(prog='CoatingGUI.py')
+    parser.add_argument('-p', '--project', help='open CoatingGUI project file PROJECT')
+    parser.add_argument('--profile', metavar='FILE',
+        help='profile with cProfile and write the timings to FILE on exit '
+             '(JSON, and the cProfile statistics to FILE with extension .prof)')
+    args = parser.parse_args()
+    if args.profile:
+        profiler.enable_cprofile()
+    datafile.install()
+    Window = MainWindow(vars(args))
+    Window.show()
+    qApp.exec_()
+    if args.profile:
+        for fn in profiler.dump(args.profile):
+            print 'wrote', fn
+
+
+# plot sweeps may start worker processes, which re-import this module on
+# platforms without fork
+if __name__ == '__main__':
+    multiprocessing.freeze_support()
+    main()
@@ -0,0 +1,275 @@
+#!/usr/bin/env python
+# This work is licensed under the Creative Commons Attribution-NonCommercial-
+# ShareAlike 4.0 International License. To view a copy of this license, visit
+# http://creativecommons.org/licenses/by-nc-sa/4.0/ or send a letter to Creative
+# Commons, PO Box 1866, Mountain View, CA 94042, USA.
+
+"""
+Benchmarks of the solver, material data, projects and plotting.
+
+Every benchmark is timed for a range of stack sizes and/or sweep points,
+see CASES. Each case is repeated a few times and the best time is kept, as
+it is the least affected by other processes. Results are plain dicts that
+are written to and read from JSON files, so that a run can be compared
+against the results of an earlier version with compare(), see
+CoatingBench.py.
+"""
+
+import os
+import time
+import json
+import shutil
+import platform
+import tempfile
+from collections import OrderedDict
+from timeit import default_timer
+import numpy as np
+
+# stack sizes and sweep points of the solver benchmarks
+LAYERS = (10, 50, 200)
+POINTS = (100, 1000, 10000, 100000)
+# smaller set for a quick check
+QUICK_LAYERS = (10, 50)
+QUICK_POINTS = (100, 1000, 10000)
+
+DATA_FILE = os.path.join('gui', 'data', 'n_ta2o5.dat')
+# (high, low) index materials of the benchmark stacks, from default.cgp
+MATERIALS = ('Ta2O5', 'SiO2')
+
+# differences below this many seconds are considered noise by compare()
+NOISE = 0.0005
+
+
+def measure(func, min_time=0.2, max_time=5.0, min_repeats=3, max_repeats=20):
+    """
+    Calls func repeatedly and returns the list of durations in seconds.
+
+    func is repeated at least min_repeats times and until min_time has
+    passed, but stops after max_repeats calls or once max_time has passed,
+    so that slow cases only run once.
+    """
+    times = []
+    total = 0.0
+    while len(times) < max_repeats:
+        start = default_timer()
+        func()
+        times.append(default_timer() - start)
+        total += times[-1]
+        if total >= max_time:
+            break
+        if len(times) >= min_repeats and total >= min_time:
+            break
+    return times
+
+
+def case_key(name, layers=None, points=None):
+    """Identifier of a benchmark case in the results"""
+    parts = [name]
+    if layers is not None:
+        parts.append('layers={0}'.format(layers))
+    if points is not None:
+        parts.append('points={0}'.format(points))
+    return '/'.join(parts)
+
+
+def benchmark_stack(config, layers):
+    """
+    Creates a quarter wave stack with the given number of layers at
+    coating.lambda0, alternating between MATERIALS.
+    """
+    from coatingtk.materials import MaterialLibrary
+    from coatingtk.coating import Coating
+    lambda0 = config.get('coating.lambda0')
+    library = MaterialLibrary.Instance()
+    stack = []
+    for j in range(layers):
+        name = MATERIALS[j % 2]
+        n = np.real(complex(library.get_material(name).n(lambda0)))
+        stack.append([name, round(lambda0 / (4 * n), 2)])
+    config.set('coating.layers', stack)
+    return Coating.create_from_config(config)
+
+
+# Every case function takes the project config, the number of layers and
+# sweep points and a scratch directory, prepares everything that is not part
+# of the benchmark and returns the function to be timed.
+
+def case_reflectivity(config, layers, points, workdir):
+    import solver
+    coating = benchmark_stack(config, layers)
+    lambda0 = config.get('coating.lambda0')
+    wavelength = np.linspace(0.7 * lambda0, 1.3 * lambda0, points)
+    n, d = solver.stack_indices(coating, wavelength)
+    return lambda: solver.propagate(n, d, wavelength).reflectivity()
+
+
+def case_phase(config, layers, points, workdir):
+    import solver
+    coating = benchmark_stack(config, layers)
+    lambda0 = config.get('coating.lambda0')
+    wavelength = np.linspace(0.7 * lambda0, 1.3 * lambda0, points)
+    n, d = solver.stack_indices(coating, wavelength)
+    return lambda: solver.propagate(n, d, wavelength).phase()
+
+
+def case_efi(config, layers, points, workdir):
+    """Field intensity with points positions over the whole stack"""
+    import solver
+    coating = benchmark_stack(config, layers)
+    lambda0 = config.get('coating.lambda0')
+    n, d = solver.stack_indices(coating, lambda0)
+    steps = max(points // layers, 1)
+    return lambda: solver.field_intensity(n, d, lambda0, 0.0, steps)
+
+
+def case_datafile(config, layers, points, workdir):
+    import datafile
+    table = datafile.DataFileWrapper(DATA_FILE, sidecar=False)
+    x = np.linspace(table.x[0], table.x[-1], points)
+    return lambda: table.value(x)
+
+
+def case_config_save(config, layers, points, workdir):
+    benchmark_stack(config, layers)
+    filename = os.path.join(workdir, 'save.cgp')
+    return lambda: config.save(filename)
+
+
+def case_config_load(config, layers, points, workdir):
+    benchmark_stack(config, layers)
+    filename = os.path.join(workdir, 'load.cgp')
+    config.save(filename)
+    return lambda: config.load(filename)
+
+
+def case_render(config, layers, points, workdir):
+    """Drawing the reflectivity of the default stack to an Agg canvas"""
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from coatingtk.coating import Coating
+    import plothandler
+    plotter = plothandler.collect_plots(options=False)['r_lambda']['plotter']
+    config.set('plot.r_lambda.xaxis.sampling', 'uniform')
+    config.set('plot.r_lambda.xaxis.steps', points)
+    data = plotter(None).compute(Coating.create_from_config(config))
+
+    def render():
+        figure = Figure(figsize=(8, 6))
+        canvas = FigureCanvasAgg(figure)
+        plotter(figure.add_subplot(111)).draw(data)
+        canvas.draw()
+    return render
+
+
+# name: (case function, uses layers, uses points)
+CASES = OrderedDict([
+    ('reflectivity', (case_reflectivity, True, True)),
+    ('phase', (case_phase, True, True)),
+    ('efi', (case_efi, True, True)),
+    ('datafile', (case_datafile, False, True)),
+    ('config_save', (case_config_save, True, False)),
+    ('config_load', (case_config_load, True, False)),
+    ('render', (case_render, False, True)),
+])
+
+
+def cases(names=None, layers=LAYERS, points=POINTS):
+    """Yields (name, layers, points) of every case of the benchmarks names"""
+    for name in names or CASES.keys():
+        func, use_layers, use_points = CASES[name]
+        for L in (layers if use_layers else [None]):
+            for P in (points if use_points else [None]):
+                yield name, L, P
+
+
+def run(project, names=None, layers=LAYERS, points=POINTS, log=None, **kwargs):
+    """
+    Runs the benchmarks names on the project file project, returns the
+    results. Every case starts from a freshly loaded project. log, if
+    given, is called with the key and result of every case. Further
+    arguments are passed on to measure().
+    """
+    from coatingtk.utils.config import Config
+    from coatingtk.materials import MaterialLibrary
+    import datafile
+
+    datafile.install()
+    config = Config.Instance()
+    results = OrderedDict()
+    workdir = tempfile.mkdtemp()
+    try:
+        for name, L, P in cases(names, layers, points):
+            config.load_default('default.cgp')
+            config.load(project)
+            MaterialLibrary.Instance().load_materials()
+            func = CASES[name][0](config, L, P, workdir)
+            times = sorted(measure(func, **kwargs))
+            result = OrderedDict([
+                ('name', name), ('layers', L), ('points', P),
+                ('best', times[0]), ('median', times[len(times) // 2]),
+                ('repeats', len(times)),
+            ])
+            results[case_key(name, L, P)] = result
+            if log:
+                log(case_key(name, L, P), result)
+    finally:
+        shutil.rmtree(workdir)
+    return results
+
+
+def environment():
+    """Versions and machine the benchmarks ran on"""
+    import matplotlib
+    return OrderedDict([
+        ('python', platform.python_version()),
+        ('numpy', np.__version__),
+        ('matplotlib', matplotlib.__version__),
+        ('platform', platform.platform()),
+        ('processor', platform.processor() or platform.machine()),
+    ])
+
+
+def save(filename, results):
+    report = OrderedDict([
+        ('created', time.strftime('%Y-%m-%d %H:%M:%S')),
+        ('environment', environment()),
+        ('results', results),
+    ])
+    with open(filename, 'w') as fp:
+        json.dump(report, fp, indent=2)
+
+
+def load(filename):
+    """Reads the results written by save()"""
+    with open(filename) as fp:
+        return json.load(fp, object_pairs_hook=OrderedDict)['results']
+
+
+def compare(results, baseline, tolerance=0.25, noise=NOISE):
+    """
+    Compares the best times of results to those of baseline.
+
+    Returns a list of (key, baseline time, time, status) for every case of
+    results, with status 'slower' or 'faster' if the time changed by more
+    than the fraction tolerance and more than noise seconds, 'new' if the
+    case is not in baseline and 'ok' otherwise.
+    """
+    rows = []
+    for key, result in results.items():
+        now = result['best']
+        if key not in baseline:
+            rows.append((key, None, now, 'new'))
+            continue
+        before = baseline[key]['best']
+        status = 'ok'
+        if abs(now - before) > noise:
+            if now > before * (1 + tolerance):
+                status = 'slower'
+            elif now < before / (1 + tolerance):
+                status = 'faster'
+        rows.append((key, before, now, status))
+    return rows
+
+
+def regressions(rows):
+    return [row for row in rows if row[3] == 'slower']
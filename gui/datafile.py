@@ -0,0 +1,178 @@
+#!/usr/bin/env python
+# This work is licensed under the Creative Commons Attribution-NonCommercial-
+# ShareAlike 4.0 International License. To view a copy of this license, visit
+# http://creativecommons.org/licenses/by-nc-sa/4.0/ or send a letter to Creative
+# Commons, PO Box 1866, Mountain View, CA 94042, USA.
+
+"""
+Tabulated data files, e.g. refractive index data of materials.
+
+Files are parsed once and kept in a process-wide cache keyed by path and
+modification time, so materials sharing a data file, and every sweep over
+them, use the same parsed table. Interpolation works on whole arrays.
+coatingtk loads the data files of materials through this cache as well,
+once install() has been called.
+
+The first time a text file is parsed, the table is also written to a binary
+sidecar file next to it (<filename>.npy). Later sessions memory-map the
+sidecar instead of parsing the text again, as long as the size and
+modification time of the text file, which are recorded in the sidecar, are
+unchanged.
+"""
+
+import os
+import numpy as np
+from coatingtk.utils import UnreadableFile, UnexpectedFileLayout
+
+
+def sidecar_name(filename):
+    """Name of the binary sidecar file of the data file filename"""
+    return filename + '.npy'
+
+
+def file_stamp(filename):
+    """Size and modification time of filename"""
+    try:
+        st = os.stat(filename)
+    except OSError as e:
+        raise UnreadableFile(str(e))
+    return (float(st.st_size), st.st_mtime)
+
+
+def read_sidecar(filename, stamp):
+    """
+    Memory-maps the sidecar of filename, returns None if there is no
+    up-to-date sidecar.
+
+    The first row of a sidecar holds the file_stamp() of the text file it
+    was written for, the table follows. A sidecar is only used if that
+    stamp equals stamp, the current one of the text file, so that it is
+    not used for a replaced text file with an older modification time.
+    """
+    try:
+        data = np.load(sidecar_name(filename), mmap_mode='r')
+    except (IOError, OSError, ValueError):
+        return None
+    if data.ndim != 2 or data.shape[1] not in (2, 3) or data.shape[0] < 2:
+        return None
+    if tuple(data[0,:2]) != tuple(stamp):
+        return None
+    return data[1:]
+
+
+def write_sidecar(filename, data, stamp):
+    """
+    Writes data to the sidecar of filename, along with stamp, see
+    read_sidecar(). Failures, e.g. in read-only directories, are ignored,
+    the text file is then parsed again next time.
+    """
+    sidecar = sidecar_name(filename)
+    tmp = sidecar + '.tmp'
+    header = np.zeros((1, data.shape[1]))
+    header[0,:2] = stamp
+    try:
+        with open(tmp, 'wb') as f:
+            np.save(f, np.vstack((header, data)))
+        if os.path.exists(sidecar):
+            os.remove(sidecar)
+        os.rename(tmp, sidecar)
+    except (IOError, OSError):
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+
+def parse(filename):
+    """Parses the text file filename, returns the table sorted by x"""
+    try:
+        with open(filename) as f:
+            data = np.loadtxt(f, ndmin=2)
+    except IOError as e:
+        raise UnreadableFile(str(e))
+    except ValueError as e:
+        raise UnexpectedFileLayout(str(e))
+    if data.shape[0] == 0 or data.shape[1] not in (2, 3):
+        raise UnexpectedFileLayout(filename)
+    return data[np.argsort(data[:,0], kind='mergesort')]
+
+
+class DataFileWrapper(object):
+    """
+    Text file with two or three columns (x, y[, z]), interpolated linearly
+    in x, e.g. wavelength, refractive index and extinction coefficient.
+
+    Lines starting with # are comments. Outside the tabulated range the
+    first or last value is used. If sidecar is True, the table is read from
+    and written to the binary sidecar file, see read_sidecar().
+    """
+    def __init__(self, filename, sidecar=True):
+        data = None
+        if sidecar:
+            # taken before parsing, a file modified meanwhile is parsed again
+            stamp = file_stamp(filename)
+            data = read_sidecar(filename, stamp)
+        if data is None:
+            data = parse(filename)
+            if sidecar:
+                write_sidecar(filename, data, stamp)
+        self.data = data
+        self.columns = data.shape[1]
+        self.x = data[:,0]
+
+    def value(self, x, column=1):
+        """
+        Interpolated value(s) of column at x, which may be a scalar or an
+        array.
+        """
+        x = np.asarray(x, dtype=float)
+        data = self.data[:,column]
+        if len(self.x) == 1:
+            y = np.full(x.shape, data[0])
+        else:
+            i = np.searchsorted(self.x, x).clip(1, len(self.x) - 1)
+            x0, x1 = self.x[i-1], self.x[i]
+            w = ((x - x0) / (x1 - x0)).clip(0.0, 1.0)
+            y = data[i-1] + w * (data[i] - data[i-1])
+        return float(y) if y.ndim == 0 else y
+
+
+# parsed files, {path: (file_stamp(), DataFileWrapper)}
+files = {}
+
+def load(filename):
+    """
+    Returns the DataFileWrapper for filename, parsing the file only if it
+    was not loaded before or has been modified since.
+    """
+    path = os.path.abspath(filename)
+    stamp = file_stamp(path)
+    entry = files.get(path)
+    if entry is None or entry[0] != stamp:
+        entry = (stamp, DataFileWrapper(path))
+        files[path] = entry
+    return entry[1]
+
+
+# coatingtk's own DataFileWrapper classes replaced by install(), by module
+replaced = {}
+
+def install():
+    """
+    Makes coatingtk read the data files of materials with load() instead of
+    its own DataFileWrapper, so that materials sharing a data file share a
+    single parsed table, sidecar files are used, and data files may have a
+    third column with k. Called once at startup, before loading materials.
+    """
+    import coatingtk.utils
+    import coatingtk.materials
+    for module in (coatingtk.utils, coatingtk.materials):
+        wrapper = getattr(module, 'DataFileWrapper', None)
+        if wrapper is not None and wrapper is not load:
+            replaced[module] = wrapper
+            module.DataFileWrapper = load
+
+
+def uninstall():
+    """Restores coatingtk's own DataFileWrapper, see install()"""
+    for module, wrapper in replaced.items():
+        module.DataFileWrapper = wrapper
+    replaced.clear()
@@ -0,0 +1,149 @@
+#!/usr/bin/env python
+# This work is licensed under the Creative Commons Attribution-NonCommercial-
+# ShareAlike 4.0 International License. To view a copy of this license, visit
+# http://creativecommons.org/licenses/by-nc-sa/4.0/ or send a letter to Creative
+# Commons, PO Box 1866, Mountain View, CA 94042, USA.
+
+"""
+Tabulated refractive indices of materials.
+
+A coating usually consists of only a few distinct materials, so instead of
+evaluating the Sellmeier formula or interpolating the data file for every
+layer, every material is evaluated once over the whole wavelength array. The
+result is kept until the material changes or the grid is no longer used.
+"""
+
+import os
+import json
+import numpy as np
+from collections import OrderedDict
+from coatingtk.utils.config import Config
+import datafile
+
+
+def extinction(name):
+    """
+    Constant extinction coefficient k of the material name.
+
+    These are kept in the extinction section of the configuration, next to
+    the material definitions, as coatingtk materials are real-valued.
+    """
+    try:
+        coefficients = Config.Instance().get('extinction')
+    except KeyError:
+        return 0.0
+    return float((coefficients or {}).get(name, 0.0))
+
+
+def remove_extinction(name):
+    """
+    Drops the extinction coefficient of the material name from the
+    configuration, e.g. once the material is deleted, so that a new
+    material of the same name does not absorb.
+    """
+    config = Config.Instance()
+    try:
+        coefficients = dict(config.get('extinction') or {})
+    except KeyError:
+        return
+    if coefficients.pop(name, None) is not None:
+        config.set('extinction', coefficients)
+
+
+def refractive_index(material, wavelength):
+    """
+    Evaluates the complex refractive index of material for an array of
+    wavelengths.
+
+    Absorbing materials are returned as n - ik, the sign convention of the
+    solver. Tabulated materials are interpolated directly from their data
+    file, see datafile.load(), whose optional third column holds k.
+    Otherwise falls back to evaluating point by point if the material
+    cannot handle arrays by itself.
+    """
+    wavelength = np.asarray(wavelength, dtype=float)
+    k = extinction(material.name)
+    try:
+        n_file = material.save().get('n_file')
+    except Exception:
+        n_file = None
+    if n_file:
+        table = datafile.load(n_file)
+        if table.columns > 2:
+            k = table.value(wavelength, column=2)
+        return table.value(wavelength) - 1j * np.asarray(k)
+    try:
+        n = np.asarray(material.n(wavelength), dtype=complex)
+        if n.shape == wavelength.shape:
+            return n - 1j * k
+    except Exception:
+        pass
+    n = [material.n(wl) for wl in wavelength.flat]
+    return np.array(n, dtype=complex).reshape(wavelength.shape) - 1j * k
+
+
+def material_signature(material):
+    """
+    Returns a JSON-serialisable description of material.
+
+    Includes the material definition and, for tabulated materials, the
+    modification time of the data file, so that the signature changes
+    whenever the refractive index might have changed.
+    """
+    k = extinction(material.name)
+    try:
+        definition = material.save()
+    except Exception:
+        return [material.name, k]
+    n_file = definition.get('n_file')
+    mtime = os.path.getmtime(n_file) if n_file and os.path.exists(n_file) else None
+    return [material.name, definition, mtime, k]
+
+
+class DispersionCache(object):
+    """
+    Refractive index arrays per material and wavelength grid.
+
+    Entries are keyed by material name and grid, and remember the material
+    signature they were evaluated for, so a material that was changed in
+    the meantime is evaluated again. invalidate() drops the entries of a
+    material right away, e.g. after editing or deleting it. At most maxsize
+    arrays are kept, the least recently used ones are dropped first.
+    """
+    def __init__(self, maxsize=64):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+
+    def index(self, material, wavelength, grid):
+        """
+        Refractive index of material over wavelength.
+
+        grid identifies the wavelength array, e.g. solver.grid_hash().
+        Repeated calls return the same array object, which must not be
+        modified.
+        """
+        key = (material.name, grid)
+        signature = json.dumps(material_signature(material),
+                               sort_keys=True, default=str)
+        entry = self.entries.pop(key, None)
+        if entry is None or entry[0] != signature:
+            entry = (signature, refractive_index(material, wavelength))
+        self.entries[key] = entry
+        while len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+        return entry[1]
+
+    def invalidate(self, name=None):
+        """Drops all entries of the material name, or all entries"""
+        if name is None:
+            self.entries.clear()
+            return
+        for key in [k for k in self.entries if k[0] == name]:
+            del self.entries[key]
+
+    def __len__(self):
+        return len(self.entries)
+
+
+# refractive indices of all materials evaluated so far
+cache = DispersionCache()
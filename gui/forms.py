@@ -0,0 +1,160 @@
+#!/usr/bin/env python
+# This work is licensed under the Creative Commons Attribution-NonCommercial-
+# ShareAlike 4.0 International License. To view a copy of this license, visit
+# http://creativecommons.org/licenses/by-nc-sa/4.0/ or send a letter to Creative
+# Commons, PO Box 1866, Mountain View, CA 94042, USA.
+
+"""
+Precompiled Qt Designer forms.
+
+Instead of parsing a .ui file with uic.loadUi() every time a window or
+widget is created, every form is compiled to a Python module in
+gui/compiled once, and its form class is kept for the rest of the session.
+The compiled modules record a hash of their .ui file, so that they are
+compiled again when the .ui file changes. If gui/compiled cannot be
+written, e.g. in a frozen build, the form is compiled in memory instead.
+
+Image file names in the forms are relative to their .ui file. uic only
+resolves them against the directory of the .ui file in loadUi(), compiled
+forms open them relative to the current directory, so they are rewritten
+to be relative to the top directory before compiling, see resolve_images().
+
+compile_forms() compiles all forms in advance, see setup.py.
+"""
+
+import os
+import sys
+import glob
+import hashlib
+from StringIO import StringIO
+from importlib import import_module
+from xml.etree import ElementTree
+from PyQt4 import uic
+
+PACKAGE = 'gui.compiled'
+DIRECTORY = os.path.join('gui', 'compiled')
+
+# form classes loaded so far, by .ui file
+forms = {}
+
+# elements of .ui files holding the file name of an image
+IMAGE_TAGS = ('pixmap', 'iconset', 'normaloff', 'normalon', 'disabledoff',
+              'disabledon', 'activeoff', 'activeon', 'selectedoff', 'selectedon')
+
+
+def ui_hash(filename):
+    with open(filename, 'rb') as fp:
+        return hashlib.sha1(fp.read()).hexdigest()
+
+
+def form_class(module):
+    """The Ui_* class generated by pyuic in module"""
+    for name, value in vars(module).iteritems():
+        if name.startswith('Ui_'):
+            return value
+    raise ImportError('no form class in ' + module.__name__)
+
+
+def image_path(path, directory):
+    """path of an image relative to directory, Qt resources are left alone"""
+    if path is None or not path.strip():
+        return path
+    path = path.strip()
+    if path.startswith(':') or os.path.isabs(path):
+        return path
+    return os.path.join(directory, path).replace(os.sep, '/')
+
+
+def resolve_images(filename):
+    """
+    Returns the contents of the .ui file filename as a file object, with
+    the file names of all images made relative to the current directory.
+    """
+    tree = ElementTree.parse(filename)
+    directory = os.path.dirname(filename)
+    for element in tree.iter():
+        if element.tag not in IMAGE_TAGS:
+            continue
+        element.text = image_path(element.text, directory)
+        if element.tag == 'iconset':
+            # old style file name of the iconset, after its normaloff etc.
+            for child in element:
+                child.tail = image_path(child.tail, directory)
+    stream = StringIO(ElementTree.tostring(tree.getroot(), 'utf-8'))
+    # pyuic names the .ui file in the header of the compiled module
+    stream.name = filename
+    return stream
+
+
+def compile_form(filename, digest=None):
+    """
+    Compiles the .ui file filename to a module in gui/compiled and returns
+    the module name.
+    """
+    digest = digest or ui_hash(filename)
+    name = os.path.splitext(os.path.basename(filename))[0]
+    if not os.path.isdir(DIRECTORY):
+        os.makedirs(DIRECTORY)
+    init = os.path.join(DIRECTORY, '__init__.py')
+    if not os.path.exists(init):
+        open(init, 'w').close()
+    target = os.path.join(DIRECTORY, name + '.py')
+    with open(target, 'w') as fp:
+        uic.compileUi(resolve_images(filename), fp)
+        fp.write('\nUI_HASH = {0!r}\n'.format(digest))
+    # the compiled module of an older .ui file must not be picked up again
+    for ext in ('.pyc', '.pyo'):
+        if os.path.exists(target[:-3] + ext):
+            os.remove(target[:-3] + ext)
+    return PACKAGE + '.' + name
+
+
+def load_compiled(filename, digest):
+    """The compiled module of filename, if it is up to date, else None"""
+    name = PACKAGE + '.' + os.path.splitext(os.path.basename(filename))[0]
+    try:
+        module = import_module(name)
+    except ImportError:
+        return None
+    if getattr(module, 'UI_HASH', None) != digest:
+        return None
+    return module
+
+
+def load_form(filename):
+    """
+    Returns the form class of the .ui file filename, from its compiled
+    module, which is created or updated if necessary.
+    """
+    if filename not in forms:
+        digest = ui_hash(filename)
+        module = load_compiled(filename, digest)
+        if module is None:
+            try:
+                name = compile_form(filename, digest)
+                if name in sys.modules:
+                    module = reload(sys.modules[name])
+                else:
+                    module = import_module(name)
+            except (IOError, OSError, ImportError):
+                forms[filename] = uic.loadUiType(resolve_images(filename))[0]
+                return forms[filename]
+        forms[filename] = form_class(module)
+    return forms[filename]
+
+
+def setup_form(widget, filename):
+    """
+    Builds the form of filename on widget, like uic.loadUi(filename, widget)
+    does, and connects the slots of widget by name.
+    """
+    form = load_form(filename)()
+    form.setupUi(widget)
+    widget.__dict__.update(form.__dict__)
+    return widget
+
+
+def compile_forms():
+    """Compiles all forms in gui and gui/plots, returns the module names"""
+    filenames = glob.glob('gui/ui_*.ui') + glob.glob('gui/plots/ui_*.ui')
+    return [compile_form(fn) for fn in sorted(filenames)]
@@ -6,7 +6,6 @@
 
 import numpy as np
 from contextlib import contextmanager
-from PyQt4.QtGui import QMessageBox
 from version import version_string
 
 
@@ -36,6 +35,43 @@ def export_data(filename, xdata, ydata, labels):
     header = version_string + "\n\n" + "\t".join(labels)
     np.savetxt(filename, data.T, delimiter="\t", fmt='%.5g', header=header)
 
+def figure_data(figure):
+    """
+    Collects the data of all lines in figure, for use with export_data.
+
+    Returns xdata, ydata and labels, where the labels are the x axis label
+    followed by the legend entries.
+    """
+    xdata = []
+    ydata = []
+    labels = []
+    xlabel = ''
+    for ax in figure.axes:
+        if not xlabel:
+            xlabel = ax.get_xlabel()
+        legend = ax.get_legend()
+        if legend:
+            for t in legend.get_texts():
+                labels.append(t.get_text())
+        for line in ax.lines:
+            xdata.append(line.get_xdata())
+            ydata.append(line.get_ydata())
+    
+    labels.insert(0, xlabel)
+    # TODO: y labels, plot title?
+    return xdata, ydata, labels
+
+def plot_data(plot, data, figure):
+    """
+    Collects the data of plot for use with export_data, from its
+    export_data() method if it provides one, else from the lines in figure.
+    data is the result of plot.compute(), plot may be None.
+    """
+    exported = plot.export_data(data) if plot is not None else None
+    if exported is not None:
+        return exported
+    return figure_data(figure)
+
 def get_designations(coating, lambda0):
     materials = [l.material for l in coating.layers]
     material_names = list(set([m.name for m in materials]))
@@ -91,10 +127,12 @@ def to_float(number):
     return '{0:g}'.format(number)
     
 def int_conversion_error(text, parent=None):
+    from PyQt4.QtGui import QMessageBox
     QMessageBox.critical(parent, 'Conversion Error',
        'The input "{0}" could not be converted to an integer number.'.format(text))
 
 def float_conversion_error(text, parent=None):
+    from PyQt4.QtGui import QMessageBox
     QMessageBox.critical(parent, 'Conversion Error',
         'The input "{0}" could not be converted to an integer number.'.format(text))
 
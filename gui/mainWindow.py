@@ -9,18 +9,27 @@ import re
 from os.path import basename, splitext
 from PyQt4.QtCore import *
 from PyQt4.QtGui import *
-from PyQt4 import uic
 
+import forms
 import plothandler
 import wizard
+import dispersion
 from version import version_number, version_string, compare_versions
-from coatingtk.materials import MaterialLibrary
+from coatingtk.materials import MaterialLibrary, MaterialNotDefined
 from coatingtk.coating import Coating
 from coatingtk.utils.config import Config
-from helpers import export_data, block_signals, float_set_from_lineedit, export_stack_formula
+from helpers import export_data, plot_data, block_signals, float_set_from_lineedit, export_stack_formula
 
 from materialDialog import MaterialDialog
 from wizard import Wizard
+from worker import PlotWorker
+from profiling import profiler, format_duration
+
+# delay (ms) after the last change before a live update starts
+LIVE_UPDATE_DELAY = 300
+
+# timing spans of a plot update, shown in the status bar
+PLOT_SPANS = ['coating', 'materials', 'compute', 'draw']
 
 def add_extension_if_missing(filename, ext):
     if filename.endswith(ext):
@@ -31,10 +40,12 @@ def add_extension_if_missing(filename, ext):
 class MainWindow(QMainWindow):
     def __init__(self, options, parent=None):
         super(MainWindow, self).__init__(parent)
-        self.config = Config.Instance()
-        self.config.load_default('default.cgp')
-        self.materials = MaterialLibrary.Instance()
-        uic.loadUi('gui/ui_mainWindow.ui', self)
+        with profiler.span('startup.config'):
+            self.config = Config.Instance()
+            self.config.load_default('default.cgp')
+            self.materials = MaterialLibrary.Instance()
+        with profiler.span('startup.forms'):
+            forms.setup_form(self, 'gui/ui_mainWindow.ui')
  
         self.plotHandle = self.pltMain.figure.add_subplot(111)
         color = self.palette().color(QPalette.Background)
@@ -47,25 +58,43 @@ class MainWindow(QMainWindow):
         self.config.set_callback(self.handle_modified)
 
         self.empty_plotoptions_widget = self.gbPlotWidget.layout().itemAt(0).widget()
-        self.plots = plothandler.collect_plots()
+        with profiler.span('startup.plots'):
+            self.plots = plothandler.collect_plots()
+        self.plot_widgets = {}
+        self.worker = None
+        self.live_plot = False
+        self.pending_update = False
+        self.current_plot = None
+        self.current_data = None
+
+        self.live_timer = QTimer(self)
+        self.live_timer.setSingleShot(True)
+        self.live_timer.setInterval(LIVE_UPDATE_DELAY)
+        self.live_timer.timeout.connect(self.live_update)
 
         if options['project']:
             try:
                 fn = add_extension_if_missing(options['project'], '.cgp')
-                self.config.load(fn)
+                with profiler.span('startup.project'):
+                    self.config.load(fn)
             except IOError, e:
                 QMessageBox.critical(self, 'Could not open file', str(e))
         
-        self.initialise_plotoptions()
-        self.initialise_materials()
-        self.initialise_stack()
+        with profiler.span('startup.options'):
+            self.initialise_plotoptions()
+        with profiler.span('startup.materials'):
+            self.initialise_materials()
+        with profiler.span('startup.stack'):
+            self.initialise_stack()
 
         geometry = self.config.get('window_geometry')
         if geometry:
             geometry = QByteArray.fromHex(self.config.get('window_geometry'))
             self.restoreGeometry(geometry)
 
-        self.stbStatus.showMessage(version_string)
+        profiler.record('startup', profiler.uptime())
+        self.stbStatus.showMessage('{0} - started in {1}'.format(version_string,
+            format_duration(profiler.last['startup'])))
 
     def update_title(self, filename=None, changed=False):
         if changed:
@@ -91,6 +120,8 @@ class MainWindow(QMainWindow):
             setplot = self.config.get('plot.plottype')
             cb.setCurrentIndex(cb.findData(setplot))
             self.update_plot_widget(setplot)
+        with block_signals(self.chkLiveUpdate) as chk:
+            chk.setChecked(bool(self.config.get('plot.live_update')))
         
     def initialise_stack(self):
         with block_signals(self.cbSuperstrate) as cb:
@@ -146,6 +177,9 @@ class MainWindow(QMainWindow):
             if reply == QMessageBox.No:
                 event.ignore()
                 return
+        if self.worker:
+            self.worker.cancel()
+            self.worker.wait()
         event.accept()
 
     def float_conversion_error(self, text):
@@ -157,6 +191,10 @@ class MainWindow(QMainWindow):
     @pyqtSlot()
     def handle_modified(self):
         self.update_title(changed=True)
+        if self.chkLiveUpdate.isChecked():
+            # restart the timer, so that a burst of changes
+            # only triggers a single update
+            self.live_timer.start()
 
     # matplotlib slot
     def mpl_on_mouse_move(self, event):
@@ -170,33 +208,125 @@ class MainWindow(QMainWindow):
 
     @pyqtSlot()
     def on_btnUpdate_clicked(self):
+        if self.worker:
+            # while a full calculation is running, the button cancels it,
+            # a live update is replaced by a full one once cancelled
+            if self.live_plot:
+                self.pending_update = True
+                self.live_timer.stop()
+            self.worker.cancel()
+            return
+        self.start_plot()
+
+    @pyqtSlot(bool)
+    def on_chkLiveUpdate_toggled(self, checked):
+        self.config.set('plot.live_update', int(checked))
+
+    @pyqtSlot()
+    def live_update(self):
+        if not self.chkLiveUpdate.isChecked():
+            return
+        if self.worker:
+            # results would be outdated, so restart once cancelled
+            self.worker.cancel()
+            self.live_timer.start()
+            return
+        self.start_plot(live=True)
+
+    def start_plot(self, live=False):
+        """
+        Starts calculating the current plot in the background. Live updates
+        report errors in the status bar instead of a message box.
+        """
+        profiler.forget(PLOT_SPANS)
         try:
-            coating = self.build_coating()
-        except materials.MaterialNotDefined as e:
-            QMessageBox.critical(self, 'Material Error', str(e))
+            with profiler.span('coating'):
+                coating = self.build_coating()
+        except MaterialNotDefined as e:
+            if live:
+                self.stbStatus.showMessage(str(e))
+            else:
+                QMessageBox.critical(self, 'Material Error', str(e))
             return
         idx = self.cbPlotType.currentIndex()
-        plot = str(self.cbPlotType.itemData(idx).toString())
+        name = str(self.cbPlotType.itemData(idx).toString())
+
+        klass = self.plots[name]['plotter']
+        self.live_plot = live
+        plot = klass()
+        plot.live = live
+        self.worker = PlotWorker(plot, coating, self)
+        self.worker.progress.connect(self.plot_progress)
+        self.worker.computed.connect(self.plot_computed)
+        self.worker.failed.connect(self.plot_failed)
+        self.worker.finished.connect(self.plot_finished)
+        if not live:
+            self.btnUpdate.setText('Cancel')
+            self.stbStatus.showMessage('Calculating...')
+        self.worker.start()
 
-        self.pltMain.figure.clear()
-        self.plotHandle = self.pltMain.figure.add_subplot(111)
-        klass = self.plots[plot]['plotter']
-        plot = klass(self.plotHandle)
-        plot.plot(coating)
-        self.pltMain.draw()
+    @pyqtSlot(int)
+    def plot_progress(self, percent):
+        self.stbStatus.showMessage('Calculating... {0}%'.format(percent))
+
+    @pyqtSlot(object)
+    def plot_computed(self, data):
+        plot = self.worker.plot
+        with profiler.span('draw'):
+            # repeated updates of the same plot only replace the curves
+            if (type(self.current_plot) is type(plot) and
+                    self.current_plot.redraw(data)):
+                self.pltMain.blit_animated()
+            else:
+                self.pltMain.set_animated([])
+                self.pltMain.figure.clear()
+                self.plotHandle = self.pltMain.figure.add_subplot(111)
+                plot.set_handle(self.plotHandle)
+                plot.draw(data)
+                self.current_plot = plot
+                self.pltMain.set_animated(plot.lines)
+                self.pltMain.draw()
+            self.current_data = data
+        self.stbStatus.showMessage('Done ({0})'.format(
+            profiler.summary(PLOT_SPANS)))
+
+    @pyqtSlot(str)
+    def plot_failed(self, message):
+        if self.live_plot:
+            self.stbStatus.showMessage(message)
+        else:
+            QMessageBox.critical(self, 'Calculation Error', message)
+
+    @pyqtSlot()
+    def plot_finished(self):
+        if self.worker.cancelled and not self.live_plot:
+            self.stbStatus.showMessage('Calculation cancelled')
+        self.worker = None
+        self.btnUpdate.setText('Update Plot')
+        if self.pending_update:
+            self.pending_update = False
+            self.start_plot()
 
     @pyqtSlot(str)
     def update_plot_widget(self, plot):
-        # if plot has it's own widget, then load it
-        klass = self.plots[plot]['options']
-        if klass:
-            widget = klass(self.gbPlotWidget)
+        # if plot has it's own widget, then load it; widgets are kept for
+        # every plot type and only refreshed from the config when shown again
+        widget = self.plot_widgets.get(plot)
+        if widget:
+            widget.initialise_options()
         else:
-            widget = self.empty_plotoptions_widget
+            klass = self.plots[plot]['options']
+            if klass:
+                widget = klass(self.gbPlotWidget)
+                self.plot_widgets[plot] = widget
+            else:
+                widget = self.empty_plotoptions_widget
 
         old_widget = self.gbPlotWidget.layout().takeAt(0).widget()
-        old_widget.setParent(None)
+        if old_widget is not widget:
+            old_widget.hide()
         self.gbPlotWidget.layout().addWidget(widget)
+        widget.show()
         self.gbPlotWidget.update()
         
     ### SLOTS - STACK TAB
@@ -255,7 +385,7 @@ class MainWindow(QMainWindow):
                     t_lox = xlambda * lambda0/mat.n(lambda0)
                     with block_signals(self.tblStack) as tbl:
                         tbl.item(row, col).setText('{:.1f}'.format(t_lox))
-                except materials.MaterialNotDefined:
+                except MaterialNotDefined:
                     pass
 
         self.config.set('coating.layers', self.get_layers())
@@ -322,7 +452,9 @@ class MainWindow(QMainWindow):
         row = self.lstMaterials.currentRow()
         if row >= 0:
             material = str(self.lstMaterials.item(row).text())
-            materials.MaterialLibrary.Instance().unregister(material)
+            MaterialLibrary.Instance().unregister(material)
+            dispersion.cache.invalidate(material)
+            dispersion.remove_extinction(material)
             self.lstMaterials.takeItem(row)
             self.cbSuperstrate.removeItem(self.cbSuperstrate.findText(material))
             self.cbSubstrate.removeItem(self.cbSubstrate.findText(material))
@@ -344,7 +476,7 @@ class MainWindow(QMainWindow):
         if filename:
             try:
                 coating = self.build_coating()
-            except materials.MaterialNotDefined as e:
+            except MaterialNotDefined as e:
                 QMessageBox.critical(self, 'Material Error', str(e))
                 return
             export_stack_formula(coating, self.config.get('coating.lambda0'),
@@ -352,23 +484,8 @@ class MainWindow(QMainWindow):
 
     @pyqtSlot()
     def on_actionExportData_triggered(self):
-        xdata = []
-        ydata = []
-        labels = []
-        xlabel = ''
-        for ax in self.pltMain.figure.axes:
-            if not xlabel:
-                xlabel = ax.get_xlabel()
-            legend = ax.get_legend()
-            if legend:
-                for t in legend.get_texts():
-                    labels.append(t.get_text())
-            for line in ax.lines:
-                xdata.append(line.get_xdata())
-                ydata.append(line.get_ydata())
-        
-        labels.insert(0, xlabel)
-        # TODO: y labels, plot title?
+        xdata, ydata, labels = plot_data(self.current_plot, self.current_data,
+                                         self.pltMain.figure)
 
         if len(ydata) == 0:
             QMessageBox.information(self, 'Empty plot not exported',
@@ -380,6 +497,14 @@ class MainWindow(QMainWindow):
         if filename:
             export_data(str(filename), xdata, ydata, labels)
 
+    @pyqtSlot()
+    def on_actionSaveProfile_triggered(self):
+        filename = QFileDialog.getSaveFileName(self, 'Save Profile',
+                            splitext(self.filename)[0]+'_profile.json', 'Timings (*.json)');
+        if filename:
+            written = profiler.dump(str(filename))
+            self.stbStatus.showMessage('Wrote ' + ', '.join(written))
+
     @pyqtSlot()
     def on_actionSave_triggered(self):
         filename = str(QFileDialog.getSaveFileName(self, 'Save Coating Project',
@@ -6,10 +6,11 @@
 
 from PyQt4.QtCore import *
 from PyQt4.QtGui import *
-from PyQt4 import uic
+import forms
 from coatingtk.utils.config import Config
 from coatingtk.materials import MaterialLibrary
 from helpers import to_float
+import dispersion
 import math
 
 class UnnamedMaterialException(Exception):
@@ -28,10 +29,19 @@ def get_float(txt, default=0.0):
 class MaterialDialog(QDialog):
     def __init__(self, parent=None):
         super(MaterialDialog, self).__init__(parent)
-        uic.loadUi('gui/ui_dialogMaterial.ui', self)
+        forms.setup_form(self, 'gui/ui_dialogMaterial.ui')
         self.materials = MaterialLibrary.Instance()
+        self.config = Config.Instance()
         self.old_name = ''
 
+    def accept(self):
+        # n - ik with k < 0 would amplify the light
+        if get_float(self.txtExtinction.text()) < 0:
+            QMessageBox.critical(self, 'Invalid Extinction Coefficient',
+                'The extinction coefficient k must not be negative.')
+            return
+        super(MaterialDialog, self).accept()
+
     def load_material(self, material=None):
         if material:
             #TODO: probably directly talk to material classes instead of abusing save()
@@ -42,6 +52,7 @@ class MaterialDialog(QDialog):
             self.txtNotes.setPlainText(mat['notes'])
             self.load_optical_properties(mat)
             self.load_mechanical_properties(mat)
+            self.txtExtinction.setText(to_float(dispersion.extinction(material)))
         else:
             self.txtName.setText('New Material')
 
@@ -82,8 +93,11 @@ class MaterialDialog(QDialog):
         
         if self.old_name:
             self.materials.unregister(self.old_name)
+            dispersion.cache.invalidate(self.old_name)
+        dispersion.cache.invalidate(material)
         self.materials.load_materials({material: mat})
         self.materials.save_material(material)
+        self.save_extinction(material)
 
     def save_optical_properties(self, mat):
         B = [0.0, 0.0, 0.0]
@@ -102,6 +116,20 @@ class MaterialDialog(QDialog):
         mat['C'] = C
         return mat
 
+    def save_extinction(self, material):
+        # coatingtk materials are real-valued, so k is kept separately
+        try:
+            extinction = dict(self.config.get('extinction') or {})
+        except KeyError:
+            extinction = {}
+        extinction.pop(self.old_name, None)
+        k = get_float(self.txtExtinction.text())
+        if k:
+            extinction[material] = k
+        else:
+            extinction.pop(material, None)
+        self.config.set('extinction', extinction)
+
     def save_mechanical_properties(self, mat):
         mat['Y'] = get_float(self.txtY.text())*1e9
         mat['sigma'] = get_float(self.txtSigma.text())
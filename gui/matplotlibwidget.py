@@ -85,6 +85,39 @@ class MatplotlibWidget(Canvas):
         Canvas.setSizePolicy(self, QSizePolicy.Expanding, QSizePolicy.Expanding)
         Canvas.updateGeometry(self)
 
+        # artists that are blitted on top of the cached background
+        self.animated = []
+        self.background = None
+
+    def set_animated(self, artists):
+        """
+        Marks artists as animated: they are left out of the background
+        and can be redrawn quickly with blit_animated().
+        """
+        for artist in self.animated:
+            artist.set_animated(False)
+        self.animated = list(artists)
+        for artist in self.animated:
+            artist.set_animated(True)
+
+    def draw(self):
+        Canvas.draw(self)
+        self.background = self.copy_from_bbox(self.figure.bbox)
+        self.draw_animated()
+
+    def draw_animated(self):
+        for artist in self.animated:
+            artist.axes.draw_artist(artist)
+        self.blit(self.figure.bbox)
+
+    def blit_animated(self):
+        """Redraws only the animated artists on top of the background"""
+        if self.background is None:
+            self.draw()
+            return
+        self.restore_region(self.background)
+        self.draw_animated()
+
     def sizeHint(self):
         w, h = self.get_width_height()
         return QSize(w, h)
@@ -0,0 +1,157 @@
+#!/usr/bin/env python
+# This work is licensed under the Creative Commons Attribution-NonCommercial-
+# ShareAlike 4.0 International License. To view a copy of this license, visit
+# http://creativecommons.org/licenses/by-nc-sa/4.0/ or send a letter to Creative
+# Commons, PO Box 1866, Mountain View, CA 94042, USA.
+
+"""
+Fits the layer thicknesses of a coating to a target reflectivity.
+
+Targets are given as text, one per line:
+
+    # wavelength (nm)  AOI (deg)  pol (s, p or avg)  R  [weight]
+    1064        0   s    0.9999
+    900:1000:21 45  avg  0.0     0.1
+
+A wavelength range start:stop[:points] defines a spectral band, sampled at
+the given number of points (default 11). The thicknesses are then fitted
+with a damped least-squares (Levenberg-Marquardt) method, using the
+analytic derivatives of the reflectivity from solver.gradient().
+"""
+
+import numpy as np
+import solver
+
+POLARISATIONS = {'s': 0, 'p': 1, 'avg': 2}
+
+
+class TargetError(ValueError):
+    pass
+
+
+def parse_targets(text):
+    """
+    Parses the target definition text, see above.
+
+    Returns a dict of arrays 'wavelength', 'AOI', 'pol', 'R' and 'weight',
+    with one entry per target point. Raises TargetError for invalid lines.
+    """
+    columns = dict((key, []) for key in ('wavelength', 'AOI', 'pol', 'R', 'weight'))
+    for lineno, line in enumerate(text.splitlines(), 1):
+        fields = line.split('#')[0].split()
+        if not fields:
+            continue
+        try:
+            if len(fields) not in (4, 5) or fields[2] not in POLARISATIONS:
+                raise ValueError()
+            band = [float(v) for v in fields[0].split(':')]
+            if len(band) == 1:
+                wavelength = band
+            elif len(band) in (2, 3):
+                points = int(band[2]) if len(band) == 3 else 11
+                wavelength = np.linspace(band[0], band[1], points)
+            else:
+                raise ValueError()
+            weight = float(fields[4]) if len(fields) == 5 else 1.0
+            values = [float(fields[1]), POLARISATIONS[fields[2]],
+                      float(fields[3]), weight]
+        except ValueError:
+            raise TargetError('Invalid target in line {0}: {1}'.format(lineno, line))
+        for wl in wavelength:
+            columns['wavelength'].append(wl)
+            for key, value in zip(('AOI', 'pol', 'R', 'weight'), values):
+                columns[key].append(value)
+    if not columns['wavelength']:
+        raise TargetError('No targets defined')
+    targets = dict((key, np.array(value, dtype=float)) for key, value in columns.items())
+    targets['pol'] = targets['pol'].astype(int)
+    return targets
+
+
+def reflectivity(n, d, targets):
+    """
+    Reflectivity at the target points and its derivatives by every layer
+    thickness, returns arrays of shape (points,) and (points, layers).
+    """
+    r, dr = solver.gradient(n, d, targets['wavelength'], targets['AOI'])
+    R = [np.abs(r[pol])**2 for pol in ('s', 'p')]
+    J = [2 * np.real(np.conj(r[pol])[:, np.newaxis] * dr[pol]) for pol in ('s', 'p')]
+    R.append(0.5 * (R[0] + R[1]))
+    J.append(0.5 * (J[0] + J[1]))
+    pol = targets['pol']
+    return np.choose(pol, R), np.choose(pol[:, np.newaxis], J)
+
+
+def target_reflectivity(n, d, targets):
+    """
+    Reflectivity at the target points, without derivatives.
+
+    The thicknesses in d may be arrays of shape (candidates, 1), to evaluate
+    many designs with the same layer materials at once. The result then has
+    the shape (candidates, points).
+    """
+    r = solver.propagate(n, d, targets['wavelength'], targets['AOI']).r
+    Rs, Rp = np.abs(r['s'])**2, np.abs(r['p'])**2
+    return np.choose(targets['pol'], [Rs, Rp, 0.5 * (Rs + Rp)])
+
+
+def merit_function(n, d, targets):
+    """
+    Merit function, the weighted sum of squared deviations from the targets.
+
+    Takes the same arguments as target_reflectivity(), returns one merit value per
+    candidate.
+    """
+    R = target_reflectivity(n, d, targets)
+    return np.sum((targets['weight'] * (R - targets['R']))**2, axis=-1)
+
+
+def optimise(n, d, targets, iterations=200, tolerance=1e-10, progress=None):
+    """
+    Fits the layer thicknesses d to targets, starting from d.
+
+    n is the list of refractive indices at the target wavelengths, see
+    solver.stack_indices(). Thicknesses are kept non-negative. Returns the
+    fitted thicknesses and the final merit function, the weighted sum of
+    squared deviations from the targets. progress is called after every
+    iteration and may raise solver.Cancelled.
+    """
+    d = np.array(d, dtype=float)
+    weight = targets['weight']
+    if not len(d):
+        return d, merit_function(n, d, targets)
+
+    def residuals(d):
+        return weight * (target_reflectivity(n, d, targets) - targets['R'])
+
+    def jacobian(d):
+        return weight[:, np.newaxis] * reflectivity(n, d, targets)[1]
+
+    res = residuals(d)
+    J = jacobian(d)
+    merit = np.dot(res, res)
+    damping = 1e-3
+    for iteration in range(iterations):
+        if progress:
+            progress(iteration / float(iterations))
+        g = np.dot(J.T, res)
+        H = np.dot(J.T, J)
+        scale = np.diag(H) + 1e-12 * max(np.max(np.diag(H)), 1e-300)
+        # rejected steps only need the reflectivity, not its derivatives
+        while damping < 1e12:
+            step = np.linalg.solve(H + damping * np.diag(scale), -g)
+            d_new = np.maximum(d + step, 0.0)
+            res_new = residuals(d_new)
+            merit_new = np.dot(res_new, res_new)
+            if merit_new < merit:
+                break
+            damping *= 10.0
+        else:
+            break
+        improvement = merit - merit_new
+        d, res, merit = d_new, res_new, merit_new
+        damping = max(damping / 10.0, 1e-12)
+        if improvement <= tolerance * max(merit, 1e-300):
+            break
+        J = jacobian(d)
+    return d, merit
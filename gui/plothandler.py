@@ -5,17 +5,76 @@
 # Commons, PO Box 1866, Mountain View, CA 94042, USA.
 
 import os
+import ast
 from glob import glob
 from importlib import import_module
 
-def collect_plots():
+# keys of the plot info provided by the plot_*.py and options_*.py modules
+MODULE_KEYS = {
+    'plotter': 'plot_',
+    'options': 'options_',
+}
+
+
+class PlotInfo(dict):
+    """
+    Info of a single plot, as given in the info dict of its modules.
+
+    Starts out with the description only. The plotter and options are
+    imported from the plot_*.py or options_*.py module the first time they
+    are looked up, as long as they are in modules.
+    """
+    def __init__(self, name, ui_name, description, modules=MODULE_KEYS):
+        super(PlotInfo, self).__init__(description=description)
+        self.name = name
+        self.ui_name = ui_name
+        self.modules = modules
+
+    def __missing__(self, key):
+        if key not in self.modules:
+            raise KeyError(key)
+        m = import_module('gui.plots.'+self.modules[key]+self.ui_name)
+        self.update(m.info[self.name])
+        return dict.__getitem__(self, key)
+
+
+def read_descriptions(filename):
+    """
+    Reads the plot names and descriptions from the info dict of the plot
+    module filename, without importing it.
+    """
+    with open(filename) as fp:
+        tree = ast.parse(fp.read(), filename)
+    descriptions = {}
+    for node in tree.body:
+        if not (isinstance(node, ast.Assign) and isinstance(node.value, ast.Dict) and
+                any(getattr(t, 'id', None) == 'info' for t in node.targets)):
+            continue
+        for key, value in zip(node.value.keys, node.value.values):
+            entries = dict(zip([getattr(k, 's', None) for k in value.keys], value.values))
+            description = entries.get('description')
+            descriptions[key.s] = getattr(description, 's', key.s)
+    return descriptions
+
+
+def collect_plots(options=True):
+    """
+    Collects the available plots from gui/plots. Every plot_*.py module
+    provides the plotter, and the corresponding options_*.py module the
+    Qt widget for its options. Without options, PyQt4 is not imported.
+
+    Only the descriptions are read here, the modules are imported when the
+    plotter or options of a plot are first used, see PlotInfo.
+    """
+    modules = MODULE_KEYS if options else {'plotter': MODULE_KEYS['plotter']}
     plots = {}
     for fn in glob('gui/plots/ui_*.ui'):
         mod = os.path.basename(os.path.splitext(fn)[0])
-        mod = mod.replace('ui_plot', 'plot_')
-        m = import_module('gui.plots.'+mod)
-        plots.update(m.info)
+        ui_name = mod.replace('ui_plot', '')
+        plot_module = os.path.join(os.path.dirname(fn), 'plot_'+ui_name+'.py')
+        for name, description in read_descriptions(plot_module).iteritems():
+            plots[name] = PlotInfo(name, ui_name, description, modules)
     return plots
 
 if __name__ == '__main__':
-    print collect_plots()
\ No newline at end of file
+    print collect_plots()
@@ -0,0 +1,21 @@
+#!/usr/bin/env python
+# This work is licensed under the Creative Commons Attribution-NonCommercial-
+# ShareAlike 4.0 International License. To view a copy of this license, visit
+# http://creativecommons.org/licenses/by-nc-sa/4.0/ or send a letter to Creative
+# Commons, PO Box 1866, Mountain View, CA 94042, USA.
+
+from PyQt4.QtCore import *
+from PyQt4.QtGui import *
+from coatingtk.utils.config import Config
+from gui import forms
+
+class BasePlotOptionWidget(QWidget):
+    def __init__(self, name, parent):
+        super(BasePlotOptionWidget, self).__init__(parent)
+        ui_name = name if name.isupper() else name.title()
+        forms.setup_form(self, 'gui/plots/ui_plot'+ui_name+'.ui')
+        self.config = Config.Instance().view('plot.'+name)
+        self.initialise_options()
+
+    def initialise_options(self):
+        pass
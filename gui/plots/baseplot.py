@@ -5,23 +5,10 @@
 # Commons, PO Box 1866, Mountain View, CA 94042, USA.
 
 import abc
-from PyQt4.QtCore import *
-from PyQt4.QtGui import *
-from PyQt4 import uic
+import numpy as np
 from coatingtk.utils.config import Config
 from gui.version import version_string
 
-class BasePlotOptionWidget(QWidget):
-    def __init__(self, name, parent):
-        super(BasePlotOptionWidget, self).__init__(parent)
-        ui_name = name if name.isupper() else name.title()
-        uic.loadUi('gui/plots/ui_plot'+ui_name+'.ui', self)
-        self.config = Config.Instance().view('plot.'+name)
-        self.initialise_options()
-
-    def initialise_options(self):
-        pass
-
 class BasePlot(object):
     """Base class for plots"""
 
@@ -36,15 +23,105 @@ class BasePlot(object):
               '#8EBA42',
               '#FFB5B8']
     
-    def __init__(self, name, handle):
+    def __init__(self, name, handle=None):
+        self.handle = None
+        self.lines = []
+        self.drawn_layout = None
+        # set for live updates, which may keep intermediate results for the
+        # next update, see solver.solve()
+        self.live = False
+        if handle:
+            self.set_handle(handle)
+        self.config = Config.Instance().view('plot.'+name)
+
+    def set_handle(self, handle):
         self.handle = handle
         self.handle.set_color_cycle(self.colors)
-        self.config = Config.Instance().view('plot.'+name)
 
     @abc.abstractmethod
-    def plot(self, coating):
+    def compute(self, coating, progress=None):
+        """
+        Calculates the plot data for coating and returns it.
+
+        Must not touch the plot handle, as it may run in a background
+        thread. progress is passed on to the solver, see solver.propagate().
+        """
         pass
 
+    @abc.abstractmethod
+    def draw(self, data):
+        """
+        Draws data, as returned by compute(), into the plot handle.
+
+        Plots that support redraw() keep the curves in self.lines and the
+        result of layout() in self.drawn_layout.
+        """
+        pass
+
+    def plot(self, coating):
+        self.draw(self.compute(coating))
+
+    def layout(self, data):
+        """
+        Describes the static parts of the plot for data, like axis limits,
+        scales and markers. Returns None if the plot cannot be updated in
+        place.
+        """
+        return None
+
+    def export_data(self, data):
+        """
+        Returns the data to be exported for data, as returned by compute(),
+        in the form of helpers.figure_data(), or None to export the lines
+        of the figure instead. Plots that do not show their results as
+        lines, e.g. as images or bands, provide them here.
+        """
+        return None
+
+    def line_data(self, data):
+        """Returns X and the columns of Y to be shown in self.lines"""
+        raise NotImplementedError
+
+    def redraw(self, data):
+        """
+        Updates the curves drawn by draw() in place with new data.
+
+        Returns False if the static parts of the plot changed, in which case
+        it needs to be drawn from scratch.
+        """
+        layout = self.layout(data)
+        if layout is None or layout != self.drawn_layout:
+            return False
+        X, Y = self.line_data(data)
+        for line, y in zip(self.lines, Y.T):
+            line.set_data(X, y)
+        return True
+
+    def scale_reflectivity(self, Y):
+        """
+        Applies the y axis options to reflectivity data, returns the
+        converted data and the y axis limits.
+        """
+        auto_y = self.config.get('yaxis.limits') == 'auto'
+        
+        if auto_y:
+            ylim = [0, 1]
+        else:
+            ylim = [self.config.get('yaxis.min'),
+                    self.config.get('yaxis.max')]
+            
+        # convert to inverse log scale, i.e. where the values close to unity
+        # are zoomed in, instead of the values close to zero
+        if self.config.get('yaxis.scale') == 'log':
+            Y = -np.log10(1.0-Y)
+            if auto_y:
+                ylim[0] = 0.3
+                ylim[1] = np.ceil(np.max(Y))
+            else:
+                ylim[0] = -np.log10(1.0-ylim[0])
+                ylim[1] = -np.log10(1.0-ylim[1]+1e-6)
+        return Y, ylim
+
     def add_grid(self, ax=None):
         if not ax:
             ax = self.handle
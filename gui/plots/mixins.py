@@ -118,3 +118,13 @@ class XAxisSteps(object):
     def on_txtXSteps_editingFinished(self):
         int_set_from_lineedit(self.txtXSteps, self.config, 'xaxis.steps', self)
 
+class XAxisSampling(object):
+    def initialise_options(self):
+        adaptive = self.config.get('xaxis.sampling') == 'adaptive'
+        self.chkXAdaptive.setChecked(adaptive)
+
+        super(XAxisSampling, self).initialise_options()
+
+    @pyqtSlot(bool)
+    def on_chkXAdaptive_clicked(self, checked):
+        self.config.set('xaxis.sampling', 'adaptive' if checked else 'uniform')
@@ -0,0 +1,36 @@
+#!/usr/bin/env python
+# This work is licensed under the Creative Commons Attribution-NonCommercial-
+# ShareAlike 4.0 International License. To view a copy of this license, visit
+# http://creativecommons.org/licenses/by-nc-sa/4.0/ or send a letter to Creative
+# Commons, PO Box 1866, Mountain View, CA 94042, USA.
+
+import baseoptions
+from PyQt4.QtCore import pyqtSlot
+from mixins import XAxisLimits, XAxisSteps
+from gui.helpers import to_float, float_set_from_lineedit
+
+
+class BrownianNoiseOptions(XAxisSteps, XAxisLimits, baseoptions.BasePlotOptionWidget):
+    def __init__(self, parent):
+        super(BrownianNoiseOptions, self).__init__('brownian_noise', parent)
+
+    def initialise_options(self):
+        super(BrownianNoiseOptions, self).initialise_options()
+        self.txtTemperature.setText(to_float(self.config.get('analysis.temperature')))
+        self.txtBeamSize.setText(to_float(self.config.get('analysis.beam_size')))
+        
+    # ==== SLOTS ====
+    @pyqtSlot()
+    def on_txtTemperature_editingFinished(self):
+        float_set_from_lineedit(self.txtTemperature, self.config, 'analysis.temperature', self)
+        
+    @pyqtSlot()
+    def on_txtBeamSize_editingFinished(self):
+        float_set_from_lineedit(self.txtBeamSize, self.config, 'analysis.beam_size', self)
+
+
+info = {
+    'brownian_noise': {
+        'options': BrownianNoiseOptions,
+    }
+}
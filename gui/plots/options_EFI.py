@@ -0,0 +1,31 @@
+#!/usr/bin/env python
+# This work is licensed under the Creative Commons Attribution-NonCommercial-
+# ShareAlike 4.0 International License. To view a copy of this license, visit
+# http://creativecommons.org/licenses/by-nc-sa/4.0/ or send a letter to Creative
+# Commons, PO Box 1866, Mountain View, CA 94042, USA.
+
+import baseoptions
+from PyQt4.QtCore import pyqtSlot
+from mixins import YAxisLimits, YAxisScale, XAxisSteps
+from gui.helpers import to_float, float_set_from_lineedit
+
+
+class EFIPlotOptions(YAxisLimits, YAxisScale, XAxisSteps, baseoptions.BasePlotOptionWidget):
+    def __init__(self, parent):
+        super(EFIPlotOptions, self).__init__('EFI', parent)
+
+    def initialise_options(self):
+        super(EFIPlotOptions, self).initialise_options()
+        self.txtLambda.setText(to_float(self.config.get('analysis.lambda')))
+
+    # ==== SLOTS ====
+    @pyqtSlot()
+    def on_txtLambda_editingFinished(self):
+        float_set_from_lineedit(self.txtLambda, self.config, 'analysis.lambda', self)
+
+
+info = {
+    'EFI': {
+        'options': EFIPlotOptions,
+    }
+}
@@ -0,0 +1,25 @@
+#!/usr/bin/env python
+# This work is licensed under the Creative Commons Attribution-NonCommercial-
+# ShareAlike 4.0 International License. To view a copy of this license, visit
+# http://creativecommons.org/licenses/by-nc-sa/4.0/ or send a letter to Creative
+# Commons, PO Box 1866, Mountain View, CA 94042, USA.
+
+import baseoptions
+from PyQt4.QtCore import pyqtSlot
+from mixins import YAxisLimits, XAxisLimits, XAxisSteps, XAxisSampling
+
+
+class PhaseOptions(XAxisLimits, YAxisLimits, XAxisSteps, XAxisSampling,
+                   baseoptions.BasePlotOptionWidget):
+    def __init__(self, parent):
+        super(PhaseOptions, self).__init__('phase', parent)
+
+    def initialise_options(self):
+        super(PhaseOptions, self).initialise_options()
+
+
+info = {
+    'phase': {
+        'options': PhaseOptions,
+    }
+}
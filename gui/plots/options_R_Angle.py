@@ -0,0 +1,25 @@
+#!/usr/bin/env python
+# This work is licensed under the Creative Commons Attribution-NonCommercial-
+# ShareAlike 4.0 International License. To view a copy of this license, visit
+# http://creativecommons.org/licenses/by-nc-sa/4.0/ or send a letter to Creative
+# Commons, PO Box 1866, Mountain View, CA 94042, USA.
+
+import baseoptions
+from PyQt4.QtCore import pyqtSlot
+from mixins import YAxisLimits, XAxisLimits, YAxisScale, XAxisSteps
+
+
+class R_AngleOptions(XAxisLimits, YAxisLimits, YAxisScale, XAxisSteps,
+                     baseoptions.BasePlotOptionWidget):
+    def __init__(self, parent):
+        super(R_AngleOptions, self).__init__('r_angle', parent)
+
+    def initialise_options(self):
+        super(R_AngleOptions, self).initialise_options()
+
+
+info = {
+    'r_angle': {
+        'options': R_AngleOptions,
+    }
+}
@@ -0,0 +1,25 @@
+#!/usr/bin/env python
+# This work is licensed under the Creative Commons Attribution-NonCommercial-
+# ShareAlike 4.0 International License. To view a copy of this license, visit
+# http://creativecommons.org/licenses/by-nc-sa/4.0/ or send a letter to Creative
+# Commons, PO Box 1866, Mountain View, CA 94042, USA.
+
+import baseoptions
+from mixins import YAxisLimits, XAxisLimits, YAxisScale, XAxisSteps, XAxisSampling
+from PyQt4.QtCore import pyqtSlot
+
+
+class R_LambdaOptions(XAxisSteps, XAxisSampling, XAxisLimits, YAxisLimits, YAxisScale,
+                      baseoptions.BasePlotOptionWidget):
+    def __init__(self, parent):
+        super(R_LambdaOptions, self).__init__('r_lambda', parent)
+
+    def initialise_options(self):
+        super(R_LambdaOptions, self).initialise_options()
+
+
+info = {
+    'r_lambda': {
+        'options': R_LambdaOptions,
+    }
+}
@@ -0,0 +1,56 @@
+#!/usr/bin/env python
+# This work is licensed under the Creative Commons Attribution-NonCommercial-
+# ShareAlike 4.0 International License. To view a copy of this license, visit
+# http://creativecommons.org/licenses/by-nc-sa/4.0/ or send a letter to Creative
+# Commons, PO Box 1866, Mountain View, CA 94042, USA.
+
+import baseoptions
+from PyQt4.QtCore import pyqtSlot
+from mixins import XAxisLimits, YAxisLimits, XAxisSteps
+from gui.helpers import to_float, int_set_from_lineedit
+
+# quantities, in the order of cbQuantity
+QUANTITIES = ['R_s', 'R_p', 'phase_s', 'phase_p', 'phase_diff']
+
+
+class R_MapOptions(XAxisLimits, YAxisLimits, XAxisSteps,
+                   baseoptions.BasePlotOptionWidget):
+    def __init__(self, parent):
+        super(R_MapOptions, self).__init__('r_map', parent)
+
+    def initialise_options(self):
+        super(R_MapOptions, self).initialise_options()
+        quantity = self.config.get('analysis.quantity')
+        self.cbQuantity.setCurrentIndex(QUANTITIES.index(quantity)
+                                        if quantity in QUANTITIES else 0)
+        if self.config.get('analysis.scale') == 'log':
+            self.rbScaleLog.setChecked(True)
+        else:
+            self.rbScaleLin.setChecked(True)
+        self.txtYSteps.setText(to_float(self.config.get('yaxis.steps')))
+
+    # ==== SLOTS ====
+    @pyqtSlot(int)
+    def on_cbQuantity_activated(self, index):
+        self.config.set('analysis.quantity', QUANTITIES[index])
+
+    @pyqtSlot(bool)
+    def on_rbScaleLin_clicked(self, checked):
+        if checked:
+            self.config.set('analysis.scale', 'lin')
+
+    @pyqtSlot(bool)
+    def on_rbScaleLog_clicked(self, checked):
+        if checked:
+            self.config.set('analysis.scale', 'log')
+
+    @pyqtSlot()
+    def on_txtYSteps_editingFinished(self):
+        int_set_from_lineedit(self.txtYSteps, self.config, 'yaxis.steps', self)
+
+
+info = {
+    'r_map': {
+        'options': R_MapOptions,
+    }
+}
@@ -0,0 +1,65 @@
+#!/usr/bin/env python
+# This work is licensed under the Creative Commons Attribution-NonCommercial-
+# ShareAlike 4.0 International License. To view a copy of this license, visit
+# http://creativecommons.org/licenses/by-nc-sa/4.0/ or send a letter to Creative
+# Commons, PO Box 1866, Mountain View, CA 94042, USA.
+
+import baseoptions
+from PyQt4.QtCore import pyqtSlot
+from mixins import YAxisLimits
+from gui.helpers import to_float, float_set_from_lineedit, int_set_from_lineedit
+
+# quantities, in the order of cbQuantity
+QUANTITIES = ['reflectivity', 'phase']
+
+
+class SensitivityOptions(YAxisLimits, baseoptions.BasePlotOptionWidget):
+    def __init__(self, parent):
+        super(SensitivityOptions, self).__init__('sensitivity', parent)
+
+    def initialise_options(self):
+        super(SensitivityOptions, self).initialise_options()
+        quantity = self.config.get('analysis.quantity')
+        self.cbQuantity.setCurrentIndex(QUANTITIES.index(quantity)
+                                        if quantity in QUANTITIES else 0)
+        if self.config.get('analysis.range') == 'band':
+            self.rbBand.setChecked(True)
+        else:
+            self.rbLambda0.setChecked(True)
+        self.txtBandMin.setText(to_float(self.config.get('analysis.band_min')))
+        self.txtBandMax.setText(to_float(self.config.get('analysis.band_max')))
+        self.txtBandSteps.setText(to_float(self.config.get('analysis.band_steps')))
+
+    # ==== SLOTS ====
+    @pyqtSlot(int)
+    def on_cbQuantity_activated(self, index):
+        self.config.set('analysis.quantity', QUANTITIES[index])
+
+    @pyqtSlot(bool)
+    def on_rbLambda0_clicked(self, checked):
+        if checked:
+            self.config.set('analysis.range', 'lambda0')
+
+    @pyqtSlot(bool)
+    def on_rbBand_clicked(self, checked):
+        if checked:
+            self.config.set('analysis.range', 'band')
+
+    @pyqtSlot()
+    def on_txtBandMin_editingFinished(self):
+        float_set_from_lineedit(self.txtBandMin, self.config, 'analysis.band_min', self)
+
+    @pyqtSlot()
+    def on_txtBandMax_editingFinished(self):
+        float_set_from_lineedit(self.txtBandMax, self.config, 'analysis.band_max', self)
+
+    @pyqtSlot()
+    def on_txtBandSteps_editingFinished(self):
+        int_set_from_lineedit(self.txtBandSteps, self.config, 'analysis.band_steps', self)
+
+
+info = {
+    'sensitivity': {
+        'options': SensitivityOptions,
+    }
+}
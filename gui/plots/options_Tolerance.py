@@ -0,0 +1,62 @@
+#!/usr/bin/env python
+# This work is licensed under the Creative Commons Attribution-NonCommercial-
+# ShareAlike 4.0 International License. To view a copy of this license, visit
+# http://creativecommons.org/licenses/by-nc-sa/4.0/ or send a letter to Creative
+# Commons, PO Box 1866, Mountain View, CA 94042, USA.
+
+import baseoptions
+from PyQt4.QtCore import pyqtSlot
+from mixins import YAxisLimits, XAxisLimits, YAxisScale, XAxisSteps
+from gui.helpers import to_float, float_set_from_lineedit, int_set_from_lineedit
+
+
+class ToleranceOptions(XAxisSteps, XAxisLimits, YAxisLimits, YAxisScale,
+                       baseoptions.BasePlotOptionWidget):
+    def __init__(self, parent):
+        super(ToleranceOptions, self).__init__('tolerance', parent)
+
+    def initialise_options(self):
+        super(ToleranceOptions, self).initialise_options()
+        self.txtSamples.setText(to_float(self.config.get('analysis.samples')))
+        self.txtThicknessError.setText(to_float(self.config.get('analysis.thickness_error')))
+        self.txtIndexError.setText(to_float(self.config.get('analysis.index_error')))
+        self.txtSpecFrom.setText(to_float(self.config.get('analysis.spec_from')))
+        self.txtSpecTo.setText(to_float(self.config.get('analysis.spec_to')))
+        self.txtSpecMin.setText(to_float(self.config.get('analysis.spec_min')))
+        self.txtSpecMax.setText(to_float(self.config.get('analysis.spec_max')))
+
+    # ==== SLOTS ====
+    @pyqtSlot()
+    def on_txtSamples_editingFinished(self):
+        int_set_from_lineedit(self.txtSamples, self.config, 'analysis.samples', self)
+
+    @pyqtSlot()
+    def on_txtThicknessError_editingFinished(self):
+        float_set_from_lineedit(self.txtThicknessError, self.config, 'analysis.thickness_error', self)
+
+    @pyqtSlot()
+    def on_txtIndexError_editingFinished(self):
+        float_set_from_lineedit(self.txtIndexError, self.config, 'analysis.index_error', self)
+
+    @pyqtSlot()
+    def on_txtSpecFrom_editingFinished(self):
+        float_set_from_lineedit(self.txtSpecFrom, self.config, 'analysis.spec_from', self)
+
+    @pyqtSlot()
+    def on_txtSpecTo_editingFinished(self):
+        float_set_from_lineedit(self.txtSpecTo, self.config, 'analysis.spec_to', self)
+
+    @pyqtSlot()
+    def on_txtSpecMin_editingFinished(self):
+        float_set_from_lineedit(self.txtSpecMin, self.config, 'analysis.spec_min', self)
+
+    @pyqtSlot()
+    def on_txtSpecMax_editingFinished(self):
+        float_set_from_lineedit(self.txtSpecMax, self.config, 'analysis.spec_max', self)
+
+
+info = {
+    'tolerance': {
+        'options': ToleranceOptions,
+    }
+}
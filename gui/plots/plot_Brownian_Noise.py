@@ -6,26 +6,20 @@
 
 import baseplot
 import numpy as np
-from PyQt4.QtCore import pyqtSlot
 import matplotlib as mpl
+from gui import thermal
 
-from mixins import XAxisLimits, XAxisSteps
-from gui.helpers import to_float, float_set_from_lineedit
 
 
 class BrownianNoisePlot(baseplot.BasePlot):
-    def __init__(self, handle):
+    def __init__(self, handle=None):
         super(BrownianNoisePlot, self).__init__('brownian_noise', handle)
 
-    def brownian_noise(self, coating, freq, beam_size, temperature):
-        k = 1.3806503e-23;
-        return 2 * k * temperature / (np.sqrt(np.pi ** 3) * freq *
-            beam_size * coating.substrate.Y) * (1 - coating.substrate.sigma ** 2) * coating.phi(beam_size)
-
-    def plot(self, coating):
+    def compute(self, coating, progress=None):
         temperature = self.config.get('analysis.temperature')
         beam_size = self.config.get('analysis.beam_size') * 1e-6
         steps = self.config.get('xaxis.steps')
+        lambda0 = self.config.parent.get('coating.lambda0')
 
         if self.config.get('xaxis.limits') == 'auto':
             xlim = [1, 1e4]
@@ -36,12 +30,24 @@ class BrownianNoisePlot(baseplot.BasePlot):
             xloglim = [np.floor(np.log10(xlim[0])),
                        np.ceil(np.log10(xlim[1]))]
 
-        mpl.rc('mathtext', default='regular') #TODO: this should probably go somewhere else?!
-
         X = np.logspace(*xloglim, num=steps)
-        Y = self.brownian_noise(coating, X, beam_size, temperature)
+        constants = thermal.cached_constants(coating, lambda0)
+        budget = thermal.budget(constants, X, temperature, beam_size)
+        return {'X': X, 'budget': budget, 'xlim': xlim}
+
+    def draw(self, data):
+        X, budget, xlim = data['X'], data['budget'], data['xlim']
 
-        line = self.handle.loglog(X,np.sqrt(Y))
+        mpl.rc('mathtext', default='regular') #TODO: this should probably go somewhere else?!
+
+        lines = []
+        labels = []
+        for term, label in thermal.TERMS.items():
+            if np.any(budget[term] > 0):
+                lines += self.handle.loglog(X, np.sqrt(budget[term]), linestyle='--')
+                labels.append(label)
+        lines += self.handle.loglog(X, np.sqrt(budget['total']), color='k', linewidth=2)
+        labels.append('Total')
 
         self.add_grid()
         self.handle.set_xlim(xlim)
@@ -49,33 +55,13 @@ class BrownianNoisePlot(baseplot.BasePlot):
         self.handle.set_xlabel('Frequency (Hz)')
         self.handle.set_ylabel('Displacement noise ($m/\sqrt{Hz}$)')
 
-        self.add_legend(line, ['Brownian Noise'])
+        self.add_legend(lines, labels)
         self.add_copyright()
 
 
-class BrownianNoiseOptions(XAxisSteps, XAxisLimits, baseplot.BasePlotOptionWidget):
-    def __init__(self, parent):
-        super(BrownianNoiseOptions, self).__init__('brownian_noise', parent)
-
-    def initialise_options(self):
-        super(BrownianNoiseOptions, self).initialise_options()
-        self.txtTemperature.setText(to_float(self.config.get('analysis.temperature')))
-        self.txtBeamSize.setText(to_float(self.config.get('analysis.beam_size')))
-        
-    # ==== SLOTS ====
-    @pyqtSlot()
-    def on_txtTemperature_editingFinished(self):
-        float_set_from_lineedit(self.txtTemperature, self.config, 'analysis.temperature', self)
-        
-    @pyqtSlot()
-    def on_txtBeamSize_editingFinished(self):
-        float_set_from_lineedit(self.txtBeamSize, self.config, 'analysis.beam_size', self)
-    
-
 info = {
     'brownian_noise': {
-        'description': 'Brownian Noise',
+        'description': 'Thermal Noise Budget',
         'plotter': BrownianNoisePlot,
-        'options': BrownianNoiseOptions,
     }
-}
\ No newline at end of file
+}
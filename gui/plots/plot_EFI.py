@@ -6,9 +6,7 @@
 
 import baseplot
 import numpy as np
-from PyQt4.QtCore import pyqtSlot
-from mixins import YAxisLimits, YAxisScale, XAxisSteps
-from gui.helpers import to_float, float_set_from_lineedit
+from gui import solver
 
 class EFIPlot(baseplot.BasePlot):
     @staticmethod
@@ -16,35 +14,36 @@ class EFIPlot(baseplot.BasePlot):
         """Converts refractive index n into alpha transparency value"""
         return min(np.log(n)/1.39, 1.0)
 
-    def __init__(self, handle):
+    def __init__(self, handle=None):
         super(EFIPlot, self).__init__('EFI', handle)
     
-    def plot(self, coating):
+    def compute(self, coating, progress=None):
         wavelength = self.config.get('analysis.lambda')
         AOI = self.config.parent.get('coating.AOI')
-        stack = coating.create_stack(wavelength, AOI=AOI)
+        n, d = solver.stack_indices(coating, wavelength)
+        stacks_n = np.real(np.array([complex(nn) for nn in n]))
         
-        handles = [] # holds the individual curves
-
         # create visual representation of stack
         # and refractive indices
-        total_d = np.sum(stack.stacks_d)
-        xmin = -0.5 * wavelength / stack.stacks_n[0]
-        xmax = total_d + 0.5 * wavelength / stack.stacks_n[-1]
-        xvalues = len(stack.stacks_d) * 2 + 4
-        X = np.zeros(xvalues)
-        Y = np.zeros(xvalues)
-        X[0] = xmin; X[1] = -1; X[-1] = xmax; X[-2] = total_d
-        Y[0] = Y[1] = stack.stacks_n[0]
-        Y[-1] = Y[-2] = stack.stacks_n[-1]
-        ii = 1
-        current_d = 0
-        for d, n in zip(stack.stacks_d, stack.stacks_n[1:-1]):
-            X[ii*2] = current_d
-            X[ii*2+1] = current_d+d-1
-            Y[ii*2] = Y[ii*2+1] = n
-            current_d += d
-            ii += 1
+        bounds = np.concatenate(([0.0], np.cumsum(d)))
+        total_d = bounds[-1]
+        xmin = -0.5 * wavelength / stacks_n[0]
+        xmax = total_d + 0.5 * wavelength / stacks_n[-1]
+        X = np.empty(2 * len(stacks_n))
+        X[0::2] = np.concatenate(([xmin], bounds))
+        X[1::2] = np.concatenate(([-1], bounds[1:] - 1, [xmax]))
+        Y = np.repeat(stacks_n, 2)
+
+        Xefi, Yefi = solver.field_intensity(n, d, wavelength, AOI,
+                                            self.config.get('xaxis.steps'))
+        return {'X': X, 'Y': Y, 'xlim': [xmin, xmax],
+                'stacks_d': d, 'stacks_n': stacks_n,
+                'efi_s': (Xefi, Yefi['s']), 'efi_p': (Xefi, Yefi['p'])}
+
+    def draw(self, data):
+        X, Y = data['X'], data['Y']
+        xvalues = len(X)
+        handles = [] # holds the individual curves
         handles += self.handle.plot(X,Y, color=self.colors[3])
 
         # now create EFI plot
@@ -53,10 +52,8 @@ class EFIPlot(baseplot.BasePlot):
         ax2.set_ylabel('Normalised Electric Field Intensity')
         if self.config.get('yaxis.scale') == 'log':
             ax2.set_yscale('log')
-        Xefi_s,Yefi_s = stack.efi(self.config.get('xaxis.steps'), 's')
-        Xefi_p,Yefi_p = stack.efi(self.config.get('xaxis.steps'), 'p')
-        handles += ax2.plot(Xefi_s,Yefi_s, color=self.colors[0])
-        handles += ax2.plot(Xefi_p,Yefi_p, color=self.colors[1])
+        handles += ax2.plot(*data['efi_s'], color=self.colors[0])
+        handles += ax2.plot(*data['efi_p'], color=self.colors[1])
         if self.config.get('yaxis.limits') == 'user':
             ymin = self.config.get('yaxis.min')
             ymax = self.config.get('yaxis.max')
@@ -72,12 +69,12 @@ class EFIPlot(baseplot.BasePlot):
             elif ii == xvalues/2 - 1:
                 text = 'substrate'
             else:
-                text = '{:.0f}nm'.format(stack.stacks_d[ii-1])
+                text = '{:.0f}nm'.format(data['stacks_d'][ii-1])
             self.handle.text((X[ii*2]+X[ii*2+1])/2, 0.8, text, 
                 horizontalalignment='center', rotation='vertical')
 
-        self.handle.set_xlim(xmin, xmax)
-        self.handle.set_ylim(0, np.max(stack.stacks_n)+1)
+        self.handle.set_xlim(data['xlim'])
+        self.handle.set_ylim(0, np.max(data['stacks_n'])+1)
         self.handle.set_ylabel('Refractive Index')
         self.handle.set_xlabel('Position (nm)')
         self.add_legend(handles, ['Refr. index', 'EFI s-pol', 'EFI p-pol'])
@@ -85,24 +82,9 @@ class EFIPlot(baseplot.BasePlot):
        
 
 
-class EFIPlotOptions(YAxisLimits, YAxisScale, XAxisSteps, baseplot.BasePlotOptionWidget):
-    def __init__(self, parent):
-        super(EFIPlotOptions, self).__init__('EFI', parent)
-
-    def initialise_options(self):
-        super(EFIPlotOptions, self).initialise_options()
-        self.txtLambda.setText(to_float(self.config.get('analysis.lambda')))
-
-    # ==== SLOTS ====
-    @pyqtSlot()
-    def on_txtLambda_editingFinished(self):
-        float_set_from_lineedit(self.txtLambda, self.config, 'analysis.lambda', self)
-
-
 info = {
     'EFI': {
         'description': 'Electric Field Intensity',
         'plotter': EFIPlot,
-        'options': EFIPlotOptions,
     }
 }
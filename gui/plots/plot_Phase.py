@@ -7,16 +7,13 @@
 import baseplot
 import numpy as np
 import matplotlib
-from PyQt4.QtCore import pyqtSlot
-from mixins import YAxisLimits, XAxisLimits, XAxisSteps
+from gui import solver
 
 class PhasePlot(baseplot.BasePlot):
-    def __init__(self, handle):
+    def __init__(self, handle=None):
         super(PhasePlot, self).__init__('phase', handle)
 
-    def plot(self, coating):
-        #TODO: refactor this into another function, which can be used to plot transmission as well
-        
+    def compute(self, coating, progress=None):
         lambda0 = self.config.parent.get('coating.lambda0')
         if self.config.get('xaxis.limits') == 'auto':
             xlim = [0.7 * lambda0, 1.3 * lambda0]
@@ -24,44 +21,50 @@ class PhasePlot(baseplot.BasePlot):
             xlim = [self.config.get('xaxis.min'),
                     self.config.get('xaxis.max')]
         
-        X = np.linspace(*xlim, num=self.config.get('xaxis.steps'))
-        Y = np.zeros((len(X), 3))
-
+        steps = self.config.get('xaxis.steps')
         AOI = self.config.parent.get('coating.AOI')
-        for step in range(len(X)):
-            stack = coating.create_stack(X[step], AOI=AOI)
-            Y[step,:] = stack.phase()
+        if self.config.get('xaxis.sampling') == 'adaptive':
+            X, Y = solver.adaptive_sweep(coating, xlim, AOI, steps, 'phase',
+                                         progress=progress)
+        else:
+            X = np.linspace(*xlim, num=steps)
+            workers = self.config.parent.get('plot.workers')
+            Y = solver.solve(coating, X, AOI, progress=progress,
+                             workers=workers, live=self.live).phase()
+        return {'X': X, 'Y': Y, 'xlim': xlim, 'lambda0': lambda0}
+
+    def draw(self, data):
+        X, Y = self.line_data(data)
 
-        handles = self.handle.plot(X,(np.unwrap(Y, axis=0)%(2*np.pi))*180/np.pi)
+        self.lines = self.handle.plot(X,Y)
 
         self.add_grid()
-        self.handle.set_xlim(xlim)
-        if self.config.get('yaxis.limits') == 'user':
-            self.handle.set_ylim(
-                self.config.get('yaxis.min'),
-                self.config.get('yaxis.max'))
+        self.handle.set_xlim(data['xlim'])
+        self.handle.set_ylim(self.layout(data)[1])
 
-        self.handle.axvline(lambda0, ls='--', color=self.colors[4], linewidth=1.5)
+        self.handle.axvline(data['lambda0'], ls='--', color=self.colors[4], linewidth=1.5)
         
         self.handle.set_xlabel('Wavelength (nm)')
         self.handle.set_ylabel('Phase (deg)')
-        self.add_legend(handles, ['s pol', 'p pol', 'delta'])
+        self.add_legend(self.lines, ['s pol', 'p pol', 'delta'])
         self.add_copyright()
+        self.drawn_layout = self.layout(data)
 
+    def layout(self, data):
+        if self.config.get('yaxis.limits') == 'user':
+            ylim = [self.config.get('yaxis.min'),
+                    self.config.get('yaxis.max')]
+        else:
+            ylim = [0, 360]
+        return [data['xlim'], ylim, data['lambda0']]
 
-class PhaseOptions(XAxisLimits, YAxisLimits, XAxisSteps,
-                   baseplot.BasePlotOptionWidget):
-    def __init__(self, parent):
-        super(PhaseOptions, self).__init__('phase', parent)
-
-    def initialise_options(self):
-        super(PhaseOptions, self).initialise_options()
+    def line_data(self, data):
+        return data['X'], (np.unwrap(data['Y'], axis=0)%(2*np.pi))*180/np.pi
 
 
 info = {
     'phase': {
         'description': 'Phase over Wavelength',
         'plotter': PhasePlot,
-        'options': PhaseOptions,
     }
 }
\ No newline at end of file
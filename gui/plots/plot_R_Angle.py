@@ -7,25 +7,15 @@
 import baseplot
 import numpy as np
 import matplotlib
-from PyQt4.QtCore import pyqtSlot
-from mixins import YAxisLimits, XAxisLimits, YAxisScale, XAxisSteps
+from gui import solver
 
 
 class R_AnglePlot(baseplot.BasePlot):
 
-    def __init__(self, handle):
+    def __init__(self, handle=None):
         super(R_AnglePlot, self).__init__('r_angle', handle)
 
-    def plot(self, coating):
-        def to_refl(val, position):
-            refl = 1-10**(-val)
-            return '{:.7g}'.format(refl)
-
-        yLocator = matplotlib.ticker.MultipleLocator(1.0)
-        yFormatter = matplotlib.ticker.FuncFormatter(to_refl)
-        
-        #TODO: refactor this into another function, which can be used to plot transmission as well
-        
+    def compute(self, coating, progress=None):
         AOI = self.config.parent.get('coating.AOI')
         lambda0 = self.config.parent.get('coating.lambda0')
 
@@ -36,38 +26,27 @@ class R_AnglePlot(baseplot.BasePlot):
                     self.config.get('xaxis.max')]
         
         X = np.linspace(*xlim, num=self.config.get('xaxis.steps'))
-        Y = np.zeros((len(X), 2))
+        Y = solver.angle_sweep(coating, lambda0, X, progress).reflectivity()
+        return {'X': X, 'Y': Y, 'xlim': xlim, 'AOI': AOI}
+
+    def draw(self, data):
+        def to_refl(val, position):
+            refl = 1-10**(-val)
+            return '{:.7g}'.format(refl)
 
-        for step in range(len(X)):
-            stack = coating.create_stack(lambda0, AOI=X[step])
-            Y[step,:] = stack.reflectivity()
+        yLocator = matplotlib.ticker.MultipleLocator(1.0)
+        yFormatter = matplotlib.ticker.FuncFormatter(to_refl)
 
-        auto_y = self.config.get('yaxis.limits') == 'auto'
-        
-        if auto_y:
-            ylim = [0, 1]
-        else:
-            ylim = [self.config.get('yaxis.min'),
-                    self.config.get('yaxis.max')]
-        
-        # convert to inverse log scale, i.e. where the values close to unity
-        # are zoomed in, instead of the values close to zero
-        if self.config.get('yaxis.scale') == 'log':
-            Y = -np.log10(1.0-Y)
-            if auto_y:
-                ylim[0] = 0.3
-                ylim[1] = np.ceil(np.max(Y))
-            else:
-                ylim[0] = -np.log10(1.0-ylim[0])
-                ylim[1] = -np.log10(1.0-ylim[1]+1e-6)
+        X, xlim = data['X'], data['xlim']
+        Y, ylim = self.scale_reflectivity(data['Y'])
 
-        handles = self.handle.plot(X,Y)
+        self.lines = self.handle.plot(X,Y)
 
         self.add_grid()
         self.handle.set_xlim(xlim)
         self.handle.set_ylim(ylim)
         
-        self.handle.axvline(AOI, ls='--', color=self.colors[4], linewidth=1.5)
+        self.handle.axvline(data['AOI'], ls='--', color=self.colors[4], linewidth=1.5)
          
         if self.config.get('yaxis.scale') == 'log':
             self.handle.set_yscale('log')
@@ -76,22 +55,22 @@ class R_AnglePlot(baseplot.BasePlot):
 
         self.handle.set_xlabel('Angle of Incidence (deg)')
         self.handle.set_ylabel('Reflectivity')
-        self.add_legend(handles, ['s pol', 'p pol'])
+        self.add_legend(self.lines, ['s pol', 'p pol'])
         self.add_copyright()
+        self.drawn_layout = self.layout(data)
 
+    def layout(self, data):
+        ylim = self.scale_reflectivity(data['Y'])[1]
+        return [data['xlim'], ylim, self.config.get('yaxis.scale'),
+                data['AOI']]
 
-class R_AngleOptions(XAxisLimits, YAxisLimits, YAxisScale, XAxisSteps,
-                     baseplot.BasePlotOptionWidget):
-    def __init__(self, parent):
-        super(R_AngleOptions, self).__init__('r_angle', parent)
+    def line_data(self, data):
+        return data['X'], self.scale_reflectivity(data['Y'])[0]
 
-    def initialise_options(self):
-        super(R_AngleOptions, self).initialise_options()
 
 info = {
     'r_angle': {
         'description': 'Reflectivity over AOI',
         'plotter': R_AnglePlot,
-        'options': R_AngleOptions,
     }
 }
\ No newline at end of file
@@ -0,0 +1,97 @@
+#!/usr/bin/env python
+# This work is licensed under the Creative Commons Attribution-NonCommercial-
+# ShareAlike 4.0 International License. To view a copy of this license, visit
+# http://creativecommons.org/licenses/by-nc-sa/4.0/ or send a letter to Creative
+# Commons, PO Box 1866, Mountain View, CA 94042, USA.
+
+import baseplot
+import numpy as np
+from gui import solver
+
+# quantity: (Response method, column, colour bar label)
+QUANTITIES = {
+    'R_s': ('reflectivity', 0, 'Reflectivity (s pol)'),
+    'R_p': ('reflectivity', 1, 'Reflectivity (p pol)'),
+    'phase_s': ('phase', 0, 'Phase (s pol, deg)'),
+    'phase_p': ('phase', 1, 'Phase (p pol, deg)'),
+    'phase_diff': ('phase', 2, 'Phase difference s - p (deg)'),
+}
+
+
+class R_MapPlot(baseplot.BasePlot):
+
+    def __init__(self, handle=None):
+        super(R_MapPlot, self).__init__('r_map', handle)
+
+    def compute(self, coating, progress=None):
+        AOI = self.config.parent.get('coating.AOI')
+        lambda0 = self.config.parent.get('coating.lambda0')
+        quantity = self.config.get('analysis.quantity')
+        if quantity not in QUANTITIES:
+            quantity = 'R_s'
+
+        if self.config.get('xaxis.limits') == 'auto':
+            xlim = [0.7 * lambda0, 1.3 * lambda0]
+        else:
+            xlim = [self.config.get('xaxis.min'),
+                    self.config.get('xaxis.max')]
+        if self.config.get('yaxis.limits') == 'auto':
+            ylim = [0.0, 80.0]
+        else:
+            ylim = [self.config.get('yaxis.min'),
+                    self.config.get('yaxis.max')]
+
+        X = np.linspace(*xlim, num=self.config.get('xaxis.steps'))
+        Y = np.linspace(*ylim, num=self.config.get('yaxis.steps'))
+        method, column = QUANTITIES[quantity][:2]
+        Z = solver.grid_sweep(coating, X, Y, method, progress)[..., column]
+        if method == 'phase':
+            Z = np.degrees(Z)
+        return {'X': X, 'Y': Y, 'Z': Z, 'xlim': xlim, 'ylim': ylim,
+                'quantity': quantity, 'AOI': AOI, 'lambda0': lambda0}
+
+    def draw(self, data):
+        X, Y, Z = data['X'], data['Y'], data['Z']
+        method, column, label = QUANTITIES[data['quantity']]
+
+        if method == 'phase':
+            cmap = 'hsv'
+            clim = [-180, 180] if data['quantity'] != 'phase_diff' else None
+        else:
+            cmap = 'viridis'
+            clim = [0, 1]
+            if self.config.get('analysis.scale') == 'log':
+                Z = -np.log10(np.maximum(1.0 - Z, 1e-15))
+                clim = [0, max(np.ceil(np.max(Z)), 1)]
+                label = label.replace('Reflectivity', '-log10(1 - R)')
+
+        image = self.handle.imshow(Z.T, origin='lower', aspect='auto',
+                                   extent=[X[0], X[-1], Y[0], Y[-1]],
+                                   cmap=cmap, interpolation='nearest')
+        if clim:
+            image.set_clim(clim)
+        colorbar = self.handle.figure.colorbar(image, ax=self.handle)
+        colorbar.set_label(label)
+
+        self.handle.axvline(data['lambda0'], ls='--', color='w', linewidth=1)
+        self.handle.axhline(data['AOI'], ls='--', color='w', linewidth=1)
+        self.handle.set_xlim(data['xlim'])
+        self.handle.set_ylim(data['ylim'])
+        self.handle.set_xlabel('Wavelength (nm)')
+        self.handle.set_ylabel('Angle of Incidence (deg)')
+        self.add_copyright()
+
+    def export_data(self, data):
+        """One row per grid point: wavelength, AOI and quantity"""
+        X, Y = np.meshgrid(data['X'], data['Y'], indexing='ij')
+        labels = ['Wavelength (nm)', 'Angle of Incidence (deg)',
+                  QUANTITIES[data['quantity']][2]]
+        return [X.ravel()], [Y.ravel(), data['Z'].ravel()], labels
+
+
+info = {
+    'r_map': {
+        'description': 'Reflectivity over Wavelength and AOI',
+        'plotter': R_MapPlot,
+    }
+}
@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+# This work is licensed under the Creative Commons Attribution-NonCommercial-
+# ShareAlike 4.0 International License. To view a copy of this license, visit
+# http://creativecommons.org/licenses/by-nc-sa/4.0/ or send a letter to Creative
+# Commons, PO Box 1866, Mountain View, CA 94042, USA.
+
+import baseplot
+import numpy as np
+import matplotlib
+from gui import solver
+
+class SensitivityPlot(baseplot.BasePlot):
+    def __init__(self, handle=None):
+        super(SensitivityPlot, self).__init__('sensitivity', handle)
+
+    def compute(self, coating, progress=None):
+        lambda0 = self.config.parent.get('coating.lambda0')
+        AOI = self.config.parent.get('coating.AOI')
+        quantity = self.config.get('analysis.quantity')
+        band = self.config.get('analysis.range') == 'band'
+        if band:
+            X = np.linspace(self.config.get('analysis.band_min'),
+                            self.config.get('analysis.band_max'),
+                            self.config.get('analysis.band_steps'))
+        else:
+            X = np.array([lambda0])
+
+        # derivatives by all layer thicknesses at once, see solver.gradient()
+        n, d = solver.stack_indices(coating, X)
+        D = solver.sensitivity(n, d, X, AOI, quantity)
+        if band:
+            Y = np.sqrt(np.mean(D**2, axis=0))
+        else:
+            Y = D[0]
+        return {'X': np.arange(1, len(d) + 1), 'Y': Y, 'quantity': quantity,
+                'band': [X[0], X[-1]] if band else None, 'lambda0': lambda0}
+
+    def draw(self, data):
+        X, Y = data['X'], data['Y']
+        self.lines = self.handle.plot(X, Y, drawstyle='steps-mid', marker='o',
+                                      markersize=4)
+
+        self.add_grid()
+        self.handle.set_xlim([0.5, max(len(X), 1) + 0.5])
+        self.handle.xaxis.set_major_locator(matplotlib.ticker.MaxNLocator(integer=True))
+        if self.config.get('yaxis.limits') != 'auto':
+            self.handle.set_ylim([self.config.get('yaxis.min'),
+                                  self.config.get('yaxis.max')])
+
+        if data['quantity'] == 'phase':
+            ylabel = 'Phase sensitivity (deg/nm)'
+        else:
+            ylabel = 'Reflectivity sensitivity (1/nm)'
+        if data['band']:
+            ylabel = 'RMS ' + ylabel[0].lower() + ylabel[1:]
+            title = '{0:g} - {1:g} nm'.format(*data['band'])
+        else:
+            title = '{0:g} nm'.format(data['lambda0'])
+        self.handle.set_title(title, loc='left', size=10)
+        self.handle.set_xlabel('Layer (from superstrate)')
+        self.handle.set_ylabel(ylabel)
+        self.add_legend(self.lines, ['s pol', 'p pol'])
+        self.add_copyright()
+
+
+info = {
+    'sensitivity': {
+        'description': 'Layer Thickness Sensitivity',
+        'plotter': SensitivityPlot,
+    }
+}
@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+# This work is licensed under the Creative Commons Attribution-NonCommercial-
+# ShareAlike 4.0 International License. To view a copy of this license, visit
+# http://creativecommons.org/licenses/by-nc-sa/4.0/ or send a letter to Creative
+# Commons, PO Box 1866, Mountain View, CA 94042, USA.
+
+import baseplot
+import numpy as np
+import matplotlib
+from matplotlib.patches import Rectangle
+from gui import solver
+from gui import tolerance
+
+class TolerancePlot(baseplot.BasePlot):
+    def __init__(self, handle=None):
+        super(TolerancePlot, self).__init__('tolerance', handle)
+
+    def compute(self, coating, progress=None):
+        lambda0 = self.config.parent.get('coating.lambda0')
+        if self.config.get('xaxis.limits') == 'auto':
+            xlim = [0.7 * lambda0, 1.3 * lambda0]
+        else:
+            xlim = [self.config.get('xaxis.min'),
+                    self.config.get('xaxis.max')]
+
+        X = np.linspace(*xlim, num=self.config.get('xaxis.steps'))
+        AOI = self.config.parent.get('coating.AOI')
+        samples = self.config.get('analysis.samples')
+        spec = [self.config.get('analysis.spec_'+key)
+                for key in ('from', 'to', 'min', 'max')]
+        n, d = solver.stack_indices(coating, X)
+        data = tolerance.monte_carlo(n, d, X, AOI, samples,
+            self.config.get('analysis.thickness_error') / 100.0,
+            self.config.get('analysis.index_error') / 100.0,
+            spec, progress=progress)
+        data.update({'X': X, 'xlim': xlim, 'lambda0': lambda0,
+                     'spec': spec, 'samples': samples})
+        return data
+
+    def draw(self, data):
+        def to_refl(val, position):
+            refl = 1-10**(-val)
+            return '{:.7g}'.format(refl)
+
+        X, xlim = data['X'], data['xlim']
+        Y, ylim = self.scale_reflectivity(np.concatenate(
+            (data['mean'][np.newaxis], data['percentiles'])))
+        mean, P = Y[0], Y[1:]
+
+        self.lines = self.handle.plot(X, mean)
+        for k, color in enumerate(self.colors[:2]):
+            self.handle.fill_between(X, P[0,:,k], P[4,:,k], color=color,
+                                     alpha=0.15, linewidth=0)
+            self.handle.fill_between(X, P[1,:,k], P[3,:,k], color=color,
+                                     alpha=0.3, linewidth=0)
+
+        spec = data['spec']
+        spec_y = self.scale_reflectivity(np.clip(spec[2:], 0.0, 1.0 - 1e-9))[0]
+        self.handle.add_patch(Rectangle((spec[0], spec_y[0]), spec[1] - spec[0],
+            spec_y[1] - spec_y[0], fill=False, ls='--', color=self.colors[3]))
+
+        self.add_grid()
+        self.handle.set_xlim(xlim)
+        self.handle.set_ylim(ylim)
+        self.handle.axvline(data['lambda0'], ls='--', color=self.colors[4], linewidth=1.5)
+        if self.config.get('yaxis.scale') == 'log':
+            self.handle.set_yscale('log')
+            self.handle.yaxis.set_major_formatter(matplotlib.ticker.FuncFormatter(to_refl))
+            self.handle.yaxis.set_major_locator(matplotlib.ticker.MultipleLocator(1.0))
+
+        text = '{0}-{4} % and {1}-{3} % of {5} samples'.format(
+            *(tolerance.PERCENTILES + (data['samples'],)))
+        if data['yield'] is not None:
+            text += '\nyield: {0:.1f} %'.format(100 * data['yield'])
+        self.handle.text(0.02, 0.97, text, transform=self.handle.transAxes,
+                         fontsize=9, color=self.colors[3], va='top')
+
+        self.handle.set_xlabel('Wavelength (nm)')
+        self.handle.set_ylabel('Reflectivity')
+        self.add_legend(self.lines, ['s pol (mean)', 'p pol (mean)'])
+        self.add_copyright()
+
+    def export_data(self, data):
+        """Mean reflectivity and all percentiles, for both polarisations"""
+        ydata = [data['mean'][:,0], data['mean'][:,1]]
+        labels = ['Wavelength (nm)', 's pol (mean)', 'p pol (mean)']
+        for p, P in zip(tolerance.PERCENTILES, data['percentiles']):
+            ydata += [P[:,0], P[:,1]]
+            labels += ['s pol ({0} %)'.format(p), 'p pol ({0} %)'.format(p)]
+        return [data['X']], ydata, labels
+
+
+info = {
+    'tolerance': {
+        'description': 'Reflectivity Tolerances (Monte Carlo)',
+        'plotter': TolerancePlot,
+    }
+}
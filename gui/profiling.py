@@ -0,0 +1,146 @@
+#!/usr/bin/env python
+# This work is licensed under the Creative Commons Attribution-NonCommercial-
+# ShareAlike 4.0 International License. To view a copy of this license, visit
+# http://creativecommons.org/licenses/by-nc-sa/4.0/ or send a letter to Creative
+# Commons, PO Box 1866, Mountain View, CA 94042, USA.
+
+"""
+Timing instrumentation of startup and plotting.
+
+Code to be measured runs inside profiler.span(name). Spans are cheap, so
+they are always recorded; the last duration of every span is shown in the
+status bar, and all of them can be written to a JSON file with dump().
+Spans may be nested and may run in worker threads, e.g. the plot
+calculation.
+
+With enable_cprofile(), the outermost span of every thread additionally
+runs under cProfile, and dump() writes the combined statistics next to
+the JSON file, for use with pstats or a viewer like snakeviz.
+"""
+
+import os
+import json
+import time
+import cProfile
+import pstats
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from timeit import default_timer
+
+
+class Profiler(object):
+    """Records the duration of named spans, see span()"""
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        self.started = default_timer()
+        self.last = OrderedDict()
+        self.totals = OrderedDict()
+        # cProfile statistics of all spans so far, merged as they end
+        self.stats = None
+        self.cprofile = False
+
+    def enable_cprofile(self, enabled=True):
+        self.cprofile = enabled
+
+    def uptime(self):
+        """Seconds since this module was imported"""
+        return default_timer() - self.started
+
+    @contextmanager
+    def span(self, name):
+        """Measures the duration of the with block as span name"""
+        depth = getattr(self.local, 'depth', 0)
+        profile = None
+        if self.cprofile and depth == 0:
+            profile = cProfile.Profile()
+        self.local.depth = depth + 1
+        start = default_timer()
+        if profile:
+            profile.enable()
+        try:
+            yield
+        finally:
+            if profile:
+                profile.disable()
+            self.record(name, default_timer() - start)
+            self.local.depth = depth
+            if profile:
+                with self.lock:
+                    if self.stats is None:
+                        self.stats = pstats.Stats(profile)
+                    else:
+                        self.stats.add(profile)
+
+    def record(self, name, seconds):
+        with self.lock:
+            self.last[name] = seconds
+            count, total, longest = self.totals.get(name, (0, 0.0, 0.0))
+            self.totals[name] = (count + 1, total + seconds, max(longest, seconds))
+
+    def forget(self, names):
+        """
+        Drops the last durations of the spans names from summary(), their
+        totals are kept.
+        """
+        with self.lock:
+            for name in names:
+                self.last.pop(name, None)
+
+    def summary(self, names):
+        """Last durations of the spans names, e.g. for the status bar"""
+        parts = ['{0} {1}'.format(name, format_duration(self.last[name]))
+                 for name in names if name in self.last]
+        return ', '.join(parts)
+
+    def timings(self):
+        """All spans recorded so far, as a dict for dump()"""
+        with self.lock:
+            spans = OrderedDict()
+            for name, (count, total, longest) in self.totals.items():
+                spans[name] = OrderedDict([
+                    ('count', count), ('total', total),
+                    ('mean', total / count), ('max', longest),
+                    ('last', self.last.get(name)),
+                ])
+        return OrderedDict([
+            ('created', time.strftime('%Y-%m-%d %H:%M:%S')),
+            ('uptime', self.uptime()),
+            ('spans', spans),
+        ])
+
+    def dump(self, filename):
+        """
+        Writes timings() to the JSON file filename. If cProfile is enabled,
+        the statistics are written to the same name with extension .prof.
+        Returns the list of files written.
+        """
+        timings = self.timings()
+        with open(filename, 'w') as fp:
+            json.dump(timings, fp, indent=2)
+        written = [filename]
+        with self.lock:
+            if self.stats is not None:
+                prof = os.path.splitext(filename)[0] + '.prof'
+                self.stats.dump_stats(prof)
+                written.append(prof)
+        return written
+
+    def clear(self):
+        with self.lock:
+            self.last.clear()
+            self.totals.clear()
+            self.stats = None
+
+
+def format_duration(seconds):
+    if seconds < 0.01:
+        return '{0:.1f} ms'.format(1000 * seconds)
+    if seconds < 1.0:
+        return '{0:.0f} ms'.format(1000 * seconds)
+    return '{0:.2f} s'.format(seconds)
+
+
+# profiler of this process
+profiler = Profiler()
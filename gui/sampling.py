@@ -0,0 +1,80 @@
+#!/usr/bin/env python
+# This work is licensed under the Creative Commons Attribution-NonCommercial-
+# ShareAlike 4.0 International License. To view a copy of this license, visit
+# http://creativecommons.org/licenses/by-nc-sa/4.0/ or send a letter to Creative
+# Commons, PO Box 1866, Mountain View, CA 94042, USA.
+
+"""
+Adaptive sampling of one-dimensional sweeps.
+
+Spectra of multi-layer coatings are flat over wide ranges and change
+quickly at band edges and resonances. Instead of a uniform grid, refine()
+starts from a coarse grid and bisects the intervals where the curve bends
+the most, until the point budget is used up or the curve is resolved.
+"""
+
+import numpy as np
+
+# fraction of the budget spent on the initial uniform grid
+INITIAL_FRACTION = 0.25
+
+# at most this fraction of the intervals is bisected per round, so the budget
+# goes to the worst intervals instead of being spread evenly
+REFINE_FRACTION = 0.05
+
+
+def deviation(X, F):
+    """
+    Deviation of every interior point from the chord through its neighbours.
+
+    F has shape (len(X), k), the maximum over the k columns is returned.
+    """
+    w = ((X[1:-1] - X[:-2]) / (X[2:] - X[:-2]))[:, np.newaxis]
+    chord = (1 - w) * F[:-2] + w * F[2:]
+    return np.abs(F[1:-1] - chord).max(axis=1)
+
+
+def refine(evaluate, xlim, budget, features=None, rtol=1e-3, progress=None):
+    """
+    Samples evaluate() over xlim with at most budget points.
+
+    evaluate is called with an array of new x values and returns an array
+    with one row per value. Intervals are bisected where the curve deviates
+    from a straight line by more than rtol, relative to its range. features
+    may transform the evaluated rows into the quantities that are compared,
+    e.g. to ignore phase wrapping. Returns the sorted x values and the
+    corresponding rows of evaluate(). progress is called after every round
+    with the fraction of the budget used so far.
+    """
+    budget = max(int(budget), 3)
+    X = np.linspace(xlim[0], xlim[1], max(int(INITIAL_FRACTION * budget), 3))
+    Y = np.asarray(evaluate(X))
+    min_width = 1e-9 * abs(xlim[1] - xlim[0])
+    while len(X) < budget:
+        if progress:
+            progress(len(X) / float(budget))
+        F = features(Y) if features else Y
+        F = F.reshape(len(X), -1)
+        span = F.max(axis=0) - F.min(axis=0)
+        span[span == 0] = 1.0
+        dev = deviation(X, F / span)
+
+        # an interval is as bad as the worse of its end points
+        error = np.zeros(len(X) - 1)
+        error[:-1] = dev
+        error[1:] = np.maximum(error[1:], dev)
+        error[np.diff(X) <= min_width] = 0.0
+
+        count = min(budget - len(X), int(np.ceil(REFINE_FRACTION * len(X))))
+        worst = np.argsort(error)[::-1][:count]
+        worst = worst[error[worst] > rtol]
+        if not len(worst):
+            break
+        X_new = 0.5 * (X[worst] + X[worst + 1])
+        Y_new = np.asarray(evaluate(X_new))
+
+        X = np.concatenate((X, X_new))
+        Y = np.concatenate((Y, Y_new))
+        order = np.argsort(X, kind='mergesort')
+        X, Y = X[order], Y[order]
+    return X, Y
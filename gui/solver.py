@@ -0,0 +1,767 @@
+#!/usr/bin/env python
+# This work is licensed under the Creative Commons Attribution-NonCommercial-
+# ShareAlike 4.0 International License. To view a copy of this license, visit
+# http://creativecommons.org/licenses/by-nc-sa/4.0/ or send a letter to Creative
+# Commons, PO Box 1866, Mountain View, CA 94042, USA.
+
+"""
+Batched transfer-matrix solver.
+
+Instead of creating one stack per sweep point, the refractive indices of all
+layers are evaluated for the whole wavelength array at once, and the 2x2
+characteristic matrices are multiplied element-wise across that array, one
+layer at a time. Angle sweeps work the same way, with the indices evaluated
+only once for the fixed wavelength. Layers are ordered from the superstrate to
+the substrate, as in coating.layers.
+"""
+
+import json
+import hashlib
+import multiprocessing
+import numpy as np
+from collections import OrderedDict
+from multiprocessing.sharedctypes import RawArray
+import sampling
+from profiling import profiler
+import dispersion
+from dispersion import material_signature
+
+
+def coating_hash(coating):
+    """Stable hash of the layers and materials of coating"""
+    description = {
+        'superstrate': material_signature(coating.superstrate),
+        'substrate': material_signature(coating.substrate),
+        'layers': [[material_signature(layer.material), float(layer.thickness)]
+                   for layer in coating.layers],
+    }
+    text = json.dumps(description, sort_keys=True, default=str)
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+
+def grid_hash(*arrays):
+    """Stable hash of the sweep grid given by arrays"""
+    digest = hashlib.sha1()
+    for arr in arrays:
+        arr = np.ascontiguousarray(arr, dtype=float)
+        digest.update(str(arr.shape).encode('utf-8'))
+        digest.update(arr.tobytes())
+    return digest.hexdigest()
+
+
+class ResultCache(object):
+    """
+    Bounded least-recently-used cache of solver results.
+
+    Keys are typically built from coating_hash() and grid_hash(), so that
+    redrawing a plot with only cosmetic changes does not recompute the stack.
+    """
+    def __init__(self, maxsize=16):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+
+    def get(self, key):
+        try:
+            value = self.entries.pop(key)
+        except KeyError:
+            return None
+        self.entries[key] = value
+        return value
+
+    def put(self, key, value):
+        self.entries.pop(key, None)
+        self.entries[key] = value
+        while len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+    def clear(self):
+        self.entries.clear()
+
+    def __len__(self):
+        return len(self.entries)
+
+
+# responses of recent solve() calls
+cache = ResultCache()
+
+# partial products of the last live solve() call, see LiveStack
+live_stack = None
+
+# LiveStack is only kept if it holds fewer than this many array elements
+LIVE_STACK_LIMIT = 4000000
+
+# sweeps with fewer points times layers are not worth starting a process pool
+PARALLEL_MIN_SIZE = 2000000
+
+# grid points propagated at once by grid_sweep()
+GRID_CHUNK_POINTS = 250000
+
+
+class Cancelled(Exception):
+    """Raised by progress callbacks to abort a running calculation"""
+    pass
+
+
+def stack_indices(coating, wavelength, use_cache=True):
+    """
+    Returns refractive indices and thicknesses of coating.
+
+    The indices are returned as a list [superstrate, layers..., substrate],
+    each entry an array of the same shape as wavelength. Every distinct
+    material is only evaluated once, so that layers of the same material
+    share the same array object. With use_cache, the indices are kept for
+    later calls, see dispersion.DispersionCache; grids that are only used
+    once should not be kept, as they would push out the others.
+    """
+    with profiler.span('materials'):
+        grid = grid_hash(wavelength) if use_cache else None
+        evaluated = {}
+        def index(material):
+            if material.name not in evaluated:
+                if use_cache:
+                    evaluated[material.name] = dispersion.cache.index(
+                        material, wavelength, grid)
+                else:
+                    evaluated[material.name] = dispersion.refractive_index(
+                        material, wavelength)
+            return evaluated[material.name]
+
+        n = [index(coating.superstrate)]
+        n += [index(layer.material) for layer in coating.layers]
+        n.append(index(coating.substrate))
+        d = [float(layer.thickness) for layer in coating.layers]
+    return n, d
+
+
+class Response(object):
+    """
+    Optical response of a stack for both polarisations.
+
+    Holds the result of a single solver pass, from which reflectivity,
+    transmission and phase are derived without recalculating the stack.
+    All quantities have the broadcast shape of wavelength and AOI, with an
+    additional trailing axis for the polarisations.
+    """
+    def __init__(self, r, t, eta0, etam):
+        self.r = r
+        self.t = t
+        self.eta0 = eta0
+        self.etam = etam
+
+    def reflectivity(self):
+        """s- and p-polarised power reflectivity"""
+        return np.stack([np.abs(self.r[pol])**2 for pol in ('s', 'p')], axis=-1)
+
+    def transmission(self):
+        """s- and p-polarised power transmission into the substrate"""
+        T = [np.real(self.eta0[pol]) * np.real(self.etam[pol]) /
+             np.real(self.eta0[pol] * np.conj(self.eta0[pol])) *
+             np.abs(self.t[pol])**2 for pol in ('s', 'p')]
+        return np.stack(T, axis=-1)
+
+    def absorption(self):
+        """s- and p-polarised power absorbed in the layers, 1 - R - T"""
+        return 1.0 - self.reflectivity() - self.transmission()
+
+    def phase(self):
+        """s- and p-polarised reflection phase and their difference (rad)"""
+        phi_s = np.angle(self.r['s'])
+        phi_p = np.angle(self.r['p'])
+        return np.stack((phi_s, phi_p, phi_s - phi_p), axis=-1)
+
+
+class Stack(object):
+    """
+    Characteristic matrices of a multi-layer stack.
+
+    n is a list of refractive indices [superstrate, layers..., substrate] and
+    d the list of layer thicknesses (nm), wavelength is given in nm and AOI
+    in degrees. Wavelength, AOI and the indices may be arrays, they are
+    broadcast against each other. Absorbing media have complex indices
+    n - ik, for waves travelling as exp(i(wt - kz)).
+    """
+    def __init__(self, n, d, wavelength, AOI=0.0):
+        self.n = list(n)
+        self.d = list(d)
+        self.wavelength = np.asarray(wavelength, dtype=float)
+        self.AOI = np.asarray(AOI, dtype=float)
+        # Snell's invariant n*sin(theta), the same in all layers
+        self.s0 = self.n[0] * np.sin(np.radians(self.AOI))
+        self.shape = np.broadcast(self.wavelength, self.s0).shape
+        self.admittances = {}
+        self.phases = (None, None, None)
+
+    def admittance(self, n):
+        """
+        Returns cos(theta) and the tilted admittances for index n.
+
+        These only depend on the material, so they are calculated once for
+        every distinct index array.
+        """
+        key = id(n)
+        if key not in self.admittances:
+            cos = np.sqrt(1.0 + 0j - (self.s0 / n)**2)
+            # choose the root for which the forward wave exp(-i k z) decays,
+            # e.g. the evanescent wave beyond total internal reflection
+            cos = np.where(np.imag(n * cos) > 0, -cos, cos)
+            self.admittances[key] = (n, cos, {'s': n * cos, 'p': n / cos})
+        return self.admittances[key][1:]
+
+    def phase(self, j):
+        """
+        Returns cos(delta) and i*sin(delta) of the phase thickness delta of
+        layer j.
+
+        These are the same for both polarisations, so the result for the
+        last layer is kept, along with its index and thickness, which may be
+        replaced in the meantime, see LiveStack. Lossless layers use the
+        cheaper real functions.
+        """
+        nj = self.n[j+1]
+        dj = self.d[j]
+        if self.phases[0] != j or self.phases[1] is not nj or self.phases[2] is not dj:
+            cos = self.admittance(nj)[0]
+            delta = 2 * np.pi * nj * dj * cos / self.wavelength
+            if not np.any(delta.imag):
+                delta = delta.real
+            self.phases = (j, nj, dj, np.cos(delta), 1j * np.sin(delta))
+        return self.phases[3:]
+
+    def matrix(self, j, pol):
+        """Characteristic matrix (m11, m12, m21, m22) of layer j"""
+        eta = self.admittance(self.n[j+1])[1]
+        cd, sd = self.phase(j)
+        return cd, sd / eta[pol], sd * eta[pol], cd
+
+    def derivative(self, j, pol):
+        """Derivative of the characteristic matrix of layer j by its thickness"""
+        nj = self.n[j+1]
+        cos, eta = self.admittance(nj)
+        k = 2j * np.pi * nj * cos / self.wavelength
+        cd, sd = self.phase(j)
+        sd = k * sd
+        cd = k * cd
+        return sd, cd / eta[pol], cd * eta[pol], sd
+
+    def substrate(self, pol):
+        """Field vector [B, C] = [1, eta_m] at the substrate interface"""
+        B = np.ones(self.shape, dtype=complex)
+        return B, B * self.admittance(self.n[-1])[1][pol]
+
+    def response(self, fields):
+        """Response for the fields {pol: [B, C]} at the superstrate"""
+        r = {}
+        t = {}
+        eta0 = self.admittance(self.n[0])[1]
+        for pol in ('s', 'p'):
+            B, C = fields[pol]
+            Y = eta0[pol] * B
+            r[pol] = (Y - C) / (Y + C)
+            t[pol] = 2 * eta0[pol] / (Y + C)
+        return Response(r, t, eta0, self.admittance(self.n[-1])[1])
+
+
+def apply(M, v):
+    """Multiplies the 2x2 matrix M with the vector v, element-wise"""
+    return M[0] * v[0] + M[1] * v[1], M[2] * v[0] + M[3] * v[1]
+
+
+def multiply(M, N):
+    """Multiplies the 2x2 matrices M and N, element-wise"""
+    return (M[0] * N[0] + M[1] * N[2], M[0] * N[1] + M[1] * N[3],
+            M[2] * N[0] + M[3] * N[2], M[2] * N[1] + M[3] * N[3])
+
+
+def propagate(n, d, wavelength, AOI=0.0, progress=None):
+    """
+    Calculates the optical response of a multi-layer stack.
+
+    Takes the same arguments as Stack and returns a Response.
+
+    If given, progress is called with the completed fraction after every
+    layer; it may raise Cancelled to abort the calculation.
+    """
+    stack = Stack(n, d, wavelength, AOI)
+    L = len(stack.d)
+    # propagate [B, C] = M_1 ... M_L [1, eta_m] from the substrate side,
+    # both polarisations at once to share the phase thickness of every layer
+    fields = {pol: stack.substrate(pol) for pol in ('s', 'p')}
+    for done, j in enumerate(reversed(range(L)), 1):
+        for pol in ('s', 'p'):
+            fields[pol] = apply(stack.matrix(j, pol), fields[pol])
+        if progress:
+            progress(done / float(L))
+    return stack.response(fields)
+
+
+def field_intensity(n, d, wavelength, AOI=0.0, steps=100):
+    """
+    Electric field intensity over the depth of a multi-layer stack.
+
+    Takes n and d like Stack, for a single wavelength and AOI. The fields
+    at all interfaces are propagated from the substrate once per
+    polarisation and split into forward and backward travelling waves.
+    The intensity is then evaluated at steps positions in every layer, as
+    well as half a wavelength into the superstrate and the substrate.
+
+    Returns the positions (nm, from the superstrate interface) and a dict
+    {pol: intensity}, normalised to the incident intensity. For p
+    polarisation this includes the field component normal to the layers.
+    """
+    stack = Stack(n, d, wavelength, AOI)
+    L = len(stack.d)
+    index = np.array([complex(nj) for nj in stack.n])
+    cos = np.array([complex(stack.admittance(nj)[0]) for nj in stack.n])
+    k = 2 * np.pi * index * cos / float(wavelength)
+
+    # positions of the regions superstrate, layers, substrate
+    half = 0.5 * float(wavelength) / np.real(index[[0, -1]])
+    bounds = np.concatenate(([0.0], np.cumsum(stack.d)))
+    top = np.concatenate(([0.0], bounds))
+    start = np.concatenate(([-half[0]], np.zeros(L + 1)))
+    length = np.concatenate(([half[0]], stack.d, [half[1]]))
+    u = start[:, np.newaxis] + length[:, np.newaxis] * np.linspace(0.0, 1.0, steps)
+    X = (top[:, np.newaxis] + u).ravel()
+
+    # normal field component relative to the tangential one, for p pol
+    tan2 = np.abs(stack.s0 / (index * cos))**2
+    intensity = {}
+    for pol in ('s', 'p'):
+        eta = np.array([complex(stack.admittance(nj)[1][pol]) for nj in stack.n])
+        # tangential fields [E, H] at the top of every region
+        fields = np.zeros((L + 2, 2), dtype=complex)
+        v = stack.substrate(pol)
+        fields[-1] = v
+        for j in reversed(range(L)):
+            v = apply(stack.matrix(j, pol), v)
+            fields[j + 1] = v
+        fields[0] = fields[1]
+        forward = 0.5 * (fields[:, 0] + fields[:, 1] / eta)
+        backward = 0.5 * (fields[:, 0] - fields[:, 1] / eta)
+        incident = forward[0]
+
+        phase = np.exp(-1j * k[:, np.newaxis] * u)
+        Ef = (forward / incident)[:, np.newaxis] * phase
+        Eb = (backward / incident)[:, np.newaxis] / phase
+        I = np.abs(Ef + Eb)**2
+        if pol == 'p':
+            I = (I + tan2[:, np.newaxis] * np.abs(Ef - Eb)**2) * np.abs(cos[0])**2
+        intensity[pol] = I.ravel()
+    return X, intensity
+
+
+def gradient(n, d, wavelength, AOI=0.0):
+    """
+    Reflection coefficients and their derivatives by every layer thickness.
+
+    Takes the same arguments as Stack. The derivatives are calculated
+    analytically from the partial products of the matrices above and the
+    field vectors below every layer, in a single pass over the stack.
+    Returns dicts {pol: r} and {pol: dr}, where dr has an additional
+    trailing axis for the layers.
+    """
+    stack = Stack(n, d, wavelength, AOI)
+    L = len(stack.d)
+    eta0 = stack.admittance(stack.n[0])[1]
+    pols = ('s', 'p')
+    matrices = dict((pol, [None] * L) for pol in pols)
+    suffix = dict((pol, [None] * L + [stack.substrate(pol)]) for pol in pols)
+    for j in reversed(range(L)):
+        for pol in pols:
+            matrices[pol][j] = stack.matrix(j, pol)
+            suffix[pol][j] = apply(matrices[pol][j], suffix[pol][j+1])
+    r = {}
+    dr = {}
+    one = np.ones(stack.shape, dtype=complex)
+    zero = np.zeros(stack.shape, dtype=complex)
+    prefix = dict((pol, (one, zero, zero, one)) for pol in pols)
+    for pol in pols:
+        B, C = suffix[pol][0]
+        Y = eta0[pol] * B
+        r[pol] = (Y - C) / (Y + C)
+        dr[pol] = np.empty(stack.shape + (L,), dtype=complex)
+    for j in range(L):
+        for pol in pols:
+            B, C = suffix[pol][0]
+            Y = eta0[pol] * B
+            dB, dC = apply(prefix[pol], apply(stack.derivative(j, pol), suffix[pol][j+1]))
+            dr[pol][..., j] = 2 * eta0[pol] * (dB * C - B * dC) / (Y + C)**2
+            prefix[pol] = multiply(prefix[pol], matrices[pol][j])
+    return r, dr
+
+
+def sensitivity(n, d, wavelength, AOI=0.0, quantity='reflectivity'):
+    """
+    Derivatives of the reflectivity (1/nm) or the reflection phase (deg/nm)
+    by every layer thickness, see gradient().
+
+    Returns an array with the broadcast shape of wavelength and AOI and two
+    additional trailing axes, for the layers and the s and p polarisation.
+    """
+    r, dr = gradient(n, d, wavelength, AOI)
+    D = []
+    for pol in ('s', 'p'):
+        rp = r[pol][..., np.newaxis]
+        if quantity == 'phase':
+            D.append(np.degrees(np.imag(dr[pol] / rp)))
+        else:
+            D.append(2 * np.real(np.conj(rp) * dr[pol]))
+    return np.stack(D, axis=-1)
+
+
+def shared_array(values, shape, dtype=float):
+    """
+    Copies values, broadcast to shape, into a new shared memory array.
+
+    Returns the RawArray and a NumPy view of it.
+    """
+    size = int(np.prod(shape))
+    raw = RawArray('d', size * (2 if dtype is complex else 1))
+    view = shared_view(raw, shape, dtype)
+    view[...] = values
+    return raw, view
+
+
+def shared_view(raw, shape, dtype=float):
+    """NumPy view of the shared memory array raw"""
+    return np.ctypeslib.as_array(raw).view(dtype).reshape(shape)
+
+
+# shared memory arrays of the sweep calculated by a worker process
+worker_sweep = {}
+
+def init_worker(sweep):
+    worker_sweep.update(sweep)
+
+
+def propagate_chunk(bounds):
+    """Calculates the points start:stop of the worker's sweep"""
+    start, stop = bounds
+    sweep = worker_sweep
+    shape = (sweep['size'],)
+    def chunk(raw, dtype=float):
+        return shared_view(raw, shape, dtype)[start:stop]
+    materials = [chunk(raw, complex) for raw in sweep['materials']]
+    n = [materials[k] for k in sweep['layout']]
+    response = propagate(n, sweep['d'], chunk(sweep['wavelength']),
+                         chunk(sweep['AOI']))
+    for pol in ('s', 'p'):
+        chunk(sweep['r'][pol], complex)[:] = response.r[pol]
+        chunk(sweep['t'][pol], complex)[:] = response.t[pol]
+    return stop - start
+
+
+def parallel_propagate(n, d, wavelength, AOI=0.0, workers=0, progress=None):
+    """
+    Like propagate(), but splits the sweep into chunks, which are calculated
+    in a pool of worker processes.
+
+    The refractive indices of every distinct material, the sweep grid and
+    the results are shared memory arrays, so the stack is only handed to
+    each worker once and no arrays are copied back. workers=0 uses one
+    process per CPU. progress is called after every chunk.
+    """
+    workers = workers or multiprocessing.cpu_count()
+    wavelength = np.asarray(wavelength, dtype=float)
+    AOI = np.asarray(AOI, dtype=float)
+    shape = np.broadcast(wavelength, AOI).shape
+    size = int(np.prod(shape))
+
+    materials = []
+    layout = []
+    for nj in n:
+        index = [k for k, m in enumerate(materials) if m is nj]
+        if not index:
+            index = [len(materials)]
+            materials.append(nj)
+        layout.append(index[0])
+
+    sweep = {
+        'size': size,
+        'd': list(d),
+        'layout': layout,
+        'materials': [shared_array(m, shape, complex)[0] for m in materials],
+        'wavelength': shared_array(wavelength, shape)[0],
+        'AOI': shared_array(AOI, shape)[0],
+        'r': {pol: RawArray('d', 2 * size) for pol in ('s', 'p')},
+        't': {pol: RawArray('d', 2 * size) for pol in ('s', 'p')},
+    }
+
+    step = max(1, -(-size // (4 * workers)))
+    chunks = [(start, min(start + step, size)) for start in range(0, size, step)]
+    pool = multiprocessing.Pool(min(workers, len(chunks)), init_worker, (sweep,))
+    try:
+        done = 0
+        for points in pool.imap_unordered(propagate_chunk, chunks):
+            done += points
+            if progress:
+                progress(done / float(size))
+        pool.close()
+    except:
+        pool.terminate()
+        raise
+    finally:
+        pool.join()
+
+    # admittances of the incident and exit media are cheap to recalculate
+    stack = Stack([n[0], n[-1]], [], wavelength, AOI)
+    eta0 = stack.admittance(n[0])[1]
+    etam = stack.admittance(n[-1])[1]
+    r = {pol: shared_view(sweep['r'][pol], shape, complex) for pol in ('s', 'p')}
+    t = {pol: shared_view(sweep['t'][pol], shape, complex) for pol in ('s', 'p')}
+    return Response(r, t, eta0, etam)
+
+
+class LiveStack(object):
+    """
+    Partial products of a stack, to quickly recalculate single layers.
+
+    Keeps the products of the characteristic matrices from the superstrate
+    down to every layer (prefix) and the field vectors from the substrate up
+    to every layer (suffix). Changing a single layer then only needs that
+    layer's matrix and one matrix-vector product. Partial products that are
+    invalidated by a change are only recalculated when needed.
+    """
+    def __init__(self, stack, grid, progress=None):
+        self.stack = stack
+        self.grid = grid
+        L = len(stack.d)
+        self.prefix = {}
+        self.suffix = {}
+        self.fields = {}
+        one = np.ones(stack.shape, dtype=complex)
+        zero = np.zeros(stack.shape, dtype=complex)
+        for pol in ('s', 'p'):
+            self.prefix[pol] = [(one, zero, zero, one)] + [None] * L
+            self.suffix[pol] = [None] * L + [stack.substrate(pol)]
+        # layers on the outside, like propagate(), to share the phase thickness
+        for done, j in enumerate(reversed(range(L)), 1):
+            for pol in ('s', 'p'):
+                self.suffix[pol][j] = apply(stack.matrix(j, pol), self.suffix[pol][j+1])
+            if progress:
+                progress(done / float(L))
+        for pol in ('s', 'p'):
+            self.fields[pol] = self.suffix[pol][0]
+        # prefix[k] is valid for k <= valid_prefix, suffix[k] for k >= valid_suffix
+        self.valid_prefix = 0
+        self.valid_suffix = 0
+
+    @staticmethod
+    def size(n, d, wavelength, AOI):
+        """Number of array elements a LiveStack would hold"""
+        shape = np.broadcast(np.asarray(wavelength), np.asarray(AOI)).shape
+        return 12 * (len(d) + 1) * int(np.prod(shape))
+
+    def changed_layer(self, n, d, grid):
+        """
+        Compares to the given stack, returns the index of the only changed
+        layer, -1 if nothing changed, or None if this LiveStack cannot be
+        used to calculate it.
+        """
+        stack = self.stack
+        if (grid != self.grid or len(d) != len(stack.d) or
+                n[0] is not stack.n[0] or n[-1] is not stack.n[-1]):
+            return None
+        changed = [j for j in range(len(d))
+                   if n[j+1] is not stack.n[j+1] or d[j] != stack.d[j]]
+        if not changed:
+            return -1
+        if len(changed) > 1:
+            return None
+        return changed[0]
+
+    def update(self, j, n, d):
+        """Replaces layer j by index n and thickness d, returns the Response"""
+        stack = self.stack
+        for pol in ('s', 'p'):
+            prefix = self.prefix[pol]
+            suffix = self.suffix[pol]
+            for k in range(self.valid_prefix, j):
+                prefix[k+1] = multiply(prefix[k], stack.matrix(k, pol))
+            for k in reversed(range(j+1, self.valid_suffix)):
+                suffix[k] = apply(stack.matrix(k, pol), suffix[k+1])
+        stack.n[j+1] = n
+        stack.d[j] = d
+        for pol in ('s', 'p'):
+            suffix = self.suffix[pol]
+            suffix[j] = apply(stack.matrix(j, pol), suffix[j+1])
+            self.fields[pol] = apply(self.prefix[pol][j], suffix[j])
+        self.valid_prefix = j
+        self.valid_suffix = j
+        return stack.response(self.fields)
+
+
+def coefficients(n, d, wavelength, AOI=0.0):
+    """
+    Calculates the amplitude reflection coefficients of a multi-layer stack.
+
+    Takes the same arguments as propagate(), returns a tuple (r_s, r_p) of
+    complex arrays.
+    """
+    response = propagate(n, d, wavelength, AOI)
+    return response.r['s'], response.r['p']
+
+
+def solve(coating, wavelength, AOI=0.0, use_cache=True, progress=None,
+          workers=1, live=False):
+    """
+    Calculates the optical response of coating in a single pass.
+
+    Wavelength and AOI may be arrays, see Stack. The returned Response
+    provides reflectivity(), transmission() and phase(), e.g. arrays of
+    shape (len(wavelength), 2) for a wavelength sweep, like stacking the
+    corresponding stack methods for every point. Results are kept in the
+    module-level cache, keyed by the coating and the sweep grid. See
+    propagate() for progress.
+
+    With live, e.g. for live plot updates, the partial products of the
+    stack are kept, and if only a single layer changed since the last live
+    call on the same grid, only that layer is recalculated, see LiveStack.
+    Other calls drop the kept products. Large sweeps are split
+    across a pool of worker processes if workers is not 1, see
+    parallel_propagate(), unless this is a daemonic process, e.g. a worker
+    of CoatingBatch, which is not allowed to start processes of its own.
+    """
+    global live_stack
+    grid = grid_hash(wavelength, AOI)
+    if use_cache:
+        key = (coating_hash(coating), grid)
+        response = cache.get(key)
+        if response is not None:
+            return response
+    n, d = stack_indices(coating, wavelength)
+    size = np.broadcast(np.asarray(wavelength), np.asarray(AOI)).size
+    j = live_stack.changed_layer(n, d, grid) if live and live_stack else None
+    parallel = workers != 1 and not multiprocessing.current_process().daemon
+    if parallel and size * len(d) >= PARALLEL_MIN_SIZE:
+        live_stack = None
+        response = parallel_propagate(n, d, wavelength, AOI, workers, progress)
+    elif j is not None and j >= 0:
+        response = live_stack.update(j, n[j+1], d[j])
+    elif j is not None:
+        response = live_stack.stack.response(live_stack.fields)
+    elif live and LiveStack.size(n, d, wavelength, AOI) <= LIVE_STACK_LIMIT:
+        live_stack = None
+        live_stack = LiveStack(Stack(n, d, wavelength, AOI), grid, progress)
+        response = live_stack.stack.response(live_stack.fields)
+    else:
+        live_stack = None
+        response = propagate(n, d, wavelength, AOI, progress)
+    if use_cache:
+        cache.put(key, response)
+    return response
+
+
+def angle_sweep(coating, wavelength, AOI, progress=None):
+    """
+    Optical response of coating over an array of AOIs at a fixed wavelength.
+
+    The material dispersion is only evaluated once for the given wavelength,
+    all angles are then calculated in a single pass. Returns a Response.
+    """
+    return solve(coating, float(wavelength), np.asarray(AOI, dtype=float),
+                 progress=progress)
+
+
+def phase_features(Y):
+    """Compares phases on the unit circle, so wrapping is not a feature"""
+    return np.concatenate((np.cos(Y), np.sin(Y)), axis=1)
+
+
+def adaptive_sweep(coating, xlim, AOI, budget, quantity='reflectivity',
+                   progress=None):
+    """
+    Wavelength sweep of coating sampled adaptively, see sampling.refine().
+
+    quantity is 'reflectivity' or 'phase', the Response method whose result
+    is returned. Returns the wavelengths and the corresponding values,
+    cached like solve().
+    """
+    key = (coating_hash(coating), quantity,
+           grid_hash(np.asarray(xlim, dtype=float), AOI, budget))
+    result = cache.get(key)
+    if result is not None:
+        return result
+
+    def evaluate(X):
+        # every refinement has new points, which are not worth keeping
+        n, d = stack_indices(coating, X, use_cache=False)
+        response = propagate(n, d, X, AOI)
+        if quantity == 'phase':
+            return response.phase()
+        # narrow resonances show up in the reflection phase much further
+        # away than in the reflectivity, so it is sampled as well
+        return np.concatenate((response.reflectivity(),
+                               response.phase()[:, :2]), axis=1)
+
+    def features(Y):
+        if quantity == 'phase':
+            return phase_features(Y)
+        return np.concatenate((Y[:, :2], phase_features(Y[:, 2:])), axis=1)
+
+    X, Y = sampling.refine(evaluate, xlim, budget, features,
+                           progress=progress)
+    result = (X, Y) if quantity == 'phase' else (X, Y[:, :2])
+    cache.put(key, result)
+    return result
+
+
+def propagate_grid(n, d, wavelength, AOI, quantity='reflectivity',
+                   progress=None):
+    """
+    Optical response of a stack over a grid of wavelengths and AOIs.
+
+    Takes n and d like Stack, for one-dimensional arrays of wavelengths and
+    AOIs, where the indices are given for every wavelength. quantity is
+    'reflectivity' or 'phase', the Response method whose result is
+    returned, as an array of shape (len(wavelength), len(AOI), 2 or 3).
+
+    The grid is propagated in chunks of whole rows of at most
+    GRID_CHUNK_POINTS points, so that only the result is held in memory
+    for the full grid. See propagate() for progress.
+    """
+    wavelength = np.asarray(wavelength, dtype=float)
+    AOI = np.asarray(AOI, dtype=float)
+    W = len(wavelength)
+    step = max(1, GRID_CHUNK_POINTS // max(len(AOI), 1))
+    result = None
+    for start in range(0, W, step):
+        chunk = slice(start, min(start + step, W))
+        # keep layers of the same material on the same array, see Stack
+        rows = {}
+        for nj in n:
+            if id(nj) not in rows:
+                rows[id(nj)] = (np.asarray(nj)[chunk, np.newaxis]
+                                if np.ndim(nj) else nj)
+        nc = [rows[id(nj)] for nj in n]
+        chunk_progress = None
+        if progress:
+            chunk_progress = lambda done: progress(
+                (chunk.start + done * (chunk.stop - chunk.start)) / float(W))
+        response = propagate(nc, d, wavelength[chunk, np.newaxis],
+                             AOI[np.newaxis], chunk_progress)
+        values = getattr(response, quantity)()
+        if result is None:
+            result = np.empty((W, len(AOI), values.shape[-1]))
+        result[chunk] = values
+    return result
+
+
+def grid_sweep(coating, wavelength, AOI, quantity='reflectivity',
+               progress=None):
+    """
+    Optical response of coating over a grid of wavelengths and AOIs, see
+    propagate_grid().
+
+    The material dispersion is only evaluated once for all wavelengths.
+    Results are cached like solve().
+    """
+    wavelength = np.asarray(wavelength, dtype=float)
+    AOI = np.asarray(AOI, dtype=float)
+    key = (coating_hash(coating), quantity, grid_hash(wavelength, AOI))
+    result = cache.get(key)
+    if result is None:
+        n, d = stack_indices(coating, wavelength)
+        result = propagate_grid(n, d, wavelength, AOI, quantity, progress)
+        cache.put(key, result)
+    return result
@@ -0,0 +1,294 @@
+#!/usr/bin/env python
+# This work is licensed under the Creative Commons Attribution-NonCommercial-
+# ShareAlike 4.0 International License. To view a copy of this license, visit
+# http://creativecommons.org/licenses/by-nc-sa/4.0/ or send a letter to Creative
+# Commons, PO Box 1866, Mountain View, CA 94042, USA.
+
+"""
+Synthesis of coatings from scratch, for the targets of optimiser.
+
+Two global methods are available:
+
+- needle optimisation inserts thin layers ("needles") of the given
+  materials wherever they improve the merit function most, and refines all
+  thicknesses with optimiser.optimise() after every insertion.
+- differential evolution searches the thicknesses of a fixed sequence of
+  layers with a population of candidate designs.
+
+Both evaluate many candidate designs per step. Designs with the same
+sequence of materials are evaluated together in one solver pass, and
+batches of them are spread over a pool of worker processes, see Evaluator.
+
+A design is described by its layout, the indices of the layer materials in
+the list of materials given to Evaluator, and an array of thicknesses.
+"""
+
+import multiprocessing
+import numpy as np
+import optimiser
+import solver
+
+# number of candidates times target points evaluated in one solver pass
+CHUNK_POINTS = 200000
+
+NEEDLE_THICKNESS = 2.0
+NEEDLE_POSITIONS = 20
+MIN_THICKNESS = 0.5
+# relative improvement of the merit function below which a step has failed
+STALL = 1e-3
+# relative tolerance of the local refinement of candidate designs
+REFINE_TOLERANCE = 1e-6
+
+
+# indices and targets of the worker processes
+worker_state = {}
+
+def init_worker(state):
+    worker_state.update(state)
+
+
+def evaluate_chunk(task):
+    """Merit function of the candidates D with the given layout"""
+    layout, D = task
+    state = worker_state
+    n = [state['superstrate']] + [state['materials'][k] for k in layout]
+    n.append(state['substrate'])
+    d = [D[:, j, np.newaxis] for j in range(D.shape[1])]
+    return optimiser.merit_function(n, d, state['targets'])
+
+
+class Evaluator(object):
+    """
+    Evaluates the merit function of batches of candidate designs.
+
+    superstrate, substrate and materials are the refractive indices at the
+    target wavelengths. Batches are split into chunks of at most
+    CHUNK_POINTS candidates times target points. Unless workers is 1, large
+    batches are evaluated by a pool of worker processes, which is started
+    the first time it is needed; workers=0 uses one process per CPU. The
+    indices and targets are handed to every worker only once, when the pool
+    is started. Call close() when done.
+    """
+    def __init__(self, superstrate, substrate, materials, targets, workers=1):
+        self.state = {
+            'superstrate': superstrate,
+            'substrate': substrate,
+            'materials': list(materials),
+            'targets': targets,
+        }
+        self.targets = targets
+        self.workers = workers or multiprocessing.cpu_count()
+        self.pool = None
+
+    def indices(self, layout):
+        """Refractive indices [superstrate, layers..., substrate] of layout"""
+        state = self.state
+        n = [state['superstrate']] + [state['materials'][k] for k in layout]
+        return n + [state['substrate']]
+
+    def evaluate(self, batches):
+        """
+        Merit function of every candidate.
+
+        batches is a list of (layout, D), where every row of the array D
+        holds the thicknesses of one candidate. Returns a list with an array
+        of merit values for every batch.
+        """
+        points = len(self.targets['wavelength'])
+        batches = [(layout, np.asarray(D, dtype=float)) for layout, D in batches]
+        size = points * sum(D.size for layout, D in batches)
+        parallel = self.workers != 1 and size >= solver.PARALLEL_MIN_SIZE
+        step = max(1, CHUNK_POINTS // points)
+        if parallel:
+            total = sum(len(D) for layout, D in batches)
+            step = min(step, max(1, -(-total // (4 * self.workers))))
+        tasks = []
+        for layout, D in batches:
+            tasks += [(layout, D[i:i+step]) for i in range(0, len(D), step)]
+        if parallel:
+            if not self.pool:
+                self.pool = multiprocessing.Pool(self.workers, init_worker,
+                                                 (self.state,))
+            results = self.pool.map(evaluate_chunk, tasks)
+        else:
+            init_worker(self.state)
+            results = [evaluate_chunk(task) for task in tasks]
+        merits = []
+        for layout, D in batches:
+            chunks = -(-len(D) // step)
+            merits.append(np.concatenate(results[:chunks]))
+            results = results[chunks:]
+        return merits
+
+    def quarter_wave(self, k):
+        """Quarter-wave thickness of material k at the mean target wavelength"""
+        n = np.mean(np.real(self.state['materials'][k]))
+        return np.mean(self.targets['wavelength']) / (4.0 * n)
+
+    def refine(self, layout, d, progress=None):
+        """Fits the thicknesses of layout locally, see optimiser.optimise()"""
+        return optimiser.optimise(self.indices(layout), d, self.targets,
+                                  tolerance=REFINE_TOLERANCE, progress=progress)
+
+    def close(self):
+        if self.pool:
+            self.pool.terminate()
+            self.pool.join()
+            self.pool = None
+
+
+def step_progress(progress, fraction):
+    """
+    Progress callback for the refinements within a step of a longer run,
+    which keeps reporting fraction, the progress of the run, so that
+    progress may cancel the run between iterations of a refinement.
+    """
+    if progress:
+        return lambda refined: progress(fraction)
+    return None
+
+
+def clean(layout, d, min_thickness=MIN_THICKNESS):
+    """
+    Removes layers thinner than min_thickness and merges adjacent layers of
+    the same material. Returns the new layout and thicknesses.
+    """
+    new_layout = []
+    new_d = []
+    for k, t in zip(layout, d):
+        if t < min_thickness:
+            continue
+        if new_layout and new_layout[-1] == k:
+            new_d[-1] += t
+        else:
+            new_layout.append(k)
+            new_d.append(t)
+    return new_layout, np.array(new_d, dtype=float)
+
+
+def needle_candidates(layout, d, needles, thickness=NEEDLE_THICKNESS,
+                      positions=NEEDLE_POSITIONS):
+    """
+    Designs with one needle of thickness inserted into layout.
+
+    Needles of every material in needles are tried at positions points
+    inside every layer of a different material, as well as on top of the
+    stack and next to the substrate. Returns a list of batches (layout, D)
+    for Evaluator.evaluate().
+    """
+    u = (np.arange(positions) + 0.5) / positions
+    batches = []
+    for k in needles:
+        if not layout or k != layout[0]:
+            batches.append(([k] + list(layout), np.append(thickness, d)[np.newaxis]))
+        if layout and k != layout[-1]:
+            batches.append((list(layout) + [k], np.append(d, thickness)[np.newaxis]))
+    for j, host in enumerate(layout):
+        for k in needles:
+            if k == host:
+                continue
+            new_layout = list(layout[:j]) + [host, k, host] + list(layout[j+1:])
+            D = np.empty((positions, len(layout) + 2))
+            D[:, :j] = d[:j]
+            D[:, j] = u * d[j]
+            D[:, j+1] = thickness
+            D[:, j+2] = (1.0 - u) * d[j]
+            D[:, j+3:] = d[j+1:]
+            batches.append((new_layout, D))
+    return batches
+
+
+def growth_candidates(evaluator, layout, d, needles):
+    """
+    Designs with one or two quarter-wave layers of the materials in needles
+    added on top of the stack or next to the substrate. Returns a list of
+    (layout, d).
+    """
+    additions = [[k] for k in needles]
+    additions += [[k, m] for k in needles for m in needles if k != m]
+    candidates = []
+    for added in additions:
+        t = [evaluator.quarter_wave(k) for k in added]
+        candidates.append((added + list(layout), np.append(t, d)))
+        candidates.append((list(layout) + added, np.append(d, t)))
+    return candidates
+
+
+def needle_optimise(evaluator, layout, d, needles, iterations=20,
+                    max_layers=100, thickness=NEEDLE_THICKNESS,
+                    positions=NEEDLE_POSITIONS, progress=None):
+    """
+    Needle optimisation of the design layout, d.
+
+    Starts by refining the design, then repeatedly inserts the needle that
+    decreases the merit function most and refines again. Once no needle
+    improves the merit function by more than STALL, the best of the designs
+    from growth_candidates() is taken instead. Stops when that does not
+    help either, after iterations steps, or when the design has
+    max_layers layers. progress is called after every step and every
+    iteration of a refinement, and may raise solver.Cancelled. Returns the
+    layout, thicknesses and merit function of the final design.
+    """
+    d, merit = evaluator.refine(layout, d, step_progress(progress, 0.0))
+    layout, d = clean(layout, d)
+    for iteration in range(iterations):
+        fraction = iteration / float(iterations)
+        if progress:
+            progress(fraction)
+        if len(layout) + 2 > max_layers:
+            break
+        new_merit = merit
+        batches = needle_candidates(layout, d, needles, thickness, positions)
+        if batches:
+            merits = evaluator.evaluate(batches)
+            best = np.argmin([np.min(m) for m in merits])
+            new_layout, D = batches[best]
+            new_d, new_merit = evaluator.refine(new_layout, D[np.argmin(merits[best])],
+                                                step_progress(progress, fraction))
+        if new_merit > (1.0 - STALL) * merit:
+            grown = [evaluator.refine(l, t, step_progress(progress, fraction)) + (l,)
+                     for l, t in growth_candidates(evaluator, layout, d, needles)]
+            new_d, new_merit, new_layout = min(grown, key=lambda g: g[1])
+            if new_merit > (1.0 - STALL) * merit:
+                break
+        layout, d = clean(new_layout, new_d)
+        merit = new_merit
+    return layout, d, merit
+
+
+def differential_evolution(evaluator, layout, bounds, population=0,
+                           generations=300, F=0.7, CR=0.9, seed=None,
+                           progress=None):
+    """
+    Searches the thicknesses of layout by differential evolution.
+
+    bounds holds the maximum thickness of every layer. Uses the DE/rand/1/bin
+    scheme with population candidates (default 10 per layer, at least 40),
+    which are evaluated in one batch per generation. The best candidate is
+    refined with optimiser.optimise() at the end. progress is called after
+    every generation and every iteration of the refinement, and may raise
+    solver.Cancelled. Returns the
+    thicknesses and merit function of the best design.
+    """
+    rng = np.random.RandomState(seed)
+    bounds = np.asarray(bounds, dtype=float)
+    L = len(layout)
+    size = population or max(10 * L, 40)
+    P = rng.uniform(0.0, 1.0, (size, L)) * bounds
+    merit = evaluator.evaluate([(layout, P)])[0]
+    for generation in range(generations):
+        if progress:
+            progress(generation / float(generations))
+        # three distinct partners for every candidate, all different from it
+        partners = np.argsort(rng.uniform(size=(size, size - 1)), axis=1)[:, :3]
+        partners += partners >= np.arange(size)[:, np.newaxis]
+        a, b, c = (P[partners[:, i]] for i in range(3))
+        mutant = np.clip(a + F * (b - c), 0.0, bounds)
+        cross = rng.uniform(size=(size, L)) < CR
+        cross[np.arange(size), rng.randint(L, size=size)] = True
+        trial = np.where(cross, mutant, P)
+        trial_merit = evaluator.evaluate([(layout, trial)])[0]
+        better = trial_merit < merit
+        P[better] = trial[better]
+        merit[better] = trial_merit[better]
+    return evaluator.refine(layout, P[np.argmin(merit)], step_progress(progress, 1.0))
@@ -0,0 +1,60 @@
+#!/usr/bin/env python
+# This work is licensed under the Creative Commons Attribution-NonCommercial-
+# ShareAlike 4.0 International License. To view a copy of this license, visit
+# http://creativecommons.org/licenses/by-nc-sa/4.0/ or send a letter to Creative
+# Commons, PO Box 1866, Mountain View, CA 94042, USA.
+
+import os
+import shutil
+import tempfile
+import benchmark
+import unittest
+
+class TestBenchmark(unittest.TestCase):
+    """Testing the benchmark bookkeeping"""
+
+    def test_measure(self):
+        calls = []
+        times = benchmark.measure(lambda: calls.append(1), min_time=0.0,
+                                  min_repeats=3)
+        self.assertEqual(len(times), 3)
+        self.assertEqual(len(calls), 3)
+        times = benchmark.measure(lambda: None, min_time=10.0, max_repeats=5)
+        self.assertEqual(len(times), 5)
+
+    def test_cases(self):
+        cases = list(benchmark.cases(['efi', 'datafile', 'config_load'],
+                                     layers=(10, 50), points=(100,)))
+        self.assertEqual(cases, [('efi', 10, 100), ('efi', 50, 100),
+                                 ('datafile', None, 100),
+                                 ('config_load', 10, None), ('config_load', 50, None)])
+        self.assertEqual(benchmark.case_key('efi', 10, 100), 'efi/layers=10/points=100')
+        self.assertEqual(benchmark.case_key('datafile', points=100), 'datafile/points=100')
+
+    def test_compare(self):
+        baseline = {'a': {'best': 0.1}, 'b': {'best': 0.1},
+                    'c': {'best': 0.1}, 'd': {'best': 0.0001}}
+        results = {'a': {'best': 0.11}, 'b': {'best': 0.2}, 'c': {'best': 0.05},
+                   'd': {'best': 0.0003}, 'e': {'best': 0.1}}
+        rows = dict((row[0], row) for row in
+                    benchmark.compare(results, baseline, tolerance=0.25))
+        self.assertEqual(rows['a'][3], 'ok')
+        self.assertEqual(rows['b'][3], 'slower')
+        self.assertEqual(rows['c'][3], 'faster')
+        # below the noise level
+        self.assertEqual(rows['d'][3], 'ok')
+        self.assertEqual(rows['e'], ('e', None, 0.1, 'new'))
+        self.assertEqual([row[0] for row in benchmark.regressions(rows.values())], ['b'])
+
+    def test_save_load(self):
+        tmpdir = tempfile.mkdtemp()
+        try:
+            fn = os.path.join(tmpdir, 'results.json')
+            results = {'a': {'best': 0.1, 'median': 0.2}}
+            benchmark.save(fn, results)
+            self.assertEqual(benchmark.load(fn), results)
+        finally:
+            shutil.rmtree(tmpdir)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,141 @@
+#!/usr/bin/env python
+# This work is licensed under the Creative Commons Attribution-NonCommercial-
+# ShareAlike 4.0 International License. To view a copy of this license, visit
+# http://creativecommons.org/licenses/by-nc-sa/4.0/ or send a letter to Creative
+# Commons, PO Box 1866, Mountain View, CA 94042, USA.
+
+import unittest
+import os
+import numpy as np
+import datafile
+import dispersion
+from coatingtk.utils import UnreadableFile, UnexpectedFileLayout
+from coatingtk.materials import MaterialLibrary
+
+class TestDataFile(unittest.TestCase):
+    """Test the vectorised DataFileWrapper and the parsed-file cache"""
+
+    def setUp(self):
+        fn = open('tmp_data_file.dat', 'w')
+        fn.write('# x\ty\n100\t10\n200\t20\n250\t25\n')
+        fn.close()
+
+    def tearDown(self):
+        for fn in ['tmp_data_file.dat', datafile.sidecar_name('tmp_data_file.dat')]:
+            if os.path.exists(fn):
+                os.remove(fn)
+
+    def test_nonexisting_file(self):
+        self.assertRaises(UnreadableFile, datafile.load, 'does_not_exist.dat')
+
+    def test_wrong_shape(self):
+        fn = open('tmp_wrong_shape_file.dat', 'w')
+        fn.write('100\t10\t20\t30\n')
+        fn.close()
+        self.assertRaises(UnexpectedFileLayout, datafile.DataFileWrapper,
+                          'tmp_wrong_shape_file.dat')
+        os.remove('tmp_wrong_shape_file.dat')
+
+    def test_data_interpolation(self):
+        dfw = datafile.DataFileWrapper('tmp_data_file.dat')
+        self.assertAlmostEqual(dfw.value(100), 10)
+        self.assertAlmostEqual(dfw.value(150), 15)
+        self.assertAlmostEqual(dfw.value(300), 25)
+        self.assertAlmostEqual(dfw.value(-100), 10)
+
+    def test_array_interpolation(self):
+        dfw = datafile.DataFileWrapper('tmp_data_file.dat')
+        x = np.array([[0, 100, 150], [225, 250, 300]])
+        y = dfw.value(x)
+        self.assertEqual(y.shape, x.shape)
+        self.assertTrue(np.allclose(y, [[10, 10, 15], [22.5, 25, 25]]))
+
+    def test_extinction_column(self):
+        fn = open('tmp_nk_file.dat', 'w')
+        fn.write('100\t1.5\t0.0\n200\t2.5\t1.0\n')
+        fn.close()
+        dfw = datafile.DataFileWrapper('tmp_nk_file.dat', sidecar=False)
+        os.remove('tmp_nk_file.dat')
+        self.assertEqual(dfw.columns, 3)
+        self.assertAlmostEqual(dfw.value(150), 2.0)
+        self.assertAlmostEqual(dfw.value(150, column=2), 0.5)
+
+    def test_sidecar(self):
+        sidecar = datafile.sidecar_name('tmp_data_file.dat')
+        datafile.DataFileWrapper('tmp_data_file.dat', sidecar=False)
+        self.assertFalse(os.path.exists(sidecar))
+        datafile.DataFileWrapper('tmp_data_file.dat')
+        self.assertTrue(os.path.exists(sidecar))
+        dfw = datafile.DataFileWrapper('tmp_data_file.dat')
+        self.assertTrue(isinstance(dfw.data, np.memmap))
+        self.assertAlmostEqual(dfw.value(150), 15)
+        # a replaced text file is detected, even if older than the sidecar
+        with open('tmp_data_file.dat', 'w') as fn:
+            fn.write('# x\ty\n100\t30\n200\t40\n250\t45\n')
+        os.utime('tmp_data_file.dat', (1000, 1000))
+        dfw = datafile.DataFileWrapper('tmp_data_file.dat')
+        self.assertFalse(isinstance(dfw.data, np.memmap))
+        self.assertAlmostEqual(dfw.value(150), 35)
+
+    def test_cache(self):
+        dfw = datafile.load('tmp_data_file.dat')
+        self.assertTrue(datafile.load(os.path.abspath('tmp_data_file.dat')) is dfw)
+        os.utime('tmp_data_file.dat', (0, 0))
+        self.assertFalse(datafile.load('tmp_data_file.dat') is dfw)
+
+    def load_materials(self, definitions):
+        """
+        Loads definitions into the material library with install() in
+        effect, returns the number of files parsed.
+        """
+        parsed = []
+        parse = datafile.parse
+        def counting_parse(filename):
+            parsed.append(filename)
+            return parse(filename)
+        library = MaterialLibrary.Instance()
+        datafile.files.clear()
+        datafile.parse = counting_parse
+        datafile.install()
+        try:
+            library.load_materials(definitions)
+        finally:
+            datafile.uninstall()
+            datafile.parse = parse
+        return len(parsed)
+
+    def test_shared_material_file(self):
+        definition = {'B': [0.0, 0.0, 0.0], 'C': [0.0, 0.0, 0.0],
+                      'n_file': 'tmp_data_file.dat'}
+        library = MaterialLibrary.Instance()
+        try:
+            parsed = self.load_materials({'TmpMaterialA': dict(definition),
+                                          'TmpMaterialB': dict(definition)})
+            self.assertEqual(parsed, 1)
+            self.assertAlmostEqual(library.get_material('TmpMaterialA').n(150), 15)
+            self.assertAlmostEqual(library.get_material('TmpMaterialB').n(225), 22.5)
+        finally:
+            library.unregister('TmpMaterialA')
+            library.unregister('TmpMaterialB')
+
+    def test_absorbing_material_file(self):
+        # coatingtk's own reader does not accept a k column
+        fn = open('tmp_nk_file.dat', 'w')
+        fn.write('100\t1.5\t0.0\n200\t2.5\t1.0\n')
+        fn.close()
+        library = MaterialLibrary.Instance()
+        try:
+            self.load_materials({'TmpAbsorber': {'B': [0.0, 0.0, 0.0],
+                                 'C': [0.0, 0.0, 0.0], 'n_file': 'tmp_nk_file.dat'}})
+            material = library.get_material('TmpAbsorber')
+            self.assertAlmostEqual(material.n(150), 2.0)
+            n = dispersion.refractive_index(material, np.array([150.0]))
+            self.assertTrue(np.allclose(n, 2.0 - 0.5j))
+        finally:
+            library.unregister('TmpAbsorber')
+            for fn in ['tmp_nk_file.dat', datafile.sidecar_name('tmp_nk_file.dat')]:
+                if os.path.exists(fn):
+                    os.remove(fn)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python
+# This work is licensed under the Creative Commons Attribution-NonCommercial-
+# ShareAlike 4.0 International License. To view a copy of this license, visit
+# http://creativecommons.org/licenses/by-nc-sa/4.0/ or send a letter to Creative
+# Commons, PO Box 1866, Mountain View, CA 94042, USA.
+
+import dispersion
+import numpy as np
+import unittest
+
+class CountingMaterial(object):
+    """Material with a constant index that counts its evaluations"""
+    def __init__(self, name, index):
+        self.name = name
+        self.index = index
+        self.calls = 0
+
+    def n(self, wavelength):
+        self.calls += 1
+        return self.index * np.ones_like(wavelength)
+
+    def save(self):
+        return {'B': [self.index**2 - 1.0, 0.0, 0.0], 'C': [0.0, 0.0, 0.0],
+                'n_file': ''}
+
+class TestDispersion(unittest.TestCase):
+    """Testing the dispersion cache"""
+
+    def setUp(self):
+        self.cache = dispersion.DispersionCache(maxsize=2)
+        self.wl = np.linspace(500, 1500, 11)
+
+    def test_evaluated_once(self):
+        m = CountingMaterial('SiO2', 1.45)
+        n = self.cache.index(m, self.wl, 'grid')
+        self.assertEqual(n.shape, self.wl.shape)
+        self.assertTrue(np.allclose(n, 1.45))
+        self.assertTrue(self.cache.index(m, self.wl, 'grid') is n)
+        self.assertEqual(m.calls, 1)
+
+    def test_changed_material(self):
+        m = CountingMaterial('SiO2', 1.45)
+        self.cache.index(m, self.wl, 'grid')
+        m.index = 1.46
+        self.assertTrue(np.allclose(self.cache.index(m, self.wl, 'grid'), 1.46))
+        self.assertEqual(m.calls, 2)
+
+    def test_invalidate(self):
+        m = CountingMaterial('SiO2', 1.45)
+        self.cache.index(m, self.wl, 'grid')
+        self.cache.index(m, self.wl[:5], 'other grid')
+        self.assertEqual(len(self.cache), 2)
+        self.cache.invalidate('Ta2O5')
+        self.assertEqual(len(self.cache), 2)
+        self.cache.invalidate('SiO2')
+        self.assertEqual(len(self.cache), 0)
+        self.cache.index(m, self.wl, 'grid')
+        self.assertEqual(m.calls, 3)
+
+    def test_extinction(self):
+        m = CountingMaterial('Absorber', 3.5)
+        config = dispersion.Config.Instance()
+        config.set('extinction', {'Absorber': 0.1})
+        try:
+            n = self.cache.index(m, self.wl, 'grid')
+            self.assertTrue(np.allclose(n, 3.5 - 0.1j))
+            config.set('extinction', {})
+            n = self.cache.index(m, self.wl, 'grid')
+            self.assertTrue(np.allclose(n, 3.5))
+        finally:
+            config.set('extinction', {})
+
+    def test_remove_extinction(self):
+        config = dispersion.Config.Instance()
+        config.set('extinction', {'Absorber': 0.1, 'Other': 0.2})
+        try:
+            dispersion.remove_extinction('Absorber')
+            dispersion.remove_extinction('Missing')
+            self.assertEqual(config.get('extinction'), {'Other': 0.2})
+            self.assertEqual(dispersion.extinction('Absorber'), 0.0)
+        finally:
+            config.set('extinction', {})
+
+    def test_scalar_fallback(self):
+        m = CountingMaterial('SiO2', 1.45)
+        m.n = lambda wavelength: 1.45
+        n = dispersion.refractive_index(m, self.wl)
+        self.assertEqual(n.shape, self.wl.shape)
+
+if __name__ == '__main__':
+    unittest.main()
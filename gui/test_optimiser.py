@@ -0,0 +1,41 @@
+#!/usr/bin/env python
+# This work is licensed under the Creative Commons Attribution-NonCommercial-
+# ShareAlike 4.0 International License. To view a copy of this license, visit
+# http://creativecommons.org/licenses/by-nc-sa/4.0/ or send a letter to Creative
+# Commons, PO Box 1866, Mountain View, CA 94042, USA.
+
+import optimiser
+import numpy as np
+import unittest
+
+class TestOptimiser(unittest.TestCase):
+    """Testing the layer thickness optimiser"""
+
+    def test_parse_targets(self):
+        targets = optimiser.parse_targets('# comment\n1064 0 s 0.5\n\n'
+                                          '900:1000:5 45 avg 0.0 2 # band\n')
+        self.assertEqual(len(targets['wavelength']), 6)
+        self.assertEqual(list(targets['pol']), [0, 2, 2, 2, 2, 2])
+        self.assertAlmostEqual(targets['wavelength'][-1], 1000.0)
+        self.assertAlmostEqual(targets['weight'][-1], 2.0)
+        self.assertAlmostEqual(targets['AOI'][-1], 45.0)
+
+    def test_invalid_targets(self):
+        for text in ['', '1064 0 x 0.5', '1064 0 s', 'a:b 0 s 0.5']:
+            self.assertRaises(optimiser.TargetError, optimiser.parse_targets, text)
+
+    def test_recovers_design(self):
+        targets = optimiser.parse_targets('800:1300:26 0 s 0\n800:1300:26 30 p 0\n')
+        shape = targets['wavelength'].shape
+        n = [1.0] + [np.full(shape, 2.1 + 0j), np.full(shape, 1.45 + 0j)] * 3 + [1.5]
+        design = [110.0, 250.0, 90.0, 170.0, 140.0, 200.0]
+        R, J = optimiser.reflectivity(n, design, targets)
+        self.assertEqual(J.shape, (52, 6))
+        targets['R'] = R
+        start = [1.05 * t for t in design]
+        d, merit = optimiser.optimise(n, start, targets)
+        self.assertTrue(merit < 1e-12)
+        self.assertTrue(np.allclose(d, design, atol=0.1))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,42 @@
+#!/usr/bin/env python
+# This work is licensed under the Creative Commons Attribution-NonCommercial-
+# ShareAlike 4.0 International License. To view a copy of this license, visit
+# http://creativecommons.org/licenses/by-nc-sa/4.0/ or send a letter to Creative
+# Commons, PO Box 1866, Mountain View, CA 94042, USA.
+
+import os
+import plothandler
+import tempfile
+import unittest
+
+class TestPlotHandler(unittest.TestCase):
+    """Testing the discovery of plots"""
+
+    def test_read_descriptions(self):
+        source = ("import numpy\n"
+                  "class APlot(object): pass\n"
+                  "info = {\n"
+                  "    'a_plot': {'description': 'A Plot', 'plotter': APlot},\n"
+                  "    'b_plot': {'plotter': APlot},\n"
+                  "}\n")
+        fd, fn = tempfile.mkstemp(suffix='.py')
+        try:
+            with os.fdopen(fd, 'w') as fp:
+                fp.write(source)
+            descriptions = plothandler.read_descriptions(fn)
+        finally:
+            os.remove(fn)
+        self.assertEqual(descriptions, {'a_plot': 'A Plot', 'b_plot': 'b_plot'})
+
+    def test_plot_modules(self):
+        path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'plots')
+        descriptions = plothandler.read_descriptions(os.path.join(path, 'plot_R_Lambda.py'))
+        self.assertEqual(descriptions, {'r_lambda': 'Reflectivity over Wavelength'})
+
+    def test_lazy_import(self):
+        info = plothandler.PlotInfo('a_plot', 'A_Plot', 'A Plot', modules={})
+        self.assertEqual(info['description'], 'A Plot')
+        self.assertRaises(KeyError, lambda: info['plotter'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python
+# This work is licensed under the Creative Commons Attribution-NonCommercial-
+# ShareAlike 4.0 International License. To view a copy of this license, visit
+# http://creativecommons.org/licenses/by-nc-sa/4.0/ or send a letter to Creative
+# Commons, PO Box 1866, Mountain View, CA 94042, USA.
+
+import os
+import json
+import pstats
+import shutil
+import tempfile
+import threading
+import profiling
+import unittest
+
+class TestProfiling(unittest.TestCase):
+    """Testing the timing instrumentation"""
+
+    def setUp(self):
+        self.profiler = profiling.Profiler()
+        self.tmpdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_spans(self):
+        for i in range(3):
+            with self.profiler.span('outer'):
+                with self.profiler.span('inner'):
+                    pass
+        self.assertRaises(ValueError, self.run_failing_span)
+        spans = self.profiler.timings()['spans']
+        self.assertEqual(spans['outer']['count'], 3)
+        self.assertEqual(spans['inner']['count'], 3)
+        self.assertEqual(spans['failing']['count'], 1)
+        self.assertTrue(spans['outer']['last'] >= spans['inner']['last'])
+        self.assertEqual(self.profiler.summary(['missing']), '')
+        self.assertTrue(self.profiler.summary(['inner', 'outer']).startswith('inner '))
+        self.profiler.forget(['inner'])
+        self.assertFalse('inner' in self.profiler.summary(['inner', 'outer']))
+
+    def run_failing_span(self):
+        with self.profiler.span('failing'):
+            raise ValueError()
+
+    def test_dump(self):
+        self.profiler.enable_cprofile()
+        thread = threading.Thread(target=self.run_span, args=('thread',))
+        thread.start()
+        thread.join()
+        self.run_span('main')
+        fn = os.path.join(self.tmpdir, 'profile.json')
+        written = self.profiler.dump(fn)
+        self.assertEqual(written, [fn, os.path.join(self.tmpdir, 'profile.prof')])
+        with open(fn) as fp:
+            spans = json.load(fp)['spans']
+        self.assertEqual(sorted(spans.keys()), ['main', 'thread'])
+        # the profiles of both spans are merged
+        stats = pstats.Stats(written[1]).stats
+        calls = [value[1] for key, value in stats.items() if 'sum' in key[2]]
+        self.assertEqual(calls, [2])
+
+    def test_dump_after_forget(self):
+        self.run_span('plot')
+        self.run_span('startup')
+        self.profiler.forget(['plot'])
+        fn = os.path.join(self.tmpdir, 'profile.json')
+        self.assertEqual(self.profiler.dump(fn), [fn])
+        with open(fn) as fp:
+            spans = json.load(fp)['spans']
+        self.assertEqual(spans['plot']['count'], 1)
+        self.assertEqual(spans['plot']['last'], None)
+        self.assertTrue(spans['startup']['last'] > 0)
+
+    def run_span(self, name):
+        with self.profiler.span(name):
+            sum(range(1000))
+
+    def test_format_duration(self):
+        self.assertEqual(profiling.format_duration(0.0012), '1.2 ms')
+        self.assertEqual(profiling.format_duration(0.25), '250 ms')
+        self.assertEqual(profiling.format_duration(2.5), '2.50 s')
+
+if __name__ == '__main__':
+    unittest.main()
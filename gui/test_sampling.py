@@ -0,0 +1,40 @@
+#!/usr/bin/env python
+# This work is licensed under the Creative Commons Attribution-NonCommercial-
+# ShareAlike 4.0 International License. To view a copy of this license, visit
+# http://creativecommons.org/licenses/by-nc-sa/4.0/ or send a letter to Creative
+# Commons, PO Box 1866, Mountain View, CA 94042, USA.
+
+import sampling
+import numpy as np
+import unittest
+
+def lorentzian(X):
+    return (1.0 / (1.0 + ((X - 1064.0) / 0.5)**2))[:, np.newaxis]
+
+class TestSampling(unittest.TestCase):
+    """Testing the adaptive sampling of sweeps"""
+
+    def test_budget(self):
+        X, Y = sampling.refine(lorentzian, [1000.0, 1100.0], 200)
+        self.assertTrue(len(X) <= 200)
+        self.assertEqual(Y.shape, (len(X), 1))
+        self.assertTrue(np.all(np.diff(X) > 0))
+        self.assertAlmostEqual(X[0], 1000.0)
+        self.assertAlmostEqual(X[-1], 1100.0)
+
+    def test_refines_resonance(self):
+        X, Y = sampling.refine(lorentzian, [1000.0, 1100.0], 200)
+        self.assertTrue(np.sum(np.abs(X - 1064.0) < 2.0) > len(X) / 4)
+        fine = np.linspace(1000.0, 1100.0, 100001)
+        error = np.abs(np.interp(fine, X, Y[:, 0]) - lorentzian(fine)[:, 0]).max()
+        uniform = np.linspace(1000.0, 1100.0, 2000)
+        error_uniform = np.abs(np.interp(fine, uniform, lorentzian(uniform)[:, 0]) -
+                               lorentzian(fine)[:, 0]).max()
+        self.assertTrue(error < error_uniform)
+
+    def test_straight_line_is_not_refined(self):
+        X, Y = sampling.refine(lambda X: 2 * X[:, np.newaxis], [0.0, 1.0], 200)
+        self.assertEqual(len(X), 50)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,254 @@
+#!/usr/bin/env python
+# This work is licensed under the Creative Commons Attribution-NonCommercial-
+# ShareAlike 4.0 International License. To view a copy of this license, visit
+# http://creativecommons.org/licenses/by-nc-sa/4.0/ or send a letter to Creative
+# Commons, PO Box 1866, Mountain View, CA 94042, USA.
+
+import solver
+import dispersion
+import numpy as np
+import unittest
+import multiprocessing
+
+class Material(object):
+    def __init__(self, name, index):
+        self.name = name
+        self.index = index
+
+    def n(self, wavelength):
+        return self.index * np.ones_like(wavelength)
+
+    def save(self):
+        return {'B': [self.index**2 - 1.0, 0.0, 0.0], 'C': [0.0, 0.0, 0.0],
+                'n_file': ''}
+
+class Layer(object):
+    def __init__(self, material, thickness):
+        self.material = material
+        self.thickness = thickness
+
+class Coating(object):
+    def __init__(self, layers):
+        self.superstrate = Material('Air', 1.0)
+        self.substrate = Material('Glass', 1.5)
+        self.layers = [Layer(Material(name, index), d) for name, index, d in layers]
+
+def solve_in_worker(wavelength):
+    """Pool entry point of test_solve_in_daemon"""
+    coating = Coating([('H', 2.1, 120.0), ('L', 1.45, 180.0)] * 4)
+    return solver.solve(coating, wavelength, 20.0, use_cache=False,
+                        workers=0).reflectivity()
+
+class TestSolver(unittest.TestCase):
+    """Testing the batched transfer-matrix solver"""
+
+    def test_bare_substrate(self):
+        wl = np.linspace(500, 1500, 11)
+        r_s, r_p = solver.coefficients([1.0, 1.5], [], wl)
+        self.assertEqual(r_s.shape, wl.shape)
+        self.assertTrue(np.allclose(np.abs(r_s)**2, 0.04))
+        self.assertTrue(np.allclose(np.abs(r_p)**2, 0.04))
+
+    def test_quarter_wave_stack(self):
+        nH, nL, nS, N = 2.1, 1.45, 1.45, 8
+        lambda0 = 1064.0
+        n = [1.0] + [nH, nL] * N + [nH, nS]
+        d = [lambda0 / (4 * nn) for nn in n[1:-1]]
+        r_s, r_p = solver.coefficients(n, d, np.array([lambda0, lambda0]))
+        Y = (nH / nL)**(2 * N) * nH**2 / nS
+        R = ((1 - Y) / (1 + Y))**2
+        self.assertTrue(np.allclose(np.abs(r_s)**2, R))
+
+    def test_half_wave_layer_is_absentee(self):
+        lambda0 = 1000.0
+        r_s, r_p = solver.coefficients([1.0, 2.0, 1.5], [lambda0 / 4.0], lambda0)
+        self.assertAlmostEqual(np.abs(r_s)**2, 0.04)
+
+    def test_brewster_angle(self):
+        AOI = np.array([0.0, np.degrees(np.arctan(1.5)), 89.0])
+        r_s, r_p = solver.coefficients([1.0, 1.5], [], 1064.0, AOI)
+        self.assertEqual(r_p.shape, AOI.shape)
+        self.assertAlmostEqual(np.abs(r_p[1])**2, 0.0)
+        self.assertTrue(np.abs(r_s[2]) > np.abs(r_s[0]))
+
+    def test_total_internal_reflection(self):
+        r_s, r_p = solver.coefficients([1.5, 1.45, 1.0], [100.0], 1064.0, 60.0)
+        self.assertAlmostEqual(np.abs(r_s)**2, 1.0)
+        self.assertAlmostEqual(np.abs(r_p)**2, 1.0)
+
+    def test_energy_conservation(self):
+        n = [1.0, 2.1, 1.45, 2.1, 1.5]
+        d = [120.0, 180.0, 120.0]
+        wl = np.linspace(600, 1600, 50)
+        response = solver.propagate(n, d, wl, 30.0)
+        R = response.reflectivity()
+        T = response.transmission()
+        self.assertEqual(R.shape, (50, 2))
+        self.assertTrue(np.allclose(R + T, 1.0))
+        self.assertEqual(response.phase().shape, (50, 3))
+
+    def test_result_cache(self):
+        cache = solver.ResultCache(maxsize=2)
+        cache.put('a', 1)
+        cache.put('b', 2)
+        self.assertEqual(cache.get('a'), 1)
+        cache.put('c', 3)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('a'), 1)
+        self.assertEqual(len(cache), 2)
+
+    def test_grid_hash(self):
+        X = np.linspace(500, 1500, 101)
+        self.assertEqual(solver.grid_hash(X, 0.0), solver.grid_hash(X.copy(), 0.0))
+        self.assertNotEqual(solver.grid_hash(X, 0.0), solver.grid_hash(X, 45.0))
+
+    def test_live_stack(self):
+        nH, nL = np.array(2.1 + 0j), np.array(1.45 + 0j)
+        n = [np.array(1.0 + 0j)] + [nH, nL] * 4 + [np.array(1.5 + 0j)]
+        d = [120.0, 180.0] * 4
+        wl = np.linspace(600, 1600, 20)
+        live = solver.LiveStack(solver.Stack(n, d, wl, 20.0), 'grid')
+        for j, nn, dd in [(5, nL, 90.0), (5, nH, 95.0), (2, nL, 300.0), (7, nH, 10.0)]:
+            n[j+1] = nn
+            d[j] = dd
+            self.assertEqual(live.changed_layer(n, d, 'grid'), j)
+            response = live.update(j, nn, dd)
+            expected = solver.propagate(n, d, wl, 20.0)
+            self.assertTrue(np.allclose(response.r['s'], expected.r['s']))
+            self.assertTrue(np.allclose(response.r['p'], expected.r['p']))
+        self.assertEqual(live.changed_layer(n, d, 'grid'), -1)
+        self.assertIsNone(live.changed_layer(n, d, 'other grid'))
+
+    def test_live_solve(self):
+        wl = np.linspace(600, 1600, 50)
+        coating = Coating([('H', 2.1, 120.0), ('L', 1.45, 180.0)] * 4)
+        solver.solve(coating, wl, 20.0, use_cache=False)
+        self.assertIsNone(solver.live_stack)
+        solver.solve(coating, wl, 20.0, use_cache=False, live=True)
+        live_stack = solver.live_stack
+        self.assertIsNotNone(live_stack)
+        coating.layers[3].thickness = 90.0
+        response = solver.solve(coating, wl, 20.0, use_cache=False, live=True)
+        self.assertTrue(solver.live_stack is live_stack)
+        n, d = solver.stack_indices(coating, wl)
+        expected = solver.propagate(n, d, wl, 20.0)
+        self.assertTrue(np.allclose(response.r['s'], expected.r['s']))
+        self.assertTrue(np.allclose(response.r['p'], expected.r['p']))
+        solver.solve(coating, wl, 20.0, use_cache=False)
+        self.assertIsNone(solver.live_stack)
+
+    def test_adaptive_sweep(self):
+        # the points of the refinement rounds are not kept by the dispersion cache
+        coating = Coating([('H', 2.1, 120.0), ('L', 1.45, 180.0)] * 4)
+        entries = len(dispersion.cache.entries)
+        X, R = solver.adaptive_sweep(coating, [600.0, 1600.0], 0.0, 200)
+        self.assertEqual(len(dispersion.cache.entries), entries)
+        n, d = solver.stack_indices(coating, X, use_cache=False)
+        self.assertTrue(np.allclose(R, solver.propagate(n, d, X).reflectivity()))
+
+    def test_parallel_propagate(self):
+        nH, nL = np.array(2.1 + 0j), np.array(1.45 + 0j)
+        n = [1.0] + [nH, nL] * 4 + [1.5]
+        d = [120.0, 180.0] * 4
+        wl = np.linspace(600, 1600, 101)
+        expected = solver.propagate(n, d, wl, 20.0)
+        response = solver.parallel_propagate(n, d, wl, 20.0, workers=2)
+        self.assertTrue(np.allclose(response.reflectivity(), expected.reflectivity()))
+        self.assertTrue(np.allclose(response.transmission(), expected.transmission()))
+
+    def test_solve_in_daemon(self):
+        # pool workers, e.g. of CoatingBatch, cannot start a pool of their own
+        wl = np.linspace(600, 1600, 1001)
+        limit = solver.PARALLEL_MIN_SIZE
+        solver.PARALLEL_MIN_SIZE = 1000
+        pool = multiprocessing.Pool(1)
+        try:
+            R = pool.apply(solve_in_worker, (wl,))
+        finally:
+            pool.close()
+            pool.join()
+            solver.PARALLEL_MIN_SIZE = limit
+        self.assertTrue(np.allclose(R, solve_in_worker(wl)))
+
+    def test_field_intensity(self):
+        n = [1.0] + [2.1, 1.45] * 8 + [1.5]
+        d = [1064.0 / (4 * nn) for nn in n[1:-1]]
+        X, I = solver.field_intensity(n, d, 1064.0, 45.0, steps=50)
+        self.assertEqual(X.shape, (50 * 18,))
+        response = solver.propagate(n, d, 1064.0, 45.0)
+        # superstrate interface and substrate, for s pol
+        self.assertAlmostEqual(I['s'][49], np.abs(1 + response.r['s'])**2)
+        self.assertAlmostEqual(I['s'][-1], np.abs(response.t['s'])**2)
+        # tangential field is continuous across interfaces
+        I_s = I['s'].reshape(-1, 50)
+        self.assertTrue(np.allclose(I_s[:-1, -1], I_s[1:, 0]))
+        X, I = solver.field_intensity(n, d, 1064.0, 0.0, steps=50)
+        self.assertTrue(np.allclose(I['s'], I['p']))
+
+    def test_absorption(self):
+        wl = np.linspace(600, 1600, 50)
+        response = solver.propagate([1.0, 2.1, 1.5], [200.0], wl, 30.0)
+        self.assertTrue(np.allclose(response.absorption(), 0.0))
+        n = [1.0, np.array(3.5 - 0.05j), 1.5]
+        response = solver.propagate(n, [200.0], wl, 30.0)
+        A = response.absorption()
+        self.assertEqual(A.shape, (50, 2))
+        self.assertTrue(np.all(A > 0))
+        self.assertTrue(np.allclose(A + response.reflectivity() +
+                                    response.transmission(), 1.0))
+
+    def test_gradient(self):
+        n = [1.0, 2.1, 1.45 - 0.01j, 2.1, 1.5]
+        d = [120.0, 180.0, 130.0]
+        wl = np.linspace(600, 1600, 20)
+        r, dr = solver.gradient(n, d, wl, 30.0)
+        self.assertEqual(dr['s'].shape, (20, 3))
+        for j in range(3):
+            d1 = list(d)
+            d1[j] += 1e-4
+            r1 = solver.propagate(n, d1, wl, 30.0).r
+            for pol in ('s', 'p'):
+                self.assertTrue(np.allclose((r1[pol] - r[pol]) / 1e-4,
+                                            dr[pol][:, j], atol=1e-6))
+
+    def test_sensitivity(self):
+        n = [1.0, 2.1, 1.45, 2.1, 1.5]
+        d = [120.0, 180.0, 130.0]
+        wl = np.linspace(600, 1600, 20)
+        dR = solver.sensitivity(n, d, wl, 30.0)
+        dphi = solver.sensitivity(n, d, wl, 30.0, 'phase')
+        self.assertEqual(dR.shape, (20, 3, 2))
+        response = solver.propagate(n, d, wl, 30.0)
+        for j in range(3):
+            d1 = list(d)
+            d1[j] += 1e-4
+            response1 = solver.propagate(n, d1, wl, 30.0)
+            R = (response1.reflectivity() - response.reflectivity()) / 1e-4
+            self.assertTrue(np.allclose(R, dR[:, j], atol=1e-6))
+            phi = np.angle(np.stack([response1.r[pol] / response.r[pol]
+                                     for pol in ('s', 'p')], axis=-1))
+            self.assertTrue(np.allclose(np.degrees(phi) / 1e-4, dphi[:, j], atol=1e-3))
+
+    def test_propagate_grid(self):
+        wl = np.linspace(600, 1600, 37)
+        AOI = np.linspace(0, 80, 11)
+        nH = 2.0 + 1e4 / wl**2 + 0j
+        nL = 1.45 + 0j
+        n = [1.0, nH, nL, nH, nL, nH, 1.5]
+        d = [120.0, 180.0, 120.0, 180.0, 120.0]
+        chunk_points = solver.GRID_CHUNK_POINTS
+        solver.GRID_CHUNK_POINTS = 50
+        try:
+            R = solver.propagate_grid(n, d, wl, AOI)
+            phase = solver.propagate_grid(n, d, wl, AOI, 'phase')
+        finally:
+            solver.GRID_CHUNK_POINTS = chunk_points
+        self.assertEqual(R.shape, (37, 11, 2))
+        self.assertEqual(phase.shape, (37, 11, 3))
+        for k, angle in enumerate(AOI):
+            expected = solver.propagate(n, d, wl, angle)
+            self.assertTrue(np.allclose(R[:, k], expected.reflectivity()))
+            self.assertTrue(np.allclose(phase[:, k], expected.phase()))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+# This work is licensed under the Creative Commons Attribution-NonCommercial-
+# ShareAlike 4.0 International License. To view a copy of this license, visit
+# http://creativecommons.org/licenses/by-nc-sa/4.0/ or send a letter to Creative
+# Commons, PO Box 1866, Mountain View, CA 94042, USA.
+
+import optimiser
+import synthesis
+import solver
+import numpy as np
+import unittest
+
+class TestSynthesis(unittest.TestCase):
+    """Testing the coating synthesis"""
+
+    def setUp(self):
+        self.targets = optimiser.parse_targets('950:1150:21 0 s 0.99\n'
+                                               '600:800:21 0 s 0.0 0.5\n')
+        shape = self.targets['wavelength'].shape
+        materials = [np.full(shape, 2.1 + 0j), np.full(shape, 1.45 + 0j)]
+        self.evaluator = synthesis.Evaluator(1.0, 1.45, materials, self.targets)
+
+    def tearDown(self):
+        self.evaluator.close()
+
+    def test_clean(self):
+        layout, d = synthesis.clean([0, 1, 0, 0, 1, 0], [10.0, 0.1, 20.0, 5.0, 30.0, 0.0])
+        self.assertEqual(layout, [0, 1])
+        self.assertTrue(np.allclose(d, [35.0, 30.0]))
+
+    def test_needle_candidates(self):
+        d = np.array([100.0, 200.0])
+        batches = synthesis.needle_candidates([0, 1], d, [0, 1], positions=4)
+        layouts = [layout for layout, D in batches]
+        self.assertTrue([0, 1, 0] in layouts)
+        self.assertTrue([1, 0, 1] in layouts)
+        self.assertTrue([0, 1, 0, 1] in layouts)
+        for layout, D in batches:
+            self.assertEqual(D.shape[1], len(layout))
+            self.assertTrue(np.allclose(D.sum(axis=1), 300.0 + synthesis.NEEDLE_THICKNESS))
+
+    def test_batched_merit(self):
+        D = np.array([[120.0, 180.0], [130.0, 170.0], [0.0, 0.0]])
+        merits = self.evaluator.evaluate([([0, 1], D)])[0]
+        for d, merit in zip(D, merits):
+            n = self.evaluator.indices([0, 1])
+            self.assertAlmostEqual(merit, optimiser.merit_function(n, d, self.targets))
+
+    def test_needle_optimise(self):
+        start = self.evaluator.evaluate([([0], [[250.0]])])[0][0]
+        layout, d, merit = synthesis.needle_optimise(self.evaluator, [0], [250.0],
+                                                     [0, 1], iterations=3)
+        self.assertTrue(len(layout) > 1)
+        self.assertTrue(merit < 0.5 * start)
+
+    def test_cancel_refinement(self):
+        # the first refinement already checks for cancellation
+        calls = []
+        def progress(fraction):
+            calls.append(fraction)
+            if len(calls) == 3:
+                raise solver.Cancelled()
+        self.assertRaises(solver.Cancelled, synthesis.needle_optimise, self.evaluator,
+                          [0], [250.0], [0, 1], iterations=3, progress=progress)
+        self.assertEqual(calls, [0.0] * 3)
+
+    def test_differential_evolution(self):
+        layout = [0, 1] * 3
+        bounds = [2 * self.evaluator.quarter_wave(k) for k in layout]
+        d, merit = synthesis.differential_evolution(self.evaluator, layout, bounds,
+                                                    generations=30, seed=0)
+        self.assertEqual(len(d), 6)
+        self.assertTrue(np.all(d >= 0))
+        quarter_wave = self.evaluator.refine(layout, [0.5 * b for b in bounds])[1]
+        self.assertTrue(merit <= quarter_wave * 1.01)
+
+if __name__ == '__main__':
+    unittest.main()
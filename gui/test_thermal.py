@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+# This work is licensed under the Creative Commons Attribution-NonCommercial-
+# ShareAlike 4.0 International License. To view a copy of this license, visit
+# http://creativecommons.org/licenses/by-nc-sa/4.0/ or send a letter to Creative
+# Commons, PO Box 1866, Mountain View, CA 94042, USA.
+
+import solver
+import thermal
+import numpy as np
+import unittest
+
+class TestThermal(unittest.TestCase):
+    """Testing the thermal noise budget"""
+
+    def setUp(self):
+        self.n = [1.0 + 0j] + [2.1 + 0j, 1.45 + 0j] * 15 + [2.1 + 0j, 1.45 + 0j]
+        self.d = [1064 / 4 / 2.1, 1064 / 4 / 1.45] * 15 + [1064 / 4 / 2.1]
+        self.constants = {
+            'Y': 72e9, 'sigma': 0.17, 'phi': 5e-9, 'alpha': 5.1e-7,
+            'kappa': 1.38, 'C': 1.64e6, 'brownian': 1e-9,
+            'thermorefractive': 1e-10,
+        }
+
+    def test_phase_index_derivatives(self):
+        dphi = thermal.phase_index_derivatives(self.n, self.d, 1064.0)
+        # high reflector: dphi/dn of the outermost layer is -pi/n^2
+        self.assertAlmostEqual(dphi[0], -np.pi / 2.1**2, places=4)
+        for j in (1, 6, 30):
+            n = list(self.n)
+            n[j+1] += 1e-6
+            phase = np.angle(solver.propagate(n, self.d, 1064.0).r['s'] /
+                             solver.propagate(self.n, self.d, 1064.0).r['s'])
+            self.assertAlmostEqual(phase / 1e-6, dphi[j], places=5)
+
+    def test_frequency_dependence(self):
+        f = np.array([10.0, 1000.0])
+        psd = thermal.budget(self.constants, f, 290.0, 1e-4)
+        slopes = {
+            'coating_brownian': -1.0,
+            'substrate_brownian': -1.0,
+            'substrate_thermoelastic': -2.0,
+            'coating_thermorefractive': -0.5,
+        }
+        for term, slope in slopes.items():
+            self.assertAlmostEqual(np.log10(psd[term][1] / psd[term][0]) / 2, slope)
+        self.assertTrue(np.allclose(psd['total'], sum(psd[term] for term in thermal.TERMS)))
+
+    def test_scaling(self):
+        f = np.logspace(0, 4, 101)
+        psd = thermal.budget(self.constants, f, 290.0, 1e-4)
+        hot = thermal.budget(self.constants, f, 580.0, 1e-4)
+        wide = thermal.budget(self.constants, f, 290.0, 2e-4)
+        exponents = {
+            'coating_brownian': (1, -2),
+            'substrate_brownian': (1, -1),
+            'substrate_thermoelastic': (2, -3),
+            'coating_thermorefractive': (2, -2),
+        }
+        for term, (temperature, beam_size) in exponents.items():
+            self.assertTrue(np.allclose(hot[term], 2**temperature * psd[term]))
+            self.assertTrue(np.allclose(wide[term], 2**beam_size * psd[term]))
+
+    def test_missing_properties(self):
+        c = dict(self.constants, Y=0.0, C=0.0)
+        psd = thermal.budget(c, np.logspace(0, 4, 11), 290.0, 1e-4)
+        self.assertFalse(np.any(psd['total']))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+#!/usr/bin/env python
+# This work is licensed under the Creative Commons Attribution-NonCommercial-
+# ShareAlike 4.0 International License. To view a copy of this license, visit
+# http://creativecommons.org/licenses/by-nc-sa/4.0/ or send a letter to Creative
+# Commons, PO Box 1866, Mountain View, CA 94042, USA.
+
+import solver
+import tolerance
+import numpy as np
+import unittest
+
+class TestTolerance(unittest.TestCase):
+    """Testing the Monte Carlo tolerance analysis"""
+
+    def setUp(self):
+        self.wl = np.linspace(800, 1300, 51)
+        H = np.full(self.wl.shape, 2.1 + 0j)
+        L = np.full(self.wl.shape, 1.45 + 0j)
+        self.n = [1.0] + [H, L] * 5 + [1.45]
+        self.d = [1064 / 4 / 2.1, 1064 / 4 / 1.45] * 5
+
+    def test_without_errors(self):
+        result = tolerance.monte_carlo(self.n, self.d, self.wl, 10.0, samples=20,
+                                       thickness_error=0.0)
+        R = solver.propagate(self.n, self.d, self.wl, 10.0).reflectivity()
+        self.assertTrue(np.allclose(result['mean'], R))
+        for P in result['percentiles']:
+            self.assertTrue(np.allclose(P, R))
+        self.assertTrue(result['yield'] is None)
+
+    def test_chunks(self):
+        args = (self.n, self.d, self.wl, 0.0, 50, 0.02, 0.01, (1000, 1100, 0.9, 1.0))
+        result = tolerance.monte_carlo(*args)
+        limit = tolerance.CHUNK_POINTS
+        tolerance.CHUNK_POINTS = 100
+        try:
+            chunked = tolerance.monte_carlo(*args)
+        finally:
+            tolerance.CHUNK_POINTS = limit
+        for key in ('mean', 'percentiles', 'yield'):
+            self.assertTrue(np.allclose(result[key], chunked[key]))
+
+    def test_statistics(self):
+        result = tolerance.monte_carlo(self.n, self.d, self.wl, 0.0, 200, 0.02)
+        P = result['percentiles']
+        self.assertTrue(np.all(np.diff(P, axis=0) >= 0))
+        self.assertTrue(np.all(P[-1] - P[0] > 0))
+
+    def test_yield(self):
+        spec = (1000, 1100, 0.0, 1.0)
+        result = tolerance.monte_carlo(self.n, self.d, self.wl, 0.0, 100, 0.02, spec=spec)
+        self.assertEqual(result['yield'], 1.0)
+        R = solver.propagate(self.n, self.d, self.wl).reflectivity()
+        band = (self.wl >= 1000) & (self.wl <= 1100)
+        spec = (1000, 1100, np.min(R[band]), 1.0)
+        result = tolerance.monte_carlo(self.n, self.d, self.wl, 0.0, 100, 0.02, spec=spec)
+        self.assertTrue(0.0 < result['yield'] < 1.0)
+
+if __name__ == '__main__':
+    unittest.main()
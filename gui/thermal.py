@@ -0,0 +1,174 @@
+#!/usr/bin/env python
+# This work is licensed under the Creative Commons Attribution-NonCommercial-
+# ShareAlike 4.0 International License. To view a copy of this license, visit
+# http://creativecommons.org/licenses/by-nc-sa/4.0/ or send a letter to Creative
+# Commons, PO Box 1866, Mountain View, CA 94042, USA.
+
+"""
+Thermal noise budget of a mirror, as displacement noise spectral densities.
+
+The budget consists of
+
+- coating Brownian noise, Harry et al., CQG 19, 897 (2002), with the loss
+  angle of every layer weighted by its thickness and Young's modulus,
+- substrate Brownian noise, from the same paper,
+- substrate thermo-elastic noise, Braginsky et al., PLA 264, 1 (1999),
+- coating thermo-refractive noise, Braginsky et al., PLA 271, 303 (2000),
+  with the coefficient derived from the reflection phase of the actual
+  stack at lambda0, at normal incidence.
+
+Everything that depends on the layers is reduced to a few constants by
+constants(), which are cached per coating. Temperature, beam size and
+frequency only enter through budget(), which broadcasts across any number
+of frequencies.
+
+Thermal material properties are not part of coatingtk materials, they are
+kept in the thermal section of the configuration, see properties().
+"""
+
+import json
+import numpy as np
+from collections import OrderedDict
+from coatingtk.utils.config import Config
+import solver
+
+K_B = 1.3806503e-23
+
+THERMAL_PROPERTIES = ('alpha', 'beta', 'kappa', 'C')
+
+# relative index step for the derivatives of the reflection phase
+INDEX_STEP = 1e-6
+
+# noise terms, in the order of budget()
+TERMS = OrderedDict([
+    ('coating_brownian', 'Coating Brownian'),
+    ('substrate_brownian', 'Substrate Brownian'),
+    ('substrate_thermoelastic', 'Substrate thermo-elastic'),
+    ('coating_thermorefractive', 'Coating thermo-refractive'),
+])
+
+
+def section():
+    """The thermal section of the configuration, by material name"""
+    try:
+        return Config.Instance().get('thermal') or {}
+    except KeyError:
+        return {}
+
+
+def properties(name):
+    """
+    Thermal properties of the material name: thermal expansion alpha (1/K),
+    thermo-optic coefficient beta = dn/dT (1/K), thermal conductivity kappa
+    (W/m/K) and heat capacity per volume C (J/m^3/K). Missing values are 0,
+    so the terms that need them vanish.
+    """
+    values = section().get(name) or {}
+    return dict((key, float(values.get(key, 0.0))) for key in THERMAL_PROPERTIES)
+
+
+def mechanical(material):
+    """Young's modulus (Pa), Poisson ratio and loss angle of material"""
+    return tuple(float(getattr(material, key, 0.0) or 0.0)
+                 for key in ('Y', 'sigma', 'phi'))
+
+
+def phase_index_derivatives(n, d, wavelength):
+    """
+    Derivatives of the reflection phase (rad) by the refractive index of
+    every layer, at normal incidence.
+
+    All layers are perturbed at once: the stack is evaluated for 2L index
+    sets, each with a single layer index shifted up or down.
+    """
+    L = len(d)
+    if not L:
+        return np.zeros(0)
+    step = INDEX_STEP * np.abs(np.real(n[1:-1]))
+    shift = np.zeros((2 * L, L))
+    shift[np.arange(L), np.arange(L)] = step
+    shift[L + np.arange(L), np.arange(L)] = -step
+    nk = [n[0]] + [n[j+1] + shift[:, j] for j in range(L)] + [n[-1]]
+    r = solver.propagate(nk, d, wavelength).r['s']
+    return np.angle(r[:L] / r[L:]) / (2 * step)
+
+
+def constants(coating, lambda0):
+    """
+    Reduces coating to the constants of the noise budget, see budget().
+
+    Includes the sum over all layers of d_j phi_j (Y_j/Y_s + Y_s/Y_j) for
+    the coating Brownian noise, and the thermo-refractive coefficient
+    dz/dT = lambda0/(4 pi) sum_j beta_j dphi/dn_j (m/K).
+    """
+    Ys, sigmas, phis = mechanical(coating.substrate)
+    substrate = properties(coating.substrate.name)
+
+    brownian = 0.0
+    for layer in coating.layers:
+        Y, sigma, phi = mechanical(layer.material)
+        if Y and Ys:
+            brownian += layer.thickness * 1e-9 * phi * (Y / Ys + Ys / Y)
+
+    n, d = solver.stack_indices(coating, np.array(float(lambda0)))
+    dphi = phase_index_derivatives([complex(nj) for nj in n], d, lambda0)
+    beta = [properties(layer.material.name)['beta'] for layer in coating.layers]
+    thermorefractive = lambda0 * 1e-9 / (4 * np.pi) * np.dot(beta, dphi)
+
+    return {
+        'Y': Ys, 'sigma': sigmas, 'phi': phis,
+        'alpha': substrate['alpha'], 'kappa': substrate['kappa'],
+        'C': substrate['C'], 'brownian': brownian,
+        'thermorefractive': float(thermorefractive),
+    }
+
+
+# constants of the coatings evaluated so far
+cache = solver.ResultCache()
+
+def cached_constants(coating, lambda0):
+    """
+    constants(), cached by coating, lambda0 and the thermal properties, so
+    that changing only the temperature or beam size does not evaluate the
+    layers again.
+    """
+    key = (solver.coating_hash(coating), float(lambda0),
+           json.dumps(section(), sort_keys=True, default=str))
+    value = cache.get(key)
+    if value is None:
+        value = constants(coating, lambda0)
+        cache.put(key, value)
+    return value
+
+
+def budget(c, frequency, temperature, beam_size):
+    """
+    Displacement noise spectral densities (m^2/Hz) of all terms in TERMS,
+    for the constants c of a coating, see constants().
+
+    beam_size is the 1/e^2 intensity radius w (m); the thermal noise
+    papers use r0 = w/sqrt(2). Returns an OrderedDict with an array for
+    every term, of the shape of frequency, and their sum as 'total'.
+    """
+    f = np.asarray(frequency, dtype=float)
+    T = float(temperature)
+    w = float(beam_size)
+    r0 = w / np.sqrt(2)
+    omega = 2 * np.pi * f
+    zero = np.zeros_like(f)
+
+    psd = OrderedDict((term, zero) for term in TERMS)
+    if c['Y']:
+        brownian = 2 * K_B * T * (1 - c['sigma']**2) / (np.pi**1.5 * f * w * c['Y'])
+        psd['coating_brownian'] = brownian * c['brownian'] / (np.sqrt(np.pi) * w)
+        psd['substrate_brownian'] = brownian * c['phi']
+    if c['C']:
+        psd['substrate_thermoelastic'] = (8 / np.sqrt(2 * np.pi) * K_B * T**2 *
+            c['alpha']**2 * (1 + c['sigma'])**2 * c['kappa'] /
+            (c['C']**2 * r0**3 * omega**2))
+        if c['kappa']:
+            psd['coating_thermorefractive'] = (np.sqrt(2) * K_B * T**2 *
+                c['thermorefractive']**2 /
+                (np.pi * r0**2 * np.sqrt(c['kappa'] * c['C'] * omega)))
+    psd['total'] = sum(psd.values())
+    return psd
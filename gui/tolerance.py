@@ -0,0 +1,95 @@
+#!/usr/bin/env python
+# This work is licensed under the Creative Commons Attribution-NonCommercial-
+# ShareAlike 4.0 International License. To view a copy of this license, visit
+# http://creativecommons.org/licenses/by-nc-sa/4.0/ or send a letter to Creative
+# Commons, PO Box 1866, Mountain View, CA 94042, USA.
+
+"""
+Monte Carlo analysis of manufacturing tolerances.
+
+An ensemble of perturbed stacks is drawn once, with independent normally
+distributed relative errors of the thickness and refractive index of every
+layer. The whole ensemble is then propagated as one batch, with the
+samples along a leading axis. To bound the memory use for large ensembles,
+the wavelengths are processed in chunks, each with all samples, so that
+the statistics of every wavelength are still exact.
+"""
+
+import numpy as np
+import solver
+
+# number of samples times wavelengths held in memory per array
+CHUNK_POINTS = 1000000
+
+# percentiles reported by monte_carlo(), the median and two nested bands
+PERCENTILES = (5, 25, 50, 75, 95)
+
+
+def perturbations(layers, samples, thickness_error, index_error, seed=0):
+    """
+    Relative thickness and index factors of every sample and layer.
+
+    thickness_error and index_error are the relative standard deviations.
+    The same seed always gives the same ensemble, so that plots do not
+    change between redraws. Returns two arrays of shape (samples, layers).
+    """
+    rng = np.random.RandomState(seed)
+    thickness = 1.0 + thickness_error * rng.standard_normal((samples, layers))
+    index = 1.0 + index_error * rng.standard_normal((samples, layers))
+    return np.maximum(thickness, 0.0), index
+
+
+def monte_carlo(n, d, wavelength, AOI=0.0, samples=1000, thickness_error=0.01,
+                index_error=0.0, spec=None, seed=0, progress=None):
+    """
+    Reflectivity statistics of an ensemble of perturbed stacks.
+
+    Takes n and d like solver.Stack, for a one-dimensional wavelength array
+    and a fixed AOI, see perturbations() for the errors. spec is an
+    optional tuple (wavelength min, wavelength max, R min, R max); a sample
+    meets it if its s- and p-polarised reflectivity are within the limits
+    at every wavelength of the band. progress is called after every chunk
+    and may raise solver.Cancelled.
+
+    Returns a dict with the 'mean' reflectivity, of shape (wavelengths, 2),
+    the 'percentiles', of shape (len(PERCENTILES), wavelengths, 2), and the
+    'yield', the fraction of samples that meet spec (None without spec or
+    if no wavelength is in the band).
+    """
+    wavelength = np.asarray(wavelength, dtype=float)
+    L = len(d)
+    thickness, index = perturbations(L, samples, thickness_error, index_error, seed)
+    D = np.asarray(d, dtype=float) * thickness
+
+    W = len(wavelength)
+    mean = np.empty((W, 2))
+    percentiles = np.empty((len(PERCENTILES), W, 2))
+    passed = np.ones(samples, dtype=bool)
+    in_band = np.zeros(W, dtype=bool)
+    if spec:
+        in_band = (wavelength >= spec[0]) & (wavelength <= spec[1])
+
+    # every layer with its own index errors keeps a few arrays of chunk size
+    arrays = 1 + (L if index_error else 0)
+    step = max(1, CHUNK_POINTS // (samples * arrays))
+    for start in range(0, W, step):
+        chunk = slice(start, min(start + step, W))
+        nc = [np.asarray(nj)[..., chunk] if np.ndim(nj) else nj for nj in n]
+        if index_error:
+            nc[1:-1] = [nj * index[:, j, np.newaxis] for j, nj in enumerate(nc[1:-1])]
+        dc = [D[:, j, np.newaxis] for j in range(L)]
+        R = solver.propagate(nc, dc, wavelength[chunk], AOI).reflectivity()
+        R = np.broadcast_to(R, (samples,) + R.shape[-2:])
+        mean[chunk] = np.mean(R, axis=0)
+        percentiles[:, chunk] = np.percentile(R, PERCENTILES, axis=0)
+        band = in_band[chunk]
+        if np.any(band):
+            Rb = R[:, band]
+            passed &= np.all((Rb >= spec[2]) & (Rb <= spec[3]), axis=(1, 2))
+        if progress:
+            progress(chunk.stop / float(W))
+
+    result = {'mean': mean, 'percentiles': percentiles, 'yield': None}
+    if np.any(in_band):
+        result['yield'] = np.mean(passed)
+    return result
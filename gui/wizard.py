@@ -5,8 +5,11 @@
 # Commons, PO Box 1866, Mountain View, CA 94042, USA.
 
 from coatingtk.utils.config import Config
-from coatingtk.materials import MaterialLibrary
+from coatingtk.materials import MaterialLibrary, MaterialNotDefined
+from coatingtk.coating import Coating
 from wizardDialog import *
+from worker import OptimiseWorker, SynthesisWorker
+import optimiser
 
 class Wizard(QObject):
     def __init__(self, parent):
@@ -40,15 +43,109 @@ class Wizard(QObject):
         self.config.set('coating.layers', stack)
         return True
 
+    def parse_targets(self, targets, title):
+        try:
+            return optimiser.parse_targets(targets)
+        except optimiser.TargetError as e:
+            QMessageBox.warning(self.parent, title, str(e))
+            return None
+
+    def create_coating(self):
+        try:
+            return Coating.create_from_config(self.config)
+        except MaterialNotDefined as e:
+            QMessageBox.critical(self.parent, 'Material Error', str(e))
+            return None
+
+    def run_worker(self, worker, title, label):
+        """
+        Runs worker behind a modal progress dialog, returns its result or
+        None if it failed or was cancelled.
+        """
+        progress = QProgressDialog(label, 'Cancel', 0, 100, self.parent)
+        progress.setWindowModality(Qt.WindowModal)
+        result = []
+        errors = []
+        worker.progress.connect(progress.setValue)
+        worker.computed.connect(result.append)
+        worker.failed.connect(errors.append)
+        progress.canceled.connect(worker.cancel)
+        # keep the GUI responsive while the worker is running
+        loop = QEventLoop()
+        worker.finished.connect(loop.quit)
+        worker.start()
+        progress.show()
+        loop.exec_()
+        progress.close()
+
+        if errors:
+            QMessageBox.warning(self.parent, title, errors[0])
+        return result[0] if result else None
+
+    def optimise(self, targets):
+        self.config.set('optimiser.targets', targets)
+        targets = self.parse_targets(targets, 'Optimisation')
+        if targets is None:
+            return False
+        coating = self.create_coating()
+        if coating is None:
+            return False
+
+        worker = OptimiseWorker(coating, targets, self.parent)
+        result = self.run_worker(worker, 'Optimisation',
+                                 'Optimising layer thicknesses...')
+        if result is None:
+            return False
+        thicknesses, merit = result
+        stack = self.config.get('coating.layers')
+        stack = [[s[0], round(t,1)] for s, t in zip(stack, thicknesses)]
+        self.config.set('coating.layers', stack)
+        return True
+
+    def synthesise(self, targets, method, materials, layers):
+        self.config.set('optimiser.targets', targets)
+        self.config.set('synthesis.method', method)
+        self.config.set('synthesis.materials', materials)
+        self.config.set('synthesis.layers', layers)
+        if len(materials) < 2:
+            QMessageBox.warning(self.parent, 'Synthesis',
+                                'Please select at least two materials.')
+            return False
+        targets = self.parse_targets(targets, 'Synthesis')
+        if targets is None:
+            return False
+        coating = self.create_coating()
+        if coating is None:
+            return False
+
+        materials = [self.materials.get_material(m) for m in materials]
+        worker = SynthesisWorker(coating, materials, targets, method, layers,
+                                 self.config.get('synthesis.workers'), self.parent)
+        result = self.run_worker(worker, 'Synthesis', 'Synthesising coating...')
+        if result is None:
+            return False
+        stack, merit = result
+        stack = [[m, round(t,1)] for m, t in stack]
+        self.config.set('coating.layers', stack)
+        return True
+
     def run(self):
         dlg = WizardDialog(self.parent)
         dlg.load_materials(self.materials)
+        dlg.load_targets(self.config.get('optimiser.targets'))
+        dlg.load_synthesis(self.config.get('synthesis.method'),
+            self.config.get('synthesis.materials'), self.config.get('synthesis.layers'))
         retval = dlg.exec_()
         if retval == WIZARD_BILAYERS:
             return self.add_bilayers(dlg.num_bilayers,
                 dlg.material1, dlg.material2, dlg.add_hw_cap)
         elif retval == WIZARD_SHIFT:
             return self.shift_stack(dlg.shift_percentage)
+        elif retval == WIZARD_OPTIMISE:
+            return self.optimise(dlg.targets)
+        elif retval == WIZARD_SYNTHESISE:
+            return self.synthesise(dlg.targets, dlg.synth_method,
+                dlg.synth_materials, dlg.synth_layers)
         else:
             return False
 
@@ -6,17 +6,22 @@
 
 from PyQt4.QtCore import *
 from PyQt4.QtGui import *
-from PyQt4 import uic
+import forms
 from helpers import int_conversion_error, float_conversion_error
 
 # actions
 WIZARD_BILAYERS = 1
 WIZARD_SHIFT = 2
+WIZARD_OPTIMISE = 3
+WIZARD_SYNTHESISE = 4
+
+# synthesis methods, in the order of cbSynthMethod
+SYNTHESIS_METHODS = ['needle', 'evolution']
 
 class WizardDialog(QDialog):
     def __init__(self, parent=None):
         super(WizardDialog, self).__init__(parent)
-        uic.loadUi('gui/ui_dialogWizard.ui', self)
+        forms.setup_form(self, 'gui/ui_dialogWizard.ui')
 
         # "add bilayers" wizardry
         self.num_bilayers = 2
@@ -27,12 +32,34 @@ class WizardDialog(QDialog):
         # "shift stack" wizardry
         self.shift_percentage = 0
 
+        # "optimise" wizardry
+        self.targets = ''
+
+        # "synthesise" wizardry
+        self.synth_method = SYNTHESIS_METHODS[0]
+        self.synth_materials = []
+        self.synth_layers = 16
+
     def load_materials(self, materials):
         materials = sorted([m for m in materials.list_materials()])
         self.cbMaterial1.clear()
         self.cbMaterial2.clear()
         self.cbMaterial1.addItems(materials)
         self.cbMaterial2.addItems(materials)
+        self.lstSynthMaterials.clear()
+        self.lstSynthMaterials.addItems(materials)
+
+    def load_targets(self, targets):
+        self.txtTargets.setPlainText(targets or '')
+
+    def load_synthesis(self, method, materials, layers):
+        if method in SYNTHESIS_METHODS:
+            self.cbSynthMethod.setCurrentIndex(SYNTHESIS_METHODS.index(method))
+        for material in materials or []:
+            for item in self.lstSynthMaterials.findItems(material, Qt.MatchExactly):
+                item.setSelected(True)
+        if layers:
+            self.sbSynthLayers.setValue(layers)
     
     # ==== SLOTS ====
 
@@ -68,3 +95,29 @@ class WizardDialog(QDialog):
     @pyqtSlot()
     def on_btnShift_clicked(self):
         self.done(WIZARD_SHIFT)
+
+    @pyqtSlot()
+    def on_txtTargets_textChanged(self):
+        self.targets = str(self.txtTargets.toPlainText())
+
+    @pyqtSlot()
+    def on_btnOptimise_clicked(self):
+        self.done(WIZARD_OPTIMISE)
+
+    @pyqtSlot(int)
+    def on_cbSynthMethod_currentIndexChanged(self, index):
+        self.synth_method = SYNTHESIS_METHODS[index]
+        self.sbSynthLayers.setEnabled(self.synth_method == 'evolution')
+
+    @pyqtSlot()
+    def on_lstSynthMaterials_itemSelectionChanged(self):
+        self.synth_materials = [str(item.text()) for item in
+                                self.lstSynthMaterials.selectedItems()]
+
+    @pyqtSlot(int)
+    def on_sbSynthLayers_valueChanged(self, value):
+        self.synth_layers = value
+
+    @pyqtSlot()
+    def on_btnSynthesise_clicked(self):
+        self.done(WIZARD_SYNTHESISE)
@@ -0,0 +1,140 @@
+#!/usr/bin/env python
+# This work is licensed under the Creative Commons Attribution-NonCommercial-
+# ShareAlike 4.0 International License. To view a copy of this license, visit
+# http://creativecommons.org/licenses/by-nc-sa/4.0/ or send a letter to Creative
+# Commons, PO Box 1866, Mountain View, CA 94042, USA.
+
+from PyQt4.QtCore import QThread, pyqtSignal
+import solver
+from solver import Cancelled
+import optimiser
+import synthesis
+import dispersion
+from profiling import profiler
+
+
+class Worker(QThread):
+    """
+    Runs a calculation in a background thread.
+
+    Subclasses implement calculate(), which should call report_progress()
+    regularly. Emits progress (in percent) while calculating, and either
+    computed with the result or failed with an error message once done.
+    Cancelling makes the next report_progress() call abort the
+    calculation.
+    """
+    progress = pyqtSignal(int)
+    computed = pyqtSignal(object)
+    failed = pyqtSignal(str)
+
+    def __init__(self, parent=None):
+        super(Worker, self).__init__(parent)
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+    def report_progress(self, fraction):
+        if self.cancelled:
+            raise Cancelled()
+        self.progress.emit(int(100 * fraction))
+
+    def calculate(self):
+        raise NotImplementedError()
+
+    def run(self):
+        try:
+            result = self.calculate()
+        except Cancelled:
+            return
+        except Exception as e:
+            self.failed.emit(str(e))
+            return
+        if not self.cancelled:
+            self.computed.emit(result)
+
+
+class PlotWorker(Worker):
+    """
+    Runs plot.compute(coating) in a background thread.
+
+    Drawing the data is left to the receiver of computed, as matplotlib
+    must only be used from the GUI thread.
+    """
+    def __init__(self, plot, coating, parent=None):
+        super(PlotWorker, self).__init__(parent)
+        self.plot = plot
+        self.coating = coating
+
+    def calculate(self):
+        with profiler.span('compute'):
+            return self.plot.compute(self.coating, self.report_progress)
+
+
+class OptimiseWorker(Worker):
+    """
+    Fits the layer thicknesses of coating to targets, see optimiser.
+
+    The result is the list of fitted thicknesses and the merit function.
+    """
+    def __init__(self, coating, targets, parent=None):
+        super(OptimiseWorker, self).__init__(parent)
+        self.coating = coating
+        self.targets = targets
+
+    def calculate(self):
+        n, d = solver.stack_indices(self.coating, self.targets['wavelength'])
+        return optimiser.optimise(n, d, self.targets,
+                                  progress=self.report_progress)
+
+
+class SynthesisWorker(Worker):
+    """
+    Designs a coating for targets from scratch, see synthesis.
+
+    method is 'needle' or 'evolution'. The layers are made of materials, a
+    list of library materials; needle optimisation starts from the layers
+    of coating, differential evolution searches layers layers alternating
+    between materials. The result is the list of layers [material name,
+    thickness] and the merit function.
+    """
+    def __init__(self, coating, materials, targets, method, layers=16,
+                 workers=0, parent=None):
+        super(SynthesisWorker, self).__init__(parent)
+        self.coating = coating
+        self.materials = list(materials)
+        self.targets = targets
+        self.method = method
+        self.layers = layers
+        self.workers = workers
+
+    def calculate(self):
+        wavelength = self.targets['wavelength']
+        grid = solver.grid_hash(wavelength)
+        def index(material):
+            return dispersion.cache.index(material, wavelength, grid)
+
+        materials = list(self.materials)
+        names = [m.name for m in materials]
+        for layer in self.coating.layers:
+            if layer.material.name not in names:
+                materials.append(layer.material)
+                names.append(layer.material.name)
+        evaluator = synthesis.Evaluator(index(self.coating.superstrate),
+                                        index(self.coating.substrate),
+                                        [index(m) for m in materials],
+                                        self.targets, self.workers)
+        try:
+            if self.method == 'needle':
+                layout = [names.index(l.material.name) for l in self.coating.layers]
+                d = [float(l.thickness) for l in self.coating.layers]
+                layout, d, merit = synthesis.needle_optimise(evaluator, layout, d,
+                    range(len(self.materials)), progress=self.report_progress)
+            else:
+                layout = [j % len(self.materials) for j in range(self.layers)]
+                bounds = [2 * evaluator.quarter_wave(k) for k in layout]
+                d, merit = synthesis.differential_evolution(evaluator, layout,
+                    bounds, progress=self.report_progress)
+        finally:
+            evaluator.close()
+        return [[names[k], t] for k, t in zip(layout, d)], merit
@@ -10,8 +10,8 @@ def collect_plots():
     for fn in glob.glob('gui/plots/ui_*.ui'):
         uis.append(fn)
         mod = os.path.basename(os.path.splitext(fn)[0])
-        mod = mod.replace('ui_plot', 'plot_')
-        mods.append('gui.plots.'+mod)
+        mods.append('gui.plots.'+mod.replace('ui_plot', 'plot_'))
+        mods.append('gui.plots.'+mod.replace('ui_plot', 'options_'))
     return (uis, mods)
 
 def collect_uis():
@@ -20,14 +20,20 @@ def collect_uis():
         uis.append(fn)
     return uis
 
+def compile_forms():
+    # precompiled forms, so that the frozen build does not need to run uic
+    from gui import forms
+    return forms.compile_forms()
+
 plot_uis, plot_mods = collect_plots()
 uis = collect_uis()
+form_mods = compile_forms()
 
 # Dependencies are automatically detected, but it might need
 # fine tuning.
 buildOptions = dict(
     packages = [],
-    includes = ['gui.matplotlibwidget'] + plot_mods,
+    includes = ['gui.matplotlibwidget'] + plot_mods + form_mods,
     excludes = ['scipy',
                 'tcl',
                 'tkinter'],